@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Pruebas de rendimiento
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Suite: programas sintéticos de 1k, 100k y 1M líneas (generados desde las
+# tablas de mnemónicos) para medir MIPSDecoder.assemble de punta a punta,
+# las funciones de codificación y los escritores TXT/BIN de las dos
+# herramientas. Los resultados se guardan en un JSON base; una corrida que
+# tarde más que la base por encima del umbral falla.
+#
+# Cada muestra repite la operación hasta durar al menos MIN_SAMPLE (como
+# timeit.autorange) y se guarda el mejor tiempo por llamada junto con su
+# dispersión (mediana - mejor). Una diferencia menor que NOISE_SPREADS
+# veces la dispersión (de la base o de la corrida) se toma como ruido.
+#
+#   python mips_bench.py --guardar-base          (crear/actualizar la base)
+#   python mips_bench.py [--umbral 0.2]          (comparar contra la base)
+#   python mips_bench.py --tamanos 1000,100000 --casos assemble
+#
+# Arranque de la línea de comandos: el build llama a mips_decoder.py cientos
+# de veces, así que se mide el tiempo de "python mips_decoder.py prog.asm
+# out.txt" (y de txt.py) contra un intérprete vacío, y se revisa que el
+# modo de línea de comandos no importe tkinter.
+#
+#   python mips_bench.py --arranque [--limite-ms 60] [--repeticiones 10]
+#
+# Regresa código 1 si hay una regresión, si no hay base contra la cual
+# comparar o si algún comando excede el límite.
+# ============================================================================
+
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TXT_DIR = os.path.join(HERE, '..', 'QUEKA', 'python')
+TXT_PY = os.path.join(TXT_DIR, 'txt.py')
+
+# Milisegundos permitidos por encima de "python -c pass"
+STARTUP_LIMIT_MS = 60
+
+# Suite
+SIZES = (1000, 100000, 1000000)
+DEFAULT_BASELINE = os.path.join(HERE, 'mips_bench_base.json')
+REGRESSION_THRESHOLD = 0.20     # 20 % más lento que la base
+MIN_SAMPLE = 0.2                # Duración mínima (s) de cada muestra
+REPEATS = 5                     # Muestras por caso
+NOISE_SPREADS = 3               # Diferencias menores que 3 dispersiones no cuentan
+BASELINE_VERSION = 2
+
+SAMPLE_PROGRAM = """\
+inicio: addi $t0, $zero, 5
+        lw   $t1, 0($zero)
+loop:   add  $t1, $t1, $t0
+        beq  $t1, $zero, inicio
+        j    loop
+"""
+
+# txt.py no maneja etiquetas
+SAMPLE_TXT = """\
+addi $t0, $zero, 5
+lw   $t1, 0($zero)
+add  $t1, $t1, $t0
+beq  $t1, $zero, -3
+j    8
+"""
+
+
+def _environment():
+    """Entorno de los subprocesos: con caché de bytecode (como en un build
+    normal) y con este directorio en el path para 'python -m'"""
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = HERE + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def time_command(argv, runs=10, cwd=None, env=None):
+    """Mejor tiempo (s) de 'runs' ejecuciones; la primera calienta la
+    caché de bytecode y no cuenta"""
+    best = None
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        done = subprocess.run(argv, cwd=cwd, env=env, capture_output=True)
+        elapsed = time.perf_counter() - start
+        if done.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} falló: "
+                               f"{done.stderr.decode(errors='replace').strip()}")
+        if run and (best is None or elapsed < best):
+            best = elapsed
+    return best
+
+
+def imports_tkinter(module):
+    """True si importar 'module' carga tkinter"""
+    code = f"import sys, {module}; print('tkinter' in sys.modules)"
+    done = subprocess.run([sys.executable, '-c', code], env=_environment(),
+                          capture_output=True, text=True, check=True)
+    return done.stdout.strip() == 'True'
+
+
+def startup_benchmark(runs=10):
+    """Tiempos de arranque en ms: intérprete vacío y cada comando"""
+    env = _environment()
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as work:
+        source = os.path.join(work, 'prog.asm')
+        with open(source, 'w') as f:
+            f.write(SAMPLE_PROGRAM)
+        with open(os.path.join(work, 'prog_txt.asm'), 'w') as f:
+            f.write(SAMPLE_TXT)
+        commands = {
+            'mips_decoder.py': [python, os.path.join(HERE, 'mips_decoder.py'),
+                                'prog.asm', 'out.txt'],
+            'python -m mips_decoder': [python, '-m', 'mips_decoder',
+                                       'prog.asm', 'out.txt'],
+            'txt.py': [python, TXT_PY, 'prog_txt.asm', '-o', 'txt_out.txt'],
+        }
+        base = time_command([python, '-c', 'pass'], runs, work, env)
+        results = {'interprete_ms': base * 1000, 'comandos': {}}
+        for name, argv in commands.items():
+            results['comandos'][name] = time_command(argv, runs, work, env) * 1000
+    results['tkinter'] = {module: imports_tkinter(module)
+                          for module in ('mips_decoder',)}
+    return results
+
+
+def check_startup(results, limit_ms=STARTUP_LIMIT_MS):
+    """Lista de fallas (vacía si todo está dentro del límite)"""
+    failures = []
+    base = results['interprete_ms']
+    for name, ms in results['comandos'].items():
+        if ms - base > limit_ms:
+            failures.append(f"{name}: {ms - base:.1f} ms sobre el intérprete "
+                            f"(límite {limit_ms} ms)")
+    for module, loaded in results['tkinter'].items():
+        if loaded:
+            failures.append(f"import {module} carga tkinter")
+    return failures
+
+
+# ============================================================================
+# Suite de rendimiento
+# ============================================================================
+
+def synthetic_program(size, seed=0):
+    """Programa con etiquetas, alias de registros y todos los mnemónicos"""
+    from mips_fuzz import generate_program, program_text
+    return program_text(generate_program(seed, size=size)) + '\n'
+
+
+def synthetic_plain(size, seed=0):
+    """Programa sin etiquetas (txt.py no las maneja)"""
+    from mips_encoder import random_columns, columns_to_text
+    return columns_to_text(*random_columns(size, seed)) + '\n'
+
+
+def _sample(func, number):
+    """Segundos de 'number' llamadas seguidas (sin recolector de basura)"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def measure(func, repeats, min_sample=MIN_SAMPLE):
+    """(mejor, dispersión) en segundos por llamada. El número de llamadas
+    por muestra crece hasta que la muestra dura 'min_sample'; la primera
+    muestra que lo logra cuenta como una de las 'repeats'."""
+    number = 1
+    elapsed = _sample(func, number)
+    while elapsed < min_sample:
+        scale = min_sample / elapsed if elapsed > 0 else 10
+        number = max(number + 1, int(number * scale * 1.1))
+        elapsed = _sample(func, number)
+    samples = [elapsed / number]
+    samples += [_sample(func, number) / number for _ in range(repeats - 1)]
+    samples.sort()
+    return samples[0], samples[len(samples) // 2] - samples[0]
+
+
+def load_txt_tool():
+    """Núcleo de QUEKA/python/txt.py (sin Tk)"""
+    if TXT_DIR not in sys.path:
+        sys.path.insert(0, TXT_DIR)
+    import txt
+    return txt
+
+
+def suite_cases(size, work):
+    """Casos (nombre, función) para un tamaño; los datos se preparan aquí
+    para que solo se mida la operación"""
+    from mips_decoder import MIPSDecoder, assemble_to_file
+    from mips_encoder import encode_columns, random_columns
+    from mips_isa import INSTRUCTIONS, KIND_JUMP, KIND_R, KIND_SHIFT, encode
+    from mips_output import write_words
+
+    code = synthetic_program(size)
+    plain = synthetic_plain(size)
+    source = os.path.join(work, f'prog_{size}.asm')
+    plain_source = os.path.join(work, f'plano_{size}.asm')
+    with open(source, 'w') as f:
+        f.write(code)
+    with open(plain_source, 'w') as f:
+        f.write(plain)
+
+    decoder = MIPSDecoder()
+    words = decoder.assemble(code).words
+    labels = dict(decoder.labels)
+
+    # Instrucciones ya separadas, agrupadas por formato (como los antiguos
+    # encode_r_type / encode_i_type / encode_j_type)
+    texts = []
+    by_format = {'r': [], 'i': [], 'j': []}
+    for line in code.split('\n'):
+        _, text = decoder.split_line(line)
+        if not text:
+            continue
+        address = len(texts) * 4
+        texts.append((text, address))
+        parts = text.replace(',', ' ').split()
+        kind = INSTRUCTIONS[parts[0].lower()][1]
+        group = ('r' if kind in (KIND_R, KIND_SHIFT) else
+                 'j' if kind == KIND_JUMP else 'i')
+        by_format[group].append((parts, address))
+
+    def encode_lines():
+        decoder.labels = labels
+        for number, (text, address) in enumerate(texts, 1):
+            decoder.encode_line(text, number, address)
+
+    def encode_format(group):
+        items = by_format[group]
+        return lambda: [encode(parts, labels, address) for parts, address in items]
+
+    columns = random_columns(size)
+    txt = load_txt_tool()
+    txt_decoder = txt.MIPSDecoder()
+    out = os.path.join(work, 'salida')
+
+    return [
+        ('assemble', lambda: MIPSDecoder().assemble(code)),
+        ('assemble_dos_pasadas', lambda: MIPSDecoder().assemble(code, one_pass=False)),
+        ('encode_line', encode_lines),
+        ('encode_r_type', encode_format('r')),
+        ('encode_i_type', encode_format('i')),
+        ('encode_j_type', encode_format('j')),
+        ('encode_columns', lambda: encode_columns(*columns)),
+        ('mips_decoder.archivo_txt',
+         lambda: assemble_to_file(MIPSDecoder(), source, out + '.txt')),
+        ('mips_decoder.archivo_bin',
+         lambda: assemble_to_file(MIPSDecoder(), source, out + '.bin')),
+        ('mips_decoder.escribir_txt', lambda: write_words(out + '.txt', words)),
+        ('mips_decoder.escribir_bin', lambda: write_words(out + '.bin', words, 'bin')),
+        ('txt.decode_file', lambda: txt_decoder.decode_file(plain_source)),
+        ('txt.escribir_txt', lambda: txt_decoder.save_binary_file(out + '.txt', words)),
+        ('txt.escribir_bin', lambda: txt_decoder.save_binary_file(out + '.bin', words)),
+    ]
+
+
+def run_suite(sizes=SIZES, repeats=REPEATS, only=None, report=None):
+    """Corre la suite; regresa {"caso/tamaño": (segundos, dispersión)}.
+    'only' filtra por subcadena del nombre; 'report' recibe (nombre,
+    segundos, dispersión) al medir."""
+    results = {}
+    with tempfile.TemporaryDirectory() as work:
+        for size in sizes:
+            # Los programas de 1M líneas se miden una sola vez
+            times = repeats if size <= 100000 else 1
+            for name, func in suite_cases(size, work):
+                key = f"{name}/{size}"
+                if only and not any(part in key for part in only):
+                    continue
+                results[key] = measure(func, times)
+                if report is not None:
+                    report(key, *results[key])
+    return results
+
+
+def environment_info():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {'python': platform.python_version(), 'maquina': platform.machine(),
+            'sistema': platform.system(), 'numpy': numpy_version}
+
+
+def save_baseline(path, results):
+    """Escribe (o actualiza caso por caso) el JSON base"""
+    try:
+        data = load_baseline(path)
+    except (OSError, ValueError):
+        data = {'version': BASELINE_VERSION, 'casos': {}}
+    data['entorno'] = environment_info()
+    data['casos'].update({key: {'s': round(seconds, 9), 'dispersion': round(spread, 9)}
+                          for key, (seconds, spread) in results.items()})
+    data['casos'] = dict(sorted(data['casos'].items()))
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path}: versión de base incompatible")
+    return data
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Lista de (caso, segundos, base, cambio relativo, es regresión)"""
+    rows = []
+    for key, (seconds, spread) in results.items():
+        entry = baseline['casos'].get(key)
+        if entry is None:
+            rows.append((key, seconds, None, None, False))
+            continue
+        base = entry['s']
+        change = seconds / base - 1 if base else 0.0
+        noise = NOISE_SPREADS * max(spread, entry['dispersion'])
+        regression = change > threshold and seconds - base > noise
+        rows.append((key, seconds, base, change, regression))
+    return rows
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento")
+    parser.add_argument("--arranque", action="store_true",
+                        help="medir el arranque de la línea de comandos")
+    parser.add_argument("--limite-ms", type=float, default=STARTUP_LIMIT_MS,
+                        help="ms permitidos por encima del intérprete vacío")
+    parser.add_argument("--repeticiones", type=int, default=None,
+                        help="muestras por caso (se toma el mejor tiempo)")
+    parser.add_argument("--tamanos", default=','.join(map(str, SIZES)),
+                        help="tamaños de programa separados por coma")
+    parser.add_argument("--casos", default=None,
+                        help="solo los casos que contengan alguno de estos textos (coma)")
+    parser.add_argument("--base", default=DEFAULT_BASELINE, help="JSON base")
+    parser.add_argument("--guardar-base", action="store_true",
+                        help="guardar los resultados como nueva base")
+    parser.add_argument("--umbral", type=float, default=REGRESSION_THRESHOLD,
+                        help="fracción más lenta que la base que se considera regresión")
+    args = parser.parse_args()
+
+    if args.arranque:
+        results = startup_benchmark(args.repeticiones or 10)
+        base = results['interprete_ms']
+        print(f"{'python -c pass':<24} {base:7.1f} ms")
+        for name, ms in results['comandos'].items():
+            print(f"{name:<24} {ms:7.1f} ms  (+{ms - base:.1f} ms)")
+        failures = check_startup(results, args.limite_ms)
+        for failure in failures:
+            print(f"❌ {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"✅ Arranque dentro del límite ({args.limite_ms:g} ms)")
+        return
+
+    sizes = [int(size) for size in args.tamanos.split(',') if size]
+    only = args.casos.split(',') if args.casos else None
+    baseline = None
+    if not args.guardar_base:
+        try:
+            baseline = load_baseline(args.base)
+        except OSError:
+            print(f"❌ Error: no hay base en {args.base}; use --guardar-base para crearla")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+
+    def report(key, seconds, spread):
+        line = f"{key:<36} {seconds * 1000:10.3f} ms ±{spread * 1000:.3f}"
+        entry = baseline['casos'].get(key) if baseline else None
+        if entry and entry['s']:
+            line += f"  base {entry['s'] * 1000:10.3f} ms  ({seconds / entry['s'] - 1:+.0%})"
+        print(line, flush=True)
+
+    results = run_suite(sizes, args.repeticiones or REPEATS, only, report)
+
+    if args.guardar_base:
+        save_baseline(args.base, results)
+        print(f"✅ Base guardada: {args.base} ({len(results)} casos)")
+        return
+    if baseline.get('entorno') != environment_info():
+        print(f"⚠️ La base se tomó en otro entorno: {baseline.get('entorno')}")
+    regressions = [row for row in compare(results, baseline, args.umbral) if row[4]]
+    for key, seconds, base, change, _ in regressions:
+        print(f"❌ Regresión: {key} {seconds * 1000:.1f} ms contra {base * 1000:.1f} ms "
+              f"({change:+.0%}, umbral {args.umbral:.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"✅ Sin regresiones (umbral {args.umbral:.0%})")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,179 @@
+# ============================================================================
+# Caché en disco del ensamblado (direccionada por contenido)
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Cada entrada se guarda con la llave sha256(versión de tablas + fuente), de
+# modo que un .asm que no cambió no se vuelve a ensamblar. El valor es la
+# imagen de palabras (más números de línea, errores y etiquetas para
+# reconstruir exactamente el mismo resultado).
+#
+#   <dir>/ab/abcdef...mipsc
+#       MIPSC1\n
+#       {"count": n, "errors": [...], "labels": {...}}\n
+#       n palabras Big Endian + n números de línea Big Endian
+#
+# Las escrituras son atómicas (archivo temporal + os.replace), así que
+# varios procesos pueden compartir el directorio. Al exceder el límite de
+# tamaño se borran las entradas usadas hace más tiempo (LRU por mtime; cada
+# acierto actualiza el mtime).
+# ============================================================================
+
+import json
+import os
+import sys
+from array import array
+
+MAGIC = b'MIPSC1\n'
+SUFFIX = '.mipsc'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _to_big_endian(buf):
+    if sys.byteorder == 'little':
+        buf = array(buf.typecode, buf)
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def _from_big_endian(data):
+    buf = array('I')
+    buf.frombytes(data)
+    if sys.byteorder == 'little':
+        buf.byteswap()
+    return buf
+
+
+class AssemblyCache:
+    """Caché de imágenes ensambladas en un directorio compartido"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, code, version):
+        """Llave de la entrada: hash de la versión de tablas y del texto"""
+        import hashlib
+        digest = hashlib.sha256(version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(code.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + SUFFIX)
+
+    def get(self, key):
+        """Regresa (palabras, líneas, errores, etiquetas) o None"""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            if not data.startswith(MAGIC):
+                raise ValueError("encabezado inválido")
+            end = data.index(b'\n', len(MAGIC))
+            header = json.loads(data[len(MAGIC):end])
+            count = header['count']
+            body = data[end + 1:]
+            if len(body) != count * 8:
+                raise ValueError("tamaño inválido")
+            words = _from_big_endian(body[:count * 4])
+            lines = _from_big_endian(body[count * 4:])
+        except (ValueError, KeyError):
+            # Entrada corrupta (p. ej. de otra versión): se trata como fallo
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)      # Uso reciente para LRU
+        except OSError:
+            pass
+        return words, lines, header['errors'], header['labels']
+
+    def put(self, key, words, lines, errors=(), labels=None):
+        """Guarda una entrada de forma atómica y aplica el límite de tamaño"""
+        import tempfile
+        header = json.dumps({'count': len(words), 'errors': list(errors),
+                             'labels': labels or {}}, ensure_ascii=False)
+        data = (MAGIC + header.encode('utf-8') + b'\n' +
+                _to_big_endian(array('I', words)) + _to_big_endian(array('I', lines)))
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self.stores += 1
+        self.evict()
+
+    def entries(self):
+        """Lista de (mtime, tamaño, ruta) de las entradas en disco"""
+        found = []
+        try:
+            subdirs = list(os.scandir(self.directory))
+        except OSError:
+            return found
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                for entry in os.scandir(subdir.path):
+                    if entry.name.endswith(SUFFIX):
+                        st = entry.stat()
+                        found.append((st.st_mtime, st.st_size, entry.path))
+            except OSError:
+                # Otro proceso borró la entrada mientras se recorría
+                continue
+        return found
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta quedar bajo max_bytes"""
+        if self.max_bytes is None:
+            return
+        found = self.entries()
+        total = sum(size for _, size, _ in found)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(found):
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        """Aciertos, fallos y ocupación del directorio"""
+        found = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            'aciertos': self.hits,
+            'fallos': self.misses,
+            'tasa_aciertos': self.hits / lookups if lookups else 0.0,
+            'guardadas': self.stores,
+            'desalojadas': self.evictions,
+            'entradas': len(found),
+            'bytes': sum(size for _, size, _ in found),
+        }
+
+    def summary(self):
+        info = self.stats()
+        return (f"Caché: {info['aciertos']} acierto(s), {info['fallos']} fallo(s), "
+                f"{info['entradas']} entradas, {info['bytes'] / 1024:.1f} KB")
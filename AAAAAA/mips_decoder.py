@@ -15,277 +15,518 @@
 #   Pseudo: NOP
 # ============================================================================
 
-import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox
 import re
 import os
+import sys
+import time
+from array import array
+from collections.abc import Sequence
 
-class MIPSDecoder:
-    """Clase principal del decodificador MIPS"""
+from mips_isa import (INSTRUCTIONS, KIND_JUMP, KIND_NOP, KIND_R, KIND_SHIFT,
+                      REGISTERS, R_TYPE_FUNCT, I_TYPE_OPCODE, J_TYPE_OPCODE,
+                      encode, parse_immediate, parse_register, to_twos_complement)
+from mips_cache import AssemblyCache, DEFAULT_MAX_BYTES as DEFAULT_CACHE_BYTES
+from mips_output import format_for_path, write_stream, write_words
+
+
+_LEADING_SPACE = re.compile(r'\s*')
+
+# tkinter se importa solo en la ruta --gui (load_tk): el modo de línea de
+# comandos no paga el arranque de Tk y funciona sin pantalla
+tk = ttk = scrolledtext = filedialog = messagebox = tkfont = None
+
+
+def load_tk():
+    """Importa tkinter (solo la interfaz gráfica lo necesita)"""
+    global tk, ttk, scrolledtext, filedialog, messagebox, tkfont
+    if tk is None:
+        import tkinter as tk
+        from tkinter import ttk, scrolledtext, filedialog, messagebox
+        from tkinter import font as tkfont
+
+
+# Cambiar si cambia la lógica de codificación (invalida la caché en disco)
+ENCODER_VERSION = '1'
+
+
+class AssemblyResult(Sequence):
+    """Resultado compacto del ensamblado.
     
-    def __init__(self):
-        # Tabla de registros MIPS
-        self.registers = {
-            '$zero': 0, '$0': 0,
-            '$at': 1, '$1': 1,
-            '$v0': 2, '$v1': 3, '$2': 2, '$3': 3,
-            '$a0': 4, '$a1': 5, '$a2': 6, '$a3': 7,
-            '$4': 4, '$5': 5, '$6': 6, '$7': 7,
-            '$t0': 8, '$t1': 9, '$t2': 10, '$t3': 11,
-            '$t4': 12, '$t5': 13, '$t6': 14, '$t7': 15,
-            '$8': 8, '$9': 9, '$10': 10, '$11': 11,
-            '$12': 12, '$13': 13, '$14': 14, '$15': 15,
-            '$s0': 16, '$s1': 17, '$s2': 18, '$s3': 19,
-            '$s4': 20, '$s5': 21, '$s6': 22, '$s7': 23,
-            '$16': 16, '$17': 17, '$18': 18, '$19': 19,
-            '$20': 20, '$21': 21, '$22': 22, '$23': 23,
-            '$t8': 24, '$t9': 25,
-            '$24': 24, '$25': 25,
-            '$k0': 26, '$k1': 27,
-            '$26': 26, '$27': 27,
-            '$gp': 28, '$28': 28,
-            '$sp': 29, '$29': 29,
-            '$fp': 30, '$30': 30,
-            '$ra': 31, '$31': 31
-        }
-        
-        # Opcodes para instrucciones R-type (opcode = 000000)
-        self.r_type_funct = {
-            'add':  0b100000,  # 32
-            'sub':  0b100010,  # 34
-            'and':  0b100100,  # 36
-            'or':   0b100101,  # 37
-            'slt':  0b101010,  # 42
-            'sll':  0b000000,  # 0
-            'srl':  0b000010,  # 2
-        }
-        
-        # Opcodes para instrucciones I-type
-        self.i_type_opcode = {
-            'addi': 0b001000,  # 8
-            'andi': 0b001100,  # 12
-            'ori':  0b001101,  # 13
-            'xori': 0b001110,  # 14
-            'slti': 0b001010,  # 10
-            'beq':  0b000100,  # 4
-            'bne':  0b000101,  # 5
-            'lw':   0b100011,  # 35
-            'sw':   0b101011,  # 43
-            'lui':  0b001111,  # 15
+    Guarda las palabras en un array('I') y, en arreglos paralelos, el número
+    de línea y la posición de la línea en el texto original. El texto fuente
+    de cada instrucción se obtiene del buffer original solo cuando se pide.
+    Cada elemento se ve como el diccionario de second_pass:
+    {'address', 'binary', 'line', 'source'}.
+    """
+    
+    def __init__(self, code=''):
+        self.code = code                # Buffer original (sin copiar)
+        self.words = array('I')
+        self.lines = array('I')
+        self.offsets = array('L')       # Inicio de la línea en self.code
+    
+    @staticmethod
+    def line_starts(code):
+        """Inicio de cada línea numerada como code.strip().split('\\n')"""
+        first = code.count('\n', 0, _LEADING_SPACE.match(code).end())
+        starts = [0]
+        pos = code.find('\n')
+        while pos >= 0:
+            starts.append(pos + 1)
+            pos = code.find('\n', pos + 1)
+        return starts[first:]
+    
+    @classmethod
+    def from_records(cls, code, records):
+        """Construye el resultado desde la lista de diccionarios de second_pass"""
+        result = cls(code)
+        starts = cls.line_starts(code)
+        for record in records:
+            result.append(record['binary'], record['line'],
+                          starts[record['line'] - 1])
+        return result
+    
+    @classmethod
+    def from_lines(cls, code, words, lines):
+        """Construye el resultado desde las palabras y números de línea"""
+        result = cls(code)
+        starts = cls.line_starts(code)
+        result.words = array('I', words)
+        result.lines = array('I', lines)
+        result.offsets = array('L', [starts[line - 1] for line in lines])
+        return result
+    
+    def append(self, binary, line_num, offset):
+        self.words.append(binary)
+        self.lines.append(line_num)
+        self.offsets.append(offset)
+    
+    def source(self, index):
+        """Línea fuente (sin espacios a los lados) de la instrucción 'index'"""
+        start = self.offsets[index]
+        end = self.code.find('\n', start)
+        if end < 0:
+            end = len(self.code)
+        return self.code[start:end].strip()
+    
+    def __len__(self):
+        return len(self.words)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self.words)
+        return {
+            'address': index * 4,
+            'binary': self.words[index],
+            'line': self.lines[index],
+            'source': self.source(index)
         }
-        
-        # Opcodes para instrucciones J-type
-        self.j_type_opcode = {
-            'j':    0b000010,  # 2
-            'jal':  0b000011,  # 3
+    
+    def __iter__(self):
+        for index in range(len(self.words)):
+            yield self[index]
+    
+    def nbytes(self):
+        """Bytes usados por el resultado (sin contar el buffer original)"""
+        return (sys.getsizeof(self) + sys.getsizeof(self.words) +
+                sys.getsizeof(self.lines) + sys.getsizeof(self.offsets))
+    
+    def bytes_per_instruction(self):
+        """Bytes por instrucción del resultado"""
+        return self.nbytes() / len(self) if len(self) else 0.0
+
+
+class AssemblyStats:
+    """Tiempos y contadores por fase de un ensamblado.
+    
+    Solo se llenan si se piden (MIPSDecoder(on_stats=...) o --stats): en
+    ese caso assemble() recorre las fases por separado, para poder medir
+    cada una, en lugar de la pasada única.
+    """
+    
+    PHASES = ('lectura', 'limpieza', 'etiquetas', 'codificacion', 'escritura')
+    
+    def __init__(self):
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+        self.lines = 0
+        self.labels = 0
+        self.instructions = {}      # mnemónico -> cantidad (solo las válidas)
+        self.errors = 0
+        self.bytes_written = 0
+        self.cache_hit = None       # None si no se usó caché
+    
+    def timed(self, phase, func, *args):
+        """Llama func(*args) y suma su tiempo a la fase"""
+        start = time.perf_counter()
+        value = func(*args)
+        self.times[phase] += time.perf_counter() - start
+        return value
+    
+    def count_words(self, words):
+        """Cuenta mnemónicos desde las palabras ya codificadas (acierto de
+        caché: no hay texto que recorrer)"""
+        from collections import Counter
+        from mips_disassembler import MNEMONICS, split_fields
+        for mid, count in Counter(int(mid) for mid in split_fields(words)['id']).items():
+            if mid >= 0:
+                name = MNEMONICS[mid]
+                self.instructions[name] = self.instructions.get(name, 0) + count
+    
+    def by_type(self):
+        """Instrucciones por formato: {'R': n, 'I': n, 'J': n, 'nop': n}"""
+        totals = {'R': 0, 'I': 0, 'J': 0, 'nop': 0}
+        for name, count in self.instructions.items():
+            kind = INSTRUCTIONS[name][1]
+            group = ('nop' if kind == KIND_NOP else
+                     'R' if kind in (KIND_R, KIND_SHIFT) else
+                     'J' if kind == KIND_JUMP else 'I')
+            totals[group] += count
+        return totals
+    
+    def as_dict(self):
+        return {
+            'tiempos_s': dict(self.times),
+            'total_s': sum(self.times.values()),
+            'lineas': self.lines,
+            'etiquetas': self.labels,
+            'instrucciones': sum(self.instructions.values()),
+            'por_tipo': self.by_type(),
+            'por_mnemonico': dict(sorted(self.instructions.items())),
+            'errores': self.errors,
+            'bytes_escritos': self.bytes_written,
+            'cache': self.cache_hit,
         }
+    
+    def summary(self):
+        """Resumen en texto (para --stats)"""
+        info = self.as_dict()
+        total = info['total_s']
+        rows = ["Estadísticas:"]
+        for phase, seconds in info['tiempos_s'].items():
+            share = seconds / total if total else 0.0
+            rows.append(f"  {phase:<13} {seconds * 1000:9.2f} ms  {share:6.1%}")
+        rows.append(f"  {'total':<13} {total * 1000:9.2f} ms")
+        rows.append(f"  Líneas leídas: {info['lineas']}  |  Etiquetas: {info['etiquetas']}  |  "
+                    f"Errores: {info['errores']}  |  Bytes escritos: {info['bytes_escritos']}")
+        types = ', '.join(f"{group} {count}" for group, count in info['por_tipo'].items())
+        rows.append(f"  Instrucciones: {info['instrucciones']}  ({types})")
+        if info['por_mnemonico']:
+            rows.append("  Por mnemónico: " + ', '.join(
+                f"{name} {count}" for name, count in info['por_mnemonico'].items()))
+        if self.cache_hit is not None:
+            rows.append(f"  Caché: {'acierto' if self.cache_hit else 'fallo'}")
+        return '\n'.join(rows)
+
+
+class MIPSDecoder:
+    """Clase principal del decodificador MIPS"""
+    
+    def __init__(self, on_stats=None):
+        # Tablas compartidas con txt.py (mips_isa)
+        self.registers = REGISTERS
+        self.r_type_funct = R_TYPE_FUNCT
+        self.i_type_opcode = I_TYPE_OPCODE
+        self.j_type_opcode = J_TYPE_OPCODE
         
         self.labels = {}
         self.errors = []
         
+        # Callback opcional: recibe un AssemblyStats al terminar cada
+        # ensamblado (None = sin medición, sin costo)
+        self.on_stats = on_stats
+        
     def parse_register(self, reg_str):
         """Convierte string de registro a número"""
-        reg_str = reg_str.strip().lower()
-        if reg_str in self.registers:
-            return self.registers[reg_str]
-        raise ValueError(f"Registro inválido: {reg_str}")
+        return parse_register(reg_str)
     
     def parse_immediate(self, imm_str):
         """Convierte string de inmediato a número"""
-        imm_str = imm_str.strip()
-        try:
-            if imm_str.startswith('0x') or imm_str.startswith('0X'):
-                return int(imm_str, 16)
-            elif imm_str.startswith('0b') or imm_str.startswith('0B'):
-                return int(imm_str, 2)
-            else:
-                return int(imm_str)
-        except ValueError:
-            raise ValueError(f"Inmediato inválido: {imm_str}")
+        return parse_immediate(imm_str)
     
     def to_twos_complement(self, value, bits):
         """Convierte a complemento a 2"""
-        if value < 0:
-            value = (1 << bits) + value
-        return value & ((1 << bits) - 1)
+        return to_twos_complement(value, bits)
     
-    def encode_r_type(self, parts, line_num):
-        """Codifica instrucción R-type"""
-        instr = parts[0].lower()
-        
-        if instr == 'nop':
-            return 0x00000000
-        
-        if instr in ['sll', 'srl']:
-            # Formato: sll rd, rt, shamt
-            rd = self.parse_register(parts[1])
-            rt = self.parse_register(parts[2])
-            shamt = self.parse_immediate(parts[3])
-            rs = 0
-        else:
-            # Formato: add rd, rs, rt
-            rd = self.parse_register(parts[1])
-            rs = self.parse_register(parts[2])
-            rt = self.parse_register(parts[3])
-            shamt = 0
-        
-        funct = self.r_type_funct[instr]
-        
-        # Formato: opcode(6) | rs(5) | rt(5) | rd(5) | shamt(5) | funct(6)
-        instruction = (0 << 26) | (rs << 21) | (rt << 16) | (rd << 11) | (shamt << 6) | funct
-        return instruction
+    def encode_parts(self, parts, address):
+        """Codifica una instrucción separada en partes: palabra base de la
+        tabla OR los operandos (con las etiquetas ya recolectadas)"""
+        return encode(parts, self.labels, address)
     
-    def encode_i_type(self, parts, line_num, current_addr):
-        """Codifica instrucción I-type"""
-        instr = parts[0].lower()
-        opcode = self.i_type_opcode[instr]
-        
-        if instr in ['lw', 'sw']:
-            # Formato: lw rt, offset(rs)
-            rt = self.parse_register(parts[1])
-            # Parsear offset(rs)
-            match = re.match(r'(-?\d+)\((\$\w+)\)', parts[2])
-            if match:
-                offset = self.parse_immediate(match.group(1))
-                rs = self.parse_register(match.group(2))
-            else:
-                raise ValueError(f"Formato inválido para {instr}: {parts[2]}")
-            imm = self.to_twos_complement(offset, 16)
-            
-        elif instr in ['beq', 'bne']:
-            # Formato: beq rs, rt, label
-            rs = self.parse_register(parts[1])
-            rt = self.parse_register(parts[2])
-            label = parts[3].strip()
-            
-            if label in self.labels:
-                target_addr = self.labels[label]
-                # Offset relativo al PC+4 (en palabras)
-                offset = (target_addr - (current_addr + 4)) // 4
-                imm = self.to_twos_complement(offset, 16)
-            else:
-                # Intentar como número
-                try:
-                    imm = self.to_twos_complement(self.parse_immediate(label), 16)
-                except:
-                    raise ValueError(f"Etiqueta no encontrada: {label}")
-                    
-        elif instr == 'lui':
-            # Formato: lui rt, imm
-            rt = self.parse_register(parts[1])
-            rs = 0
-            imm = self.to_twos_complement(self.parse_immediate(parts[2]), 16)
-            
-        else:
-            # Formato: addi rt, rs, imm
-            rt = self.parse_register(parts[1])
-            rs = self.parse_register(parts[2])
-            imm = self.to_twos_complement(self.parse_immediate(parts[3]), 16)
-        
-        # Formato: opcode(6) | rs(5) | rt(5) | immediate(16)
-        instruction = (opcode << 26) | (rs << 21) | (rt << 16) | imm
-        return instruction
+    def split_line(self, line):
+        """Quita el comentario y separa la etiqueta: (etiqueta, instrucción)"""
+        line = line.partition('#')[0].strip()
+        if ':' in line:
+            label, line = line.split(':', 1)
+            return label.strip(), line.strip()
+        return None, line
     
-    def encode_j_type(self, parts, line_num):
-        """Codifica instrucción J-type"""
-        instr = parts[0].lower()
-        opcode = self.j_type_opcode[instr]
-        
-        label = parts[1].strip()
-        if label in self.labels:
-            address = self.labels[label] // 4  # Dirección en palabras
-        else:
-            try:
-                address = self.parse_immediate(label) // 4
-            except:
-                raise ValueError(f"Etiqueta no encontrada: {label}")
-        
-        # Formato: opcode(6) | address(26)
-        instruction = (opcode << 26) | (address & 0x03FFFFFF)
-        return instruction
+    def encode_line(self, line, line_num, address):
+        """Codifica el texto de una instrucción (sin etiqueta ni comentario)"""
+        # Separar por espacios y comas
+        return encode(line.replace(',', ' ').split(), self.labels, address)
     
     def first_pass(self, code):
         """Primera pasada: recolectar etiquetas"""
+        self.collect_labels(code.strip().split('\n'))
+    
+    def second_pass(self, code):
+        """Segunda pasada: codificar instrucciones"""
+        return list(self.encode_lines(code.strip().split('\n')))
+    
+    def collect_labels(self, lines):
+        """Recolecta etiquetas de cualquier iterable de líneas"""
         self.labels = {}
         address = 0
-        lines = code.strip().split('\n')
         
         for line in lines:
-            # Remover comentarios
-            line = re.sub(r'#.*$', '', line).strip()
-            if not line:
-                continue
-            
-            # Buscar etiquetas
-            if ':' in line:
-                parts = line.split(':')
-                label = parts[0].strip()
+            label, line = self.split_line(line)
+            if label is not None:
                 self.labels[label] = address
-                line = ':'.join(parts[1:]).strip()
-                
             if line:  # Si hay instrucción después de la etiqueta
                 address += 4
     
-    def second_pass(self, code):
-        """Segunda pasada: codificar instrucciones"""
-        instructions = []
+    def encode_lines(self, lines):
+        """Generador: codifica cada línea usando las etiquetas ya recolectadas"""
         self.errors = []
         address = 0
-        lines = code.strip().split('\n')
         
         for line_num, line in enumerate(lines, 1):
-            original_line = line
-            # Remover comentarios
-            line = re.sub(r'#.*$', '', line).strip()
-            if not line:
+            _, text = self.split_line(line)
+            if not text:
                 continue
             
-            # Remover etiquetas
-            if ':' in line:
-                line = line.split(':', 1)[1].strip()
+            try:
+                binary = self.encode_line(text, line_num, address)
+            except Exception as e:
+                self.errors.append(f"Línea {line_num}: {str(e)}")
+                continue
             
-            if not line:
+            yield {
+                'address': address,
+                'binary': binary,
+                'line': line_num,
+                'source': line.strip()
+            }
+            address += 4
+    
+    def single_pass(self, code):
+        """Pasada única: codifica al leer y parcha las etiquetas al final.
+        
+        Las instrucciones beq/bne/j/jal se validan (registros) al leerlas y se
+        guardan en una tabla de pendientes; al terminar, cuando ya se conocen
+        todas las etiquetas, se codifican en su lugar. Si alguna etiqueta no
+        existe se repite el ensamblado en dos pasadas, para que los errores y
+        las direcciones sean exactamente los mismos.
+        """
+        self.labels = {}
+        self.errors = []
+        result = AssemblyResult(code)
+        fixups = []
+        label_addr = 0      # Dirección según first_pass (cuenta líneas con error)
+        address = 0         # Dirección según second_pass (solo las válidas)
+        
+        # Misma numeración que code.strip().split('\n') sin copiar el texto:
+        # se saltan las líneas en blanco iniciales
+        lines = code.split('\n')
+        first = code.count('\n', 0, _LEADING_SPACE.match(code).end())
+        offset = sum(len(line) + 1 for line in lines[:first])
+        
+        for line_num, line in enumerate(lines[first:], 1):
+            line_start = offset
+            offset += len(line) + 1
+            label, text = self.split_line(line)
+            if label is not None:
+                self.labels[label] = label_addr
+            if not text:
                 continue
+            label_addr += 4
             
             try:
-                # Parsear instrucción
-                # Separar por espacios y comas
-                parts = re.split(r'[,\s]+', line)
-                parts = [p.strip() for p in parts if p.strip()]
-                
-                if not parts:
-                    continue
-                
+                parts = text.replace(',', ' ').split()
                 instr = parts[0].lower()
                 
-                if instr == 'nop':
-                    binary = 0x00000000
-                elif instr in self.r_type_funct:
-                    binary = self.encode_r_type(parts, line_num)
-                elif instr in self.i_type_opcode:
-                    binary = self.encode_i_type(parts, line_num, address)
+                if instr in ('beq', 'bne'):
+                    # Validar registros ahora; la etiqueta se resuelve al final
+                    self.parse_register(parts[1])
+                    self.parse_register(parts[2])
+                    if len(parts) < 4:
+                        raise IndexError("list index out of range")
+                    fixups.append((len(result), parts, line_num, address))
+                    binary = 0
                 elif instr in self.j_type_opcode:
-                    binary = self.encode_j_type(parts, line_num)
+                    if len(parts) < 2:
+                        raise IndexError("list index out of range")
+                    fixups.append((len(result), parts, line_num, address))
+                    binary = 0
                 else:
-                    raise ValueError(f"Instrucción desconocida: {instr}")
+                    binary = encode(parts, self.labels, address)
                 
-                instructions.append({
-                    'address': address,
-                    'binary': binary,
-                    'line': line_num,
-                    'source': original_line.strip()
-                })
+                result.append(binary, line_num, line_start)
                 address += 4
                 
             except Exception as e:
                 self.errors.append(f"Línea {line_num}: {str(e)}")
         
-        return instructions
+        # Parchar referencias a etiquetas
+        words = result.words
+        for index, parts, line_num, current_addr in fixups:
+            try:
+                words[index] = self.encode_parts(parts, current_addr)
+            except ValueError:
+                # Etiqueta inexistente: la instrucción no se emite y cambian
+                # las direcciones siguientes, igual que en dos pasadas
+                self.first_pass(code)
+                return AssemblyResult.from_records(code, self.second_pass(code))
+        
+        return result
     
-    def assemble(self, code):
-        """Ensambla código MIPS"""
-        self.first_pass(code)
-        return self.second_pass(code)
+    def encoding_version(self):
+        """Huella de las tablas de codificación (parte de la llave de caché)"""
+        import hashlib
+        tables = repr((sorted(self.registers.items()),
+                       sorted(self.r_type_funct.items()),
+                       sorted(self.i_type_opcode.items()),
+                       sorted(self.j_type_opcode.items())))
+        return f"{ENCODER_VERSION}:{hashlib.sha256(tables.encode()).hexdigest()[:16]}"
+    
+    def assemble(self, code, one_pass=True, cache=None, stats=None):
+        """Ensambla código MIPS y regresa un AssemblyResult (una pasada por
+        defecto, mismo resultado que first_pass + second_pass).
+        
+        'cache' puede ser un AssemblyCache o un directorio: si el mismo
+        texto ya se ensambló con las mismas tablas se regresa la imagen
+        guardada (con sus errores y etiquetas) sin volver a codificar.
+        
+        Con 'stats' (AssemblyStats) o self.on_stats se miden las fases; el
+        callback solo se llama si no se pasó 'stats' (quien lo pasa lo
+        completa, p. ej. assemble_to_file con la escritura).
+        """
+        notify = stats is None and self.on_stats is not None
+        if notify:
+            stats = AssemblyStats()
+        
+        result = None
+        if cache is not None:
+            if not isinstance(cache, AssemblyCache):
+                cache = AssemblyCache(cache)
+            key = cache.key(code, self.encoding_version())
+            entry = cache.get(key)
+            if entry is not None:
+                words, lines, self.errors, self.labels = entry
+                result = AssemblyResult.from_lines(code, words, lines)
+        
+        if result is not None:
+            if stats is not None:
+                stats.cache_hit = True
+                stats.lines += code.strip().count('\n') + 1
+                stats.count_words(result.words)
+                stats.labels = len(self.labels)
+                stats.errors = len(self.errors)
+        else:
+            if stats is not None:
+                result = self.assemble_phases(code, stats)
+                stats.cache_hit = False if cache is not None else None
+            elif one_pass:
+                result = self.single_pass(code)
+            else:
+                self.first_pass(code)
+                result = AssemblyResult.from_records(code, self.second_pass(code))
+            
+            if cache is not None:
+                cache.put(key, result.words, result.lines, self.errors, self.labels)
+        
+        if notify:
+            self.on_stats(stats)
+        return result
+    
+    def assemble_phases(self, code, stats):
+        """Ensamblado en dos pasadas con cada fase por separado (limpieza
+        de comentarios, etiquetas, codificación) para medirlas en 'stats'.
+        Mismo resultado que first_pass + second_pass."""
+        lines = code.strip().split('\n')
+        split = stats.timed('limpieza', lambda: [self.split_line(line) for line in lines])
+        stats.lines += len(lines)
+        
+        stats.timed('etiquetas', self.collect_split_labels, split)
+        stats.labels = len(self.labels)
+        
+        result = stats.timed('codificacion', self.encode_split, code, split,
+                             stats.instructions)
+        stats.errors = len(self.errors)
+        return result
+    
+    def collect_split_labels(self, split):
+        """collect_labels sobre líneas ya separadas en (etiqueta, instrucción)"""
+        self.labels = {}
+        address = 0
+        for label, text in split:
+            if label is not None:
+                self.labels[label] = address
+            if text:
+                address += 4
+    
+    def encode_split(self, code, split, counts):
+        """encode_lines sobre líneas ya separadas; cuenta los mnemónicos
+        codificados en 'counts'"""
+        self.errors = []
+        result = AssemblyResult(code)
+        starts = AssemblyResult.line_starts(code)
+        address = 0
+        
+        for line_num, (_, text) in enumerate(split, 1):
+            if not text:
+                continue
+            try:
+                binary = self.encode_line(text, line_num, address)
+            except Exception as e:
+                self.errors.append(f"Línea {line_num}: {str(e)}")
+                continue
+            result.append(binary, line_num, starts[line_num - 1])
+            name = text.split(None, 1)[0].lower()
+            counts[name] = counts.get(name, 0) + 1
+            address += 4
+        return result
+    
+    def iter_source_lines(self, lines):
+        """Recorre líneas de un archivo o iterable con la misma numeración
+        que code.strip().split('\\n'): se omiten las líneas en blanco
+        iniciales y se quita el salto de línea final"""
+        started = False
+        for line in lines:
+            line = line.rstrip('\n')
+            if not started:
+                if not line.strip():
+                    continue
+                started = True
+            yield line
+    
+    def assemble_stream(self, source):
+        """Generador: ensambla un archivo (ruta) o un iterable de líneas sin
+        cargar todo el texto en memoria.
+        
+        Hace una pasada barata para recolectar etiquetas y otra para
+        codificar. Con una ruta se vuelve a abrir el archivo; con un iterable
+        las líneas se copian a un archivo temporal durante la primera pasada.
+        Produce los mismos diccionarios (y errores) que assemble().
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'r') as f:
+                self.collect_labels(self.iter_source_lines(f))
+            with open(source, 'r') as f:
+                yield from self.encode_lines(self.iter_source_lines(f))
+            return
+        
+        import tempfile
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            def copy(lines):
+                for line in lines:
+                    spool.write(line if line.endswith('\n') else line + '\n')
+                    yield line
+            self.collect_labels(self.iter_source_lines(copy(source)))
+            spool.seek(0)
+            yield from self.encode_lines(self.iter_source_lines(spool))
     
     def format_binary(self, value):
         """Formatea valor como binario de 32 bits"""
@@ -296,15 +537,310 @@ class MIPSDecoder:
         return format(value, '08x')
 
 
+class IncrementalAssembler:
+    """Ensamblado incremental para el editor.
+    
+    Recuerda cómo se codificó cada línea. Con un texto nuevo solo vuelve a
+    codificar las líneas que cambiaron (prefijo y sufijo comunes se
+    reutilizan) y las beq/bne/j/jal cuyo destino se movió; el resto de las
+    palabras se copian. El resultado es el mismo que MIPSDecoder.assemble(),
+    incluyendo errores y etiquetas.
+    """
+    
+    EMPTY, WORD, ERROR, BRANCH = range(4)
+    
+    def __init__(self, decoder=None):
+        self.decoder = decoder or MIPSDecoder()
+        self.code = None
+        self.result = None
+        self.reencoded = 0      # Líneas/saltos codificados en la última llamada
+        self._lines = []
+        # Por línea: [etiqueta, tipo, valor, llave del salto, palabra, error]
+        self._entries = []
+    
+    def classify(self, line, line_num):
+        """Codifica una línea que no depende de etiquetas ni de su dirección"""
+        label, text = self.decoder.split_line(line)
+        if not text:
+            return [label, self.EMPTY, None, None, None, None]
+        parts = text.replace(',', ' ').split()
+        instr = parts[0].lower()
+        if instr in ('beq', 'bne') or instr in self.decoder.j_type_opcode:
+            return [label, self.BRANCH, parts, None, None, None]
+        try:
+            return [label, self.WORD, self.decoder.encode_line(text, line_num, 0),
+                    None, None, None]
+        except Exception as e:
+            return [label, self.ERROR, str(e), None, None, None]
+    
+    def assemble(self, code):
+        """Ensambla 'code' reutilizando la última llamada"""
+        self.reencoded = 0
+        if code == self.code:
+            return self.result
+        
+        # Misma numeración que code.strip().split('\n')
+        first = code.count('\n', 0, _LEADING_SPACE.match(code).end())
+        all_lines = code.split('\n')
+        lines = all_lines[first:]
+        
+        # Prefijo y sufijo sin cambios
+        old_lines, old_entries = self._lines, self._entries
+        limit = min(len(lines), len(old_lines))
+        head = 0
+        while head < limit and lines[head] == old_lines[head]:
+            head += 1
+        tail = 0
+        while (tail < limit - head and
+               lines[-1 - tail] == old_lines[-1 - tail]):
+            tail += 1
+        
+        middle = [self.classify(line, line_num)
+                  for line_num, line in enumerate(lines[head:len(lines) - tail],
+                                                  head + 1)]
+        self.reencoded += len(middle)
+        entries = (old_entries[:head] + middle +
+                   old_entries[len(old_entries) - tail:])
+        
+        # Etiquetas (direcciones como en first_pass)
+        decoder = self.decoder
+        labels = {}
+        label_addr = 0
+        for entry in entries:
+            if entry[0] is not None:
+                labels[entry[0]] = label_addr
+            if entry[1] != self.EMPTY:
+                label_addr += 4
+        decoder.labels = labels
+        decoder.errors = errors = []
+        
+        result = AssemblyResult(code)
+        offset = sum(len(line) + 1 for line in all_lines[:first])
+        address = 0
+        for line_num, (line, entry) in enumerate(zip(lines, entries), 1):
+            line_start = offset
+            offset += len(line) + 1
+            kind = entry[1]
+            if kind == self.WORD:
+                result.append(entry[2], line_num, line_start)
+                address += 4
+                continue
+            if kind == self.ERROR:
+                errors.append(f"Línea {line_num}: {entry[2]}")
+                continue
+            if kind == self.EMPTY:
+                continue
+            
+            # beq/bne dependen de la distancia al destino; j/jal del destino
+            parts = entry[2]
+            jump = parts[0].lower() in decoder.j_type_opcode
+            label_index = 1 if jump else 3
+            target = (labels.get(parts[label_index].strip())
+                      if len(parts) > label_index else None)
+            if target is None:
+                key = ('inmediato',)        # No depende de la dirección
+            else:
+                key = target if jump else (target - address, None)
+            if key != entry[3]:
+                self.reencoded += 1
+                try:
+                    entry[4] = decoder.encode_parts(parts, address)
+                    entry[5] = None
+                except Exception as e:
+                    entry[4], entry[5] = None, str(e)
+                entry[3] = key
+            if entry[5] is not None:
+                errors.append(f"Línea {line_num}: {entry[5]}")
+                continue
+            result.append(entry[4], line_num, line_start)
+            address += 4
+        
+        self.code = code
+        self.result = result
+        self._lines = lines
+        self._entries = entries
+        return result
+
+
+class OutputListing:
+    """Renglones de la salida del GUI, calculados bajo demanda desde un
+    AssemblyResult (nunca se arma el texto completo)"""
+    
+    def __init__(self, result, errors=(), format_type="binary"):
+        self.result = result
+        self.format_type = format_type
+        n = len(result) if result is not None else 0
+        
+        head = []
+        if errors:
+            head.append("=== ERRORES ===")
+            head.extend(f"❌ {error}" for error in errors)
+            head.append("")
+        if n:
+            head += ["// Código generado por Decodificador MIPS32",
+                     "// Proyecto Final - Arquitectura de Computadoras",
+                     f"// Total: {n} instrucciones",
+                     "// " + "="*60,
+                     "",
+                     "// === FORMATO PARA MEMORIA (instrucciones.txt) ==="]
+        self.head = head
+        self.count = n
+        self.memory_start = len(head)
+        # Renglón en blanco + encabezado del detalle
+        self.detail_start = self.memory_start + n + 2
+        self.rows_per_instr = 4 if format_type == "both" else 3
+        self.total = (self.detail_start + n * self.rows_per_instr) if n else len(head)
+    
+    def __len__(self):
+        return self.total
+    
+    def row(self, i):
+        """Texto del renglón 'i'"""
+        if i < self.memory_start:
+            return self.head[i]
+        words = self.result.words
+        i -= self.memory_start
+        if i < self.count:
+            return format(words[i], '032b')
+        i -= self.count
+        if i == 0:
+            return ""
+        if i == 1:
+            return "// === DETALLE DE INSTRUCCIONES ==="
+        index, k = divmod(i - 2, self.rows_per_instr)
+        if k == 0:
+            return f"// 0x{index * 4:04X}: {self.result.source(index)}"
+        if k == self.rows_per_instr - 1:
+            return ""
+        word = words[index]
+        if self.format_type == "binary":
+            return format(word, '032b')
+        if self.format_type == "hex":
+            return format(word, '08x')
+        return f"// BIN: {word:032b}" if k == 1 else f"// HEX: {word:08x}"
+    
+    def rows(self, start, stop):
+        return [self.row(i) for i in range(start, min(stop, self.total))]
+    
+    def row_of_address(self, address):
+        """Renglón del detalle de la instrucción en 'address' (o None)"""
+        index = address // 4
+        if address % 4 or not 0 <= index < self.count:
+            return None
+        return self.detail_start + index * self.rows_per_instr
+
+
+class ListingView:
+    """Vista virtual de un OutputListing: el widget Text solo contiene los
+    renglones visibles y la barra de desplazamiento se maneja a mano"""
+    
+    def __init__(self, parent, width=60, height=25, font=('Consolas', 10)):
+        load_tk()
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+        
+        self.text = tk.Text(self.frame, width=width, height=height, font=font,
+                            wrap=tk.NONE, state=tk.DISABLED)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL,
+                                       command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.text.tag_configure('marca', background='#fff3a0')
+        
+        self.model = None
+        self.first = 0          # Primer renglón visible
+        self.visible = height   # Renglones que caben en el widget
+        self.marked = None      # Renglón resaltado (ir a dirección)
+        self.linespace = tkfont.Font(font=font).metrics('linespace')
+        
+        self.text.bind('<Configure>', self.on_resize)
+        self.text.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units', 3))
+        self.text.bind('<Button-4>', lambda e: self.scroll(-1, 'units', 3))
+        self.text.bind('<Button-5>', lambda e: self.scroll(1, 'units', 3))
+        self.text.bind('<Button-1>', lambda e: self.text.focus_set())
+        for key, args in (('<Up>', (-1, 'units')), ('<Down>', (1, 'units')),
+                          ('<Prior>', (-1, 'pages')), ('<Next>', (1, 'pages'))):
+            self.text.bind(key, lambda e, args=args: self.scroll(*args))
+        self.text.bind('<Control-Home>', lambda e: self.show(0))
+        self.text.bind('<Control-End>', lambda e: self.show(len(self.model or ())))
+    
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+    
+    def set_model(self, model):
+        """Cambia el contenido (mantiene la posición si es posible)"""
+        self.model = model
+        self.marked = None
+        self.show(self.first)
+    
+    def on_resize(self, event):
+        visible = max(1, event.height // self.linespace)
+        if visible != self.visible:
+            self.visible = visible
+            self.redraw()
+    
+    def yview(self, *args):
+        """Comando de la barra: ('moveto', fracción) o ('scroll', n, unidad)"""
+        if args[0] == 'moveto':
+            self.show(int(float(args[1]) * len(self.model or ())))
+        elif args[0] == 'scroll':
+            self.scroll(int(args[1]), args[2])
+    
+    def scroll(self, amount, what='units', step=1):
+        if what == 'pages':
+            step = max(1, self.visible - 1)
+        self.show(self.first + amount * step)
+        return 'break'
+    
+    def show(self, first):
+        total = len(self.model or ())
+        self.first = max(0, min(first, total - self.visible))
+        self.redraw()
+        return 'break'
+    
+    def jump_to(self, row):
+        """Muestra 'row' en el primer tercio de la vista y lo resalta"""
+        self.show(row - self.visible // 3)
+        self.marked = row
+        self.redraw()
+    
+    def redraw(self):
+        """Dibuja solo los renglones visibles"""
+        model = self.model
+        total = len(model or ())
+        rows = model.rows(self.first, self.first + self.visible) if model else []
+        
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", '\n'.join(rows))
+        if self.marked is not None and 0 <= self.marked - self.first < len(rows):
+            line = self.marked - self.first + 1
+            self.text.tag_add('marca', f"{line}.0", f"{line}.end+1c")
+        self.text.config(state=tk.DISABLED)
+        
+        if total:
+            self.scrollbar.set(self.first / total,
+                               min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def clear(self):
+        self.set_model(None)
+
+
 class MIPSDecoderGUI:
     """Interfaz gráfica del decodificador MIPS"""
     
     def __init__(self, root):
+        load_tk()
         self.root = root
         self.root.title("Decodificador MIPS32 - Arquitectura de Computadoras")
         self.root.geometry("1200x800")
         
         self.decoder = MIPSDecoder()
+        self.assembler = IncrementalAssembler(self.decoder)
+        self._pending = None    # Re-ensamblado programado tras una edición
         self.setup_ui()
         self.load_example()
     
@@ -336,6 +872,7 @@ class MIPSDecoderGUI:
         self.input_text = scrolledtext.ScrolledText(left_frame, width=50, height=25,
                                                      font=('Consolas', 10))
         self.input_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.input_text.bind('<<Modified>>', self.on_edit)
         
         # ===== Frame derecho: Salida =====
         right_frame = ttk.LabelFrame(main_frame, text="Código Binario (32 bits)", padding="5")
@@ -343,9 +880,18 @@ class MIPSDecoderGUI:
         right_frame.columnconfigure(0, weight=1)
         right_frame.rowconfigure(0, weight=1)
         
-        self.output_text = scrolledtext.ScrolledText(right_frame, width=60, height=25,
-                                                      font=('Consolas', 10))
-        self.output_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Solo se dibujan los renglones visibles (ver ListingView)
+        self.listing = ListingView(right_frame, width=60, height=25)
+        self.listing.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        goto_frame = ttk.Frame(right_frame)
+        goto_frame.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Label(goto_frame, text="Ir a dirección:").grid(row=0, column=0)
+        self.goto_entry = ttk.Entry(goto_frame, width=12)
+        self.goto_entry.grid(row=0, column=1, padx=5)
+        self.goto_entry.bind('<Return>', lambda e: self.goto_address())
+        ttk.Button(goto_frame, text="Ir", command=self.goto_address,
+                  width=5).grid(row=0, column=2)
         
         # ===== Frame de botones =====
         button_frame = ttk.Frame(main_frame, padding="5")
@@ -370,11 +916,11 @@ class MIPSDecoderGUI:
         
         self.format_var = tk.StringVar(value="binary")
         ttk.Radiobutton(format_frame, text="Binario", variable=self.format_var,
-                       value="binary", command=self.assemble).grid(row=0, column=0, padx=10)
+                       value="binary", command=self.render).grid(row=0, column=0, padx=10)
         ttk.Radiobutton(format_frame, text="Hexadecimal", variable=self.format_var,
-                       value="hex", command=self.assemble).grid(row=0, column=1, padx=10)
+                       value="hex", command=self.render).grid(row=0, column=1, padx=10)
         ttk.Radiobutton(format_frame, text="Ambos", variable=self.format_var,
-                       value="both", command=self.assemble).grid(row=0, column=2, padx=10)
+                       value="both", command=self.render).grid(row=0, column=2, padx=10)
         
         # ===== Frame de estado =====
         status_frame = ttk.Frame(main_frame)
@@ -392,58 +938,57 @@ class MIPSDecoderGUI:
                     "J-TYPE: j, jal  |  PSEUDO: nop")
         ttk.Label(info_frame, text=info_text, font=('Consolas', 9)).grid(row=0, column=0)
     
+    def on_edit(self, event=None):
+        """Programa un re-ensamblado al editar (se agrupan las teclas)"""
+        if not self.input_text.edit_modified():
+            return
+        self.input_text.edit_modified(False)
+        if self.input_text.compare("end-1c", "==", "1.0"):
+            return
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+        self._pending = self.root.after(250, self.assemble)
+    
     def assemble(self):
         """Ensambla el código y muestra resultado"""
+        self._pending = None
         code = self.input_text.get("1.0", tk.END)
         
         if not code.strip():
             self.status_label.config(text="⚠️ No hay código para ensamblar")
             return
         
-        instructions = self.decoder.assemble(code)
+        # Solo se codifican las líneas editadas (ver IncrementalAssembler)
+        self.assembler.assemble(code)
+        self.render()
+    
+    def render(self):
+        """Muestra el último ensamblado en el formato elegido (sin volver a
+        ensamblar)"""
+        instructions = self.assembler.result
+        if instructions is None:
+            return
         
-        self.output_text.delete("1.0", tk.END)
+        self.listing.set_model(OutputListing(instructions, self.decoder.errors,
+                                             self.format_var.get()))
         
         if self.decoder.errors:
-            self.output_text.insert(tk.END, "=== ERRORES ===\n")
-            for error in self.decoder.errors:
-                self.output_text.insert(tk.END, f"❌ {error}\n")
-            self.output_text.insert(tk.END, "\n")
             self.status_label.config(text=f"❌ {len(self.decoder.errors)} error(es) encontrado(s)")
-        
-        if instructions:
-            # Encabezado
-            format_type = self.format_var.get()
-            self.output_text.insert(tk.END, "// Código generado por Decodificador MIPS32\n")
-            self.output_text.insert(tk.END, "// Proyecto Final - Arquitectura de Computadoras\n")
-            self.output_text.insert(tk.END, f"// Total: {len(instructions)} instrucciones\n")
-            self.output_text.insert(tk.END, "// " + "="*60 + "\n\n")
-            
-            # Solo binario para archivo de memoria
-            self.output_text.insert(tk.END, "// === FORMATO PARA MEMORIA (instrucciones.txt) ===\n")
-            for instr in instructions:
-                self.output_text.insert(tk.END, f"{self.decoder.format_binary(instr['binary'])}\n")
-            
-            self.output_text.insert(tk.END, "\n// === DETALLE DE INSTRUCCIONES ===\n")
-            
-            for instr in instructions:
-                addr = f"0x{instr['address']:04X}"
-                binary = self.decoder.format_binary(instr['binary'])
-                hex_val = self.decoder.format_hex(instr['binary'])
-                source = instr['source']
-                
-                if format_type == "binary":
-                    self.output_text.insert(tk.END, 
-                        f"// {addr}: {source}\n{binary}\n\n")
-                elif format_type == "hex":
-                    self.output_text.insert(tk.END, 
-                        f"// {addr}: {source}\n{hex_val}\n\n")
-                else:  # both
-                    self.output_text.insert(tk.END, 
-                        f"// {addr}: {source}\n// BIN: {binary}\n// HEX: {hex_val}\n\n")
-            
-            if not self.decoder.errors:
-                self.status_label.config(text=f"✅ Ensamblado exitoso: {len(instructions)} instrucciones")
+        elif instructions:
+            self.status_label.config(text=f"✅ Ensamblado exitoso: {len(instructions)} instrucciones")
+    
+    def goto_address(self):
+        """Desplaza la salida hasta la instrucción en la dirección indicada"""
+        text = self.goto_entry.get()
+        model = self.listing.model
+        try:
+            row = model.row_of_address(self.decoder.parse_immediate(text)) if model else None
+        except ValueError:
+            row = None
+        if row is None:
+            self.status_label.config(text=f"⚠️ Dirección fuera del programa: {text}")
+            return
+        self.listing.jump_to(row)
     
     def load_file(self):
         """Carga archivo .asm o .txt"""
@@ -462,22 +1007,25 @@ class MIPSDecoderGUI:
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo cargar el archivo:\n{str(e)}")
     
+    def current_result(self):
+        """Regresa el AssemblyResult del código actual (solo re-ensambla si
+        el texto cambió desde el último ensamblado)"""
+        return self.assembler.assemble(self.input_text.get("1.0", tk.END))
+    
     def save_txt(self):
-        """Guarda salida en archivo .txt"""
+        """Guarda salida en archivo .txt ($readmemb), .hex ($readmemh) o .mem
+        (disperso con @dirección)"""
         filepath = filedialog.asksaveasfilename(
             title="Guardar como TXT",
             defaultextension=".txt",
-            filetypes=[("Archivos TXT", "*.txt")]
+            filetypes=[("Archivos TXT", "*.txt"), ("$readmemh", "*.hex"),
+                      ("Disperso @dirección", "*.mem")]
         )
         if filepath:
             try:
-                # Obtener solo las líneas binarias
-                code = self.input_text.get("1.0", tk.END)
-                instructions = self.decoder.assemble(code)
-                
-                with open(filepath, 'w') as f:
-                    for instr in instructions:
-                        f.write(f"{self.decoder.format_binary(instr['binary'])}\n")
+                # Solo las palabras, directo del buffer
+                write_words(filepath, self.current_result().words,
+                            format_for_path(filepath))
                 
                 self.status_label.config(text=f"💾 Guardado: {os.path.basename(filepath)}")
                 messagebox.showinfo("Éxito", f"Archivo guardado:\n{filepath}")
@@ -493,13 +1041,8 @@ class MIPSDecoderGUI:
         )
         if filepath:
             try:
-                code = self.input_text.get("1.0", tk.END)
-                instructions = self.decoder.assemble(code)
-                
-                with open(filepath, 'wb') as f:
-                    for instr in instructions:
-                        # Big endian (MIPS)
-                        f.write(instr['binary'].to_bytes(4, byteorder='big'))
+                # Big endian (MIPS)
+                write_words(filepath, self.current_result().words, 'bin')
                 
                 self.status_label.config(text=f"💾 Guardado: {os.path.basename(filepath)}")
                 messagebox.showinfo("Éxito", f"Archivo binario guardado:\n{filepath}")
@@ -509,7 +1052,7 @@ class MIPSDecoderGUI:
     def clear(self):
         """Limpia campos"""
         self.input_text.delete("1.0", tk.END)
-        self.output_text.delete("1.0", tk.END)
+        self.listing.clear()
         self.status_label.config(text="🗑️ Campos limpiados")
     
     def load_example(self):
@@ -576,41 +1119,292 @@ done:
         self.status_label.config(text="📋 Programa de ejemplo cargado")
 
 
+def measure_memory(code):
+    """Mide (con tracemalloc) la memoria por instrucción de la lista de
+    diccionarios de second_pass contra AssemblyResult"""
+    import tracemalloc
+    
+    decoder = MIPSDecoder()
+    report = {}
+    for name, build in (('diccionarios', lambda: (decoder.first_pass(code),
+                                                  decoder.second_pass(code))[1]),
+                        ('compacto', lambda: decoder.assemble(code))):
+        tracemalloc.start()
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = len(result)
+        report[name] = {
+            'instrucciones': count,
+            'bytes': current,
+            'bytes_por_instruccion': current / count if count else 0.0,
+        }
+        del result
+    return report
+
+
+# ============================================================================
+# Modo por lotes
+# ============================================================================
+
+def expand_sources(patterns):
+    """Lista ordenada de archivos .asm a partir de archivos, directorios
+    (recursivo) o patrones glob"""
+    import glob
+    
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, _, filenames in os.walk(pattern):
+                found.extend(os.path.join(dirpath, name) for name in filenames
+                             if name.lower().endswith('.asm'))
+        elif glob.has_magic(pattern):
+            found.extend(path for path in glob.glob(pattern, recursive=True)
+                         if os.path.isfile(path))
+        else:
+            found.append(pattern)
+    # Sin duplicados, en orden estable
+    return sorted(set(os.path.normpath(path) for path in found))
+
+
+def batch_outputs(sources):
+    """Archivo de salida de cada fuente: instrucciones.txt junto al .asm, o
+    <nombre>_instrucciones.txt si hay varios .asm en el mismo directorio"""
+    per_dir = {}
+    for source in sources:
+        per_dir.setdefault(os.path.dirname(source), []).append(source)
+    outputs = {}
+    for directory, group in per_dir.items():
+        for source in group:
+            if len(group) == 1:
+                name = "instrucciones.txt"
+            else:
+                name = os.path.splitext(os.path.basename(source))[0] + "_instrucciones.txt"
+            outputs[source] = os.path.join(directory, name)
+    return outputs
+
+
+def assemble_to_file(decoder, source, output, cache=None):
+    """Ensambla 'source' y escribe 'output' (formato según la extensión).
+    
+    Sin caché se ensambla en streaming (memoria constante); con caché se
+    lee el texto completo para calcular la llave. Regresa
+    (instrucciones, acierto de caché o None si no hay caché).
+    """
+    fmt = format_for_path(output)
+    if decoder.on_stats is not None:
+        return _assemble_to_file_stats(decoder, source, output, fmt, cache)
+    if cache is None:
+        with open(output, 'wb' if fmt == 'bin' else 'w') as f:
+            words = (instr['binary'] for instr in decoder.assemble_stream(source))
+            count, _ = write_stream(f, words, fmt)
+        return count, None
+    
+    with open(source, 'r') as f:
+        code = f.read()
+    hits = cache.hits
+    result = decoder.assemble(code, cache=cache)
+    write_words(output, result.words, fmt)
+    return len(result), cache.hits > hits
+
+
+def _assemble_to_file_stats(decoder, source, output, fmt, cache):
+    """assemble_to_file midiendo cada fase; llama a decoder.on_stats"""
+    stats = AssemblyStats()
+    
+    def read():
+        with open(source, 'r') as f:
+            return f.read()
+    
+    code = stats.timed('lectura', read)
+    result = decoder.assemble(code, cache=cache, stats=stats)
+    stats.bytes_written = stats.timed('escritura', write_words, output, result.words, fmt)
+    decoder.on_stats(stats)
+    return len(result), stats.cache_hit
+
+
+def assemble_file(job):
+    """Ensambla un archivo del lote (se ejecuta en un proceso del pool).
+    Regresa (fuente, salida, instrucciones, errores, falla, acierto de caché)."""
+    source, output, cache_dir, cache_max = job
+    decoder = MIPSDecoder()
+    try:
+        cache = AssemblyCache(cache_dir, cache_max) if cache_dir else None
+        count, cached = assemble_to_file(decoder, source, output, cache)
+    except Exception as e:
+        return source, output, 0, [], str(e), None
+    return source, output, count, decoder.errors, None, cached
+
+
+def assemble_batch(patterns, jobs=None, cache_dir=None,
+                   cache_max=DEFAULT_CACHE_BYTES):
+    """Ensambla todos los .asm indicados en un pool de procesos (los
+    procesos comparten la caché en disco si se indica).
+    Regresa la lista de resultados de assemble_file en orden."""
+    sources = expand_sources(patterns)
+    outputs = batch_outputs(sources)
+    work = [(source, outputs[source], cache_dir, cache_max) for source in sources]
+    jobs = jobs or os.cpu_count() or 1
+    
+    if jobs == 1 or len(work) < 2:
+        return [assemble_file(job) for job in work]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    # Bloques de varios archivos por tarea: los programas suelen ser chicos
+    chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+        return list(pool.map(assemble_file, work, chunksize=chunksize))
+
+
+def print_batch_summary(results, elapsed):
+    """Resumen conjunto del lote; regresa True si algún archivo falló"""
+    total = sum(result[2] for result in results)
+    with_errors = 0
+    error_count = 0
+    failed = 0
+    
+    for source, output, count, errors, failure, _ in results:
+        if failure is not None:
+            failed += 1
+            print(f"❌ {source}: {failure}")
+        elif errors:
+            with_errors += 1
+            error_count += len(errors)
+            print(f"⚠️ {source}: {len(errors)} error(es), {count} instrucciones")
+            for error in errors:
+                print(f"     {error}")
+    
+    print("=" * 60)
+    print(f"Archivos: {len(results)}  (sin errores: {len(results) - with_errors - failed}, "
+          f"con errores: {with_errors}, fallidos: {failed})")
+    print(f"Total de instrucciones: {total}  |  Total de errores: {error_count}")
+    cached = [result[5] for result in results if result[5] is not None]
+    if cached:
+        print(f"Caché: {sum(cached)} acierto(s), {len(cached) - sum(cached)} fallo(s)")
+    if elapsed > 0:
+        print(f"Tiempo: {elapsed:.3f} s  ({len(results) / elapsed:,.1f} archivos/s, "
+              f"{total / elapsed:,.0f} instrucciones/s)")
+    return failed > 0
+
+
 def main_cli():
     """Modo línea de comandos"""
-    import sys
+    # Opciones de caché (válidas en modo normal y por lotes)
+    args = sys.argv[1:]
+    cache_dir = None
+    cache_max = DEFAULT_CACHE_BYTES
+    show_stats = '--stats' in args
+    if show_stats:
+        args.remove('--stats')
+    pad_nops = '--nops' in args
+    if pad_nops:
+        args.remove('--nops')
+    padded_source = None
+    for option in ('--cache', '--cache-max', '--nops-asm'):
+        if option in args:
+            index = args.index(option)
+            if index + 1 >= len(args):
+                print(f"❌ Error: {option} requiere un valor")
+                sys.exit(1)
+            value = args[index + 1]
+            del args[index:index + 2]
+            if option == '--cache':
+                cache_dir = value
+            elif option == '--nops-asm':
+                padded_source = value
+                pad_nops = True
+            else:
+                try:
+                    cache_max = int(float(value) * 1024 * 1024)
+                except (ValueError, OverflowError):
+                    cache_max = -1
+                if cache_max < 0:
+                    print(f"❌ Error: --cache-max requiere un tamaño en MB (se recibió '{value}')")
+                    sys.exit(1)
     
-    if len(sys.argv) < 2:
-        print("Uso: python mips_decoder.py <archivo.asm> [archivo_salida.txt]")
+    if len(args) < 1:
+        print("Uso: python mips_decoder.py <archivo.asm> [archivo_salida.txt|.hex|.mem|.bin]")
         print("     python mips_decoder.py --gui  (para interfaz gráfica)")
+        print("     python mips_decoder.py --memoria <archivo.asm>")
+        print("     python mips_decoder.py --lote [-j N] <directorio|patrón|archivo.asm>...")
+        print("     opciones: --cache <directorio> [--cache-max MB] [--stats]")
+        print("               --nops [--nops-asm <archivo.asm>]  (NOPs mínimos para riesgos RAW)")
         sys.exit(1)
     
-    if sys.argv[1] == '--gui':
+    if args[0] == '--gui':
         main_gui()
         return
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "instrucciones.txt"
+    if args[0] == '--lote':
+        args = args[1:]
+        jobs = None
+        if len(args) > 1 and args[0] == '-j':
+            try:
+                jobs = int(args[1])
+            except ValueError:
+                jobs = 0
+            if jobs < 1:
+                print(f"❌ Error: -j requiere un número de procesos mayor que 0 (se recibió '{args[1]}')")
+                sys.exit(1)
+            args = args[2:]
+        if not args:
+            print("❌ Error: --lote requiere al menos un directorio, patrón o archivo")
+            sys.exit(1)
+        start = time.perf_counter()
+        results = assemble_batch(args, jobs, cache_dir, cache_max)
+        if not results:
+            print("❌ Error: no se encontraron archivos .asm")
+            sys.exit(1)
+        if print_batch_summary(results, time.perf_counter() - start):
+            sys.exit(1)
+        return
     
-    decoder = MIPSDecoder()
+    if args[0] == '--memoria' and len(args) > 1:
+        with open(args[1], 'r') as f:
+            code = f.read()
+        for name, info in measure_memory(code).items():
+            print(f"{name:<13} {info['instrucciones']:>9} instrucciones  "
+                  f"{info['bytes']:>12,} bytes  "
+                  f"{info['bytes_por_instruccion']:8.1f} bytes/instrucción")
+        return
+    
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else "instrucciones.txt"
+    
+    collected = []
+    decoder = MIPSDecoder(on_stats=collected.append if show_stats else None)
     
     try:
-        with open(input_file, 'r') as f:
-            code = f.read()
+        if not os.path.isfile(input_file):
+            raise FileNotFoundError(input_file)
         
-        instructions = decoder.assemble(code)
+        cache = AssemblyCache(cache_dir, cache_max) if cache_dir else None
+        if pad_nops:
+            from mips_hazards import format_report, pad_hazards
+            with open(input_file, 'r') as f:
+                code, report = pad_hazards(f.read())
+            print(format_report(report))
+            if padded_source is not None:
+                with open(padded_source, 'w') as f:
+                    f.write(code)
+            # Se ensambla el texto con los NOPs
+            result = decoder.assemble(code, cache=cache)
+            write_words(output_file, result.words)
+            count = len(result)
+        else:
+            count, _ = assemble_to_file(decoder, input_file, output_file, cache)
         
         if decoder.errors:
             print("Errores encontrados:")
             for error in decoder.errors:
                 print(f"  ❌ {error}")
         
-        with open(output_file, 'w') as f:
-            for instr in instructions:
-                f.write(f"{decoder.format_binary(instr['binary'])}\n")
-        
         print(f"✅ Archivo generado: {output_file}")
-        print(f"   Total de instrucciones: {len(instructions)}")
+        print(f"   Total de instrucciones: {count}")
+        if cache is not None:
+            print(f"   {cache.summary()}")
+        for stats in collected:
+            print(stats.summary())
         
     except FileNotFoundError:
         print(f"❌ Error: No se encontró el archivo '{input_file}'")
@@ -622,13 +1416,13 @@ def main_cli():
 
 def main_gui():
     """Inicia interfaz gráfica"""
+    load_tk()
     root = tk.Tk()
     app = MIPSDecoderGUI(root)
     root.mainloop()
 
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1 and sys.argv[1] != '--gui':
         main_cli()
     else:
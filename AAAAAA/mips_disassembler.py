@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Desensamblador MIPS32 - Binario a Ensamblador
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Convierte imágenes completas ($readmemb, $readmemh o .bin Big Endian) en
+# un listado que MIPSDecoder vuelve a ensamblar a las mismas palabras.
+#
+#   - Los campos (opcode, rs, rt, rd, shamt, funct, inmediato, dirección)
+#     se separan para toda la imagen de una vez; con NumPy son operaciones
+#     sobre arreglos, sin NumPy se usan listas.
+#   - El mnemónico sale de dos tablas de 64 entradas (por opcode y por
+#     funct) construidas desde las tablas de mips_isa.
+#   - Los destinos de beq/bne/j/jal dentro de la imagen reciben etiquetas
+#     L_<dirección>.
+#   - Las palabras que el ensamblador no puede producir se muestran como
+#     ".word 0x..." (no se pueden volver a ensamblar).
+# ============================================================================
+
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:     # NumPy es opcional
+    np = None
+
+from mips_decoder import MIPSDecoder
+# Forma de los operandos de cada mnemónico (KIND_*)
+from mips_isa import (KIND_WORD, KIND_NOP, KIND_R, KIND_SHIFT, KIND_I, KIND_MEM,
+                      KIND_LUI, KIND_BRANCH, KIND_JUMP, instruction_kind)
+from mips_output import format_for_path
+from mips_pipeline import load_readmem
+
+
+# ============================================================================
+# Tablas
+# ============================================================================
+
+def build_tables(decoder=None):
+    """Regresa (MNEMONICS, KINDS, OPCODE_TABLE, FUNCT_TABLE).
+
+    MNEMONICS[id] es el nombre del mnemónico 'id' (0 = .word, 1 = nop);
+    OPCODE_TABLE[opcode] y FUNCT_TABLE[funct] tienen 64 entradas con el id
+    (0 si el código no existe)."""
+    decoder = decoder or MIPSDecoder()
+    mnemonics = ['.word', 'nop']
+    kinds = [KIND_WORD, KIND_NOP]
+    opcode_table = [0] * 64
+    funct_table = [0] * 64
+
+    for name, funct in decoder.r_type_funct.items():
+        funct_table[funct] = len(mnemonics)
+        mnemonics.append(name)
+        kinds.append(instruction_kind(name))
+    for name, opcode in list(decoder.i_type_opcode.items()) + \
+            list(decoder.j_type_opcode.items()):
+        opcode_table[opcode] = len(mnemonics)
+        mnemonics.append(name)
+        kinds.append(instruction_kind(name))
+    return mnemonics, kinds, opcode_table, funct_table
+
+
+MNEMONICS, KINDS, OPCODE_TABLE, FUNCT_TABLE = build_tables()
+MNEMONIC_IDS = {name: index for index, name in enumerate(MNEMONICS)}
+
+
+def register_names(decoder=None, numeric=False):
+    """Nombre de cada registro: el primer alias de la tabla ($zero, $t0...)
+    o $n si numeric"""
+    if numeric:
+        return [f'${i}' for i in range(32)]
+    decoder = decoder or MIPSDecoder()
+    names = [None] * 32
+    for name, number in decoder.registers.items():
+        if names[number] is None:
+            names[number] = name
+    return names
+
+
+# ============================================================================
+# Carga de imágenes
+# ============================================================================
+
+def load_image(path, fmt=None):
+    """Lee una imagen completa como array('I') (formato por extensión:
+    .bin Big Endian, .hex/.mem $readmemh, otro $readmemb)"""
+    fmt = fmt or format_for_path(path)
+    if fmt == 'bin':
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) % 4:
+            raise ValueError(f"{path}: el tamaño no es múltiplo de 4 bytes")
+        words = array('I')
+        words.frombytes(data)
+        if sys.byteorder == 'little':
+            words.byteswap()
+        return words
+    base = 16 if fmt in ('readmemh', 'sparse-h') else 2
+    return array('I', load_readmem(path, base, size=None))
+
+
+# ============================================================================
+# Separación de campos
+# ============================================================================
+
+def split_fields(words):
+    """Separa los campos de toda la imagen. Regresa un diccionario de
+    arreglos NumPy (o listas sin NumPy): opcode, rs, rt, rd, shamt, funct,
+    imm (con signo), addr (26 bits) e id (índice en MNEMONICS)."""
+    if np is not None:
+        if isinstance(words, array) and words.itemsize == 4:
+            w = np.frombuffer(words, dtype=np.uint32)
+        else:
+            w = np.asarray(words, dtype=np.uint32)
+        opcode = w >> 26
+        funct = w & 0x3F
+        ids = np.where(opcode == 0,
+                       np.asarray(FUNCT_TABLE, dtype=np.int32)[funct],
+                       np.asarray(OPCODE_TABLE, dtype=np.int32)[opcode])
+        ids[w == 0] = MNEMONIC_IDS['nop']
+        return {
+            'word': w,
+            'opcode': opcode,
+            'rs': (w >> 21) & 0x1F,
+            'rt': (w >> 16) & 0x1F,
+            'rd': (w >> 11) & 0x1F,
+            'shamt': (w >> 6) & 0x1F,
+            'funct': funct,
+            'imm': ((w & 0xFFFF) ^ 0x8000).astype(np.int32) - 0x8000,
+            'addr': w & 0x03FFFFFF,
+            'id': ids,
+        }
+
+    words = list(words)
+    opcode = [w >> 26 for w in words]
+    funct = [w & 0x3F for w in words]
+    nop = MNEMONIC_IDS['nop']
+    return {
+        'word': words,
+        'opcode': opcode,
+        'rs': [(w >> 21) & 0x1F for w in words],
+        'rt': [(w >> 16) & 0x1F for w in words],
+        'rd': [(w >> 11) & 0x1F for w in words],
+        'shamt': [(w >> 6) & 0x1F for w in words],
+        'funct': funct,
+        'imm': [((w & 0xFFFF) ^ 0x8000) - 0x8000 for w in words],
+        'addr': [w & 0x03FFFFFF for w in words],
+        'id': [nop if not w else (FUNCT_TABLE[f] if not o else OPCODE_TABLE[o])
+               for w, o, f in zip(words, opcode, funct)],
+    }
+
+
+def label_name(index):
+    """Etiqueta de la instrucción en la posición 'index'"""
+    return f"L_{index * 4:04x}"
+
+
+# ============================================================================
+# Desensamblador
+# ============================================================================
+
+class Disassembler:
+    """Desensamblador de imágenes completas"""
+
+    def __init__(self, numeric=False):
+        self.registers = register_names(numeric=numeric)
+
+    def targets(self, fields):
+        """Índices destino de beq/bne/j/jal dentro de la imagen (se permite
+        el índice n: etiqueta al final del programa)"""
+        ids = fields['id']
+        n = len(ids)
+        branch_ids = [i for i, kind in enumerate(KINDS) if kind == KIND_BRANCH]
+        jump_ids = [i for i, kind in enumerate(KINDS) if kind == KIND_JUMP]
+        if np is not None:
+            index = np.arange(n)
+            branch = np.isin(ids, branch_ids)
+            jump = np.isin(ids, jump_ids)
+            target = np.where(branch, index + 1 + fields['imm'],
+                              fields['addr'].astype(np.int64))
+            keep = (branch | jump) & (target >= 0) & (target <= n)
+            return set(np.unique(target[keep]).tolist())
+        found = set()
+        for i, (mid, imm, addr) in enumerate(zip(ids, fields['imm'], fields['addr'])):
+            if mid in branch_ids:
+                target = i + 1 + imm
+            elif mid in jump_ids:
+                target = addr
+            else:
+                continue
+            if 0 <= target <= n:
+                found.add(target)
+        return found
+
+    def format_instruction(self, index, word, mid, rs, rt, rd, shamt, imm, addr,
+                           labels):
+        """Texto de una instrucción (o .word si no es canónica)"""
+        regs = self.registers
+        kind = KINDS[mid]
+        name = MNEMONICS[mid]
+        if kind == KIND_NOP:
+            return 'nop'
+        if kind == KIND_R and not shamt:
+            return f"{name} {regs[rd]}, {regs[rs]}, {regs[rt]}"
+        if kind == KIND_SHIFT and not rs:
+            return f"{name} {regs[rd]}, {regs[rt]}, {shamt}"
+        if kind == KIND_I:
+            return f"{name} {regs[rt]}, {regs[rs]}, {imm}"
+        if kind == KIND_MEM:
+            return f"{name} {regs[rt]}, {imm}({regs[rs]})"
+        if kind == KIND_LUI and not rs:
+            return f"{name} {regs[rt]}, {imm}"
+        if kind == KIND_BRANCH:
+            target = index + 1 + imm
+            dest = label_name(target) if target in labels else str(imm)
+            return f"{name} {regs[rs]}, {regs[rt]}, {dest}"
+        if kind == KIND_JUMP:
+            dest = label_name(addr) if addr in labels else str(addr * 4)
+            return f"{name} {dest}"
+        return f".word 0x{word:08x}"
+
+    def disassemble(self, words):
+        """Regresa (etiquetas, lista de textos) de toda la imagen"""
+        fields = split_fields(words)
+        labels = self.targets(fields)
+        columns = [fields[name] for name in ('word', 'id', 'rs', 'rt', 'rd',
+                                             'shamt', 'imm', 'addr')]
+        if np is not None:
+            columns = [column.tolist() for column in columns]
+        fmt = self.format_instruction
+        texts = [fmt(index, *row, labels)
+                 for index, row in enumerate(zip(*columns))]
+        return labels, texts
+
+    def listing(self, words, comments=True):
+        """Listado ensamblable: etiquetas en su propia línea y, como
+        comentario, la dirección y la palabra de cada instrucción"""
+        labels, texts = self.disassemble(words)
+        out = []
+        for index, text in enumerate(texts):
+            if index in labels:
+                out.append(f"{label_name(index)}:")
+            if comments:
+                out.append(f"    {text:<30}# 0x{index * 4:04X}: {words[index]:08x}")
+            else:
+                out.append(f"    {text}")
+        if len(texts) in labels:
+            out.append(f"{label_name(len(texts))}:")
+        return '\n'.join(out) + '\n' if out else ''
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Desensamblador MIPS32 (imagen -> ensamblador)")
+    parser.add_argument("imagen", help="archivo $readmemb (.txt), $readmemh (.hex/.mem) o .bin")
+    parser.add_argument("-f", "--formato", choices=('readmemb', 'readmemh', 'bin'),
+                        default=None, help="formato de la imagen (por defecto según la extensión)")
+    parser.add_argument("-o", "--salida", default=None,
+                        help="archivo .asm de salida (por defecto se imprime)")
+    parser.add_argument("--numericos", action="store_true",
+                        help="registros como $8 en lugar de $t0")
+    parser.add_argument("--sin-comentarios", action="store_true",
+                        help="no agregar dirección y palabra como comentario")
+    args = parser.parse_args()
+
+    try:
+        words = load_image(args.imagen, args.formato)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    text = Disassembler(numeric=args.numericos).listing(
+        words, comments=not args.sin_comentarios)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(text)
+        print(f"✅ Archivo generado: {args.salida}")
+        print(f"   Total de instrucciones: {len(words)}")
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Codificador por columnas (sin texto)
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Para programas generados por código: en lugar de formatear texto y que
+# MIPSDecoder lo vuelva a leer, se pasan columnas (id de mnemónico, rs, rt,
+# rd, inmediato) y se obtienen las palabras de 32 bits en una sola pasada.
+# Con NumPy son operaciones sobre arreglos; sin NumPy, un ciclo simple.
+#
+# Los ids son los de mips_disassembler.MNEMONICS (mismas tablas de opcode y
+# funct que MIPSDecoder). Uso de las columnas por tipo de instrucción:
+#
+#   add/sub/and/or/slt   rd, rs, rt
+#   sll/srl              rd, rt, imm = shamt (0..31)
+#   addi/andi/.../slti   rt, rs, imm
+#   lw/sw                rt, imm(rs)
+#   lui                  rt, imm
+#   beq/bne              rs, rt, imm = desplazamiento en palabras
+#   j/jal                imm = dirección en bytes (como "j 16")
+#   nop                  (ninguna)
+#   .word                imm = palabra completa
+#
+# El inmediato se enmascara igual que to_twos_complement (16 bits; 26 bits
+# de dirección para j/jal). Registros o shamt fuera de 0..31 son error.
+# ============================================================================
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:     # NumPy es opcional
+    np = None
+
+from mips_decoder import MIPSDecoder
+from mips_disassembler import (MNEMONICS, MNEMONIC_IDS, KINDS, KIND_WORD,
+                               KIND_NOP, KIND_R, KIND_SHIFT, KIND_I, KIND_MEM,
+                               KIND_LUI, KIND_BRANCH, KIND_JUMP)
+
+# Modo del inmediato
+IMM_NONE, IMM_16, IMM_SHAMT, IMM_JUMP, IMM_WORD = range(5)
+
+
+def build_encode_tables(decoder=None):
+    """Por id de mnemónico: (palabra base, usa rs, usa rt, usa rd, modo del
+    inmediato)"""
+    decoder = decoder or MIPSDecoder()
+    base, use_rs, use_rt, use_rd, imm_mode = [], [], [], [], []
+    for name, kind in zip(MNEMONICS, KINDS):
+        if kind in (KIND_R, KIND_SHIFT):
+            word = decoder.r_type_funct[name]
+        elif kind == KIND_JUMP:
+            word = decoder.j_type_opcode[name] << 26
+        elif kind in (KIND_WORD, KIND_NOP):
+            word = 0
+        else:
+            word = decoder.i_type_opcode[name] << 26
+        base.append(word)
+        use_rs.append(kind in (KIND_R, KIND_I, KIND_MEM, KIND_BRANCH))
+        use_rt.append(kind in (KIND_R, KIND_SHIFT, KIND_I, KIND_MEM, KIND_LUI,
+                               KIND_BRANCH))
+        use_rd.append(kind in (KIND_R, KIND_SHIFT))
+        imm_mode.append({KIND_SHIFT: IMM_SHAMT, KIND_JUMP: IMM_JUMP,
+                         KIND_WORD: IMM_WORD, KIND_I: IMM_16, KIND_MEM: IMM_16,
+                         KIND_LUI: IMM_16, KIND_BRANCH: IMM_16}.get(kind, IMM_NONE))
+    return base, use_rs, use_rt, use_rd, imm_mode
+
+
+BASE, USE_RS, USE_RT, USE_RD, IMM_MODE = build_encode_tables()
+
+
+def mnemonic_ids(names):
+    """Convierte nombres de mnemónico a ids (ValueError si no existe)"""
+    try:
+        return [MNEMONIC_IDS[name.lower()] for name in names]
+    except KeyError as e:
+        raise ValueError(f"Instrucción desconocida: {e.args[0]}") from None
+
+
+def _check_range(name, column, low, high):
+    """ValueError con la primera fila fuera de [low, high]"""
+    if np is not None:
+        bad = np.flatnonzero((column < low) | (column > high))
+        if bad.size:
+            row = int(bad[0])
+            raise ValueError(f"Fila {row}: {name} fuera de rango: {int(column[row])}")
+        return
+    for row, value in enumerate(column):
+        if not low <= value <= high:
+            raise ValueError(f"Fila {row}: {name} fuera de rango: {value}")
+
+
+def encode_columns(ids, rs=None, rt=None, rd=None, imm=None):
+    """Codifica columnas de igual longitud y regresa array('I') con las
+    palabras. Las columnas omitidas valen 0."""
+    n = len(ids)
+    if np is not None:
+        return _encode_numpy(n, ids, rs, rt, rd, imm)
+
+    zeros = [0] * n
+    rs = zeros if rs is None else list(rs)
+    rt = zeros if rt is None else list(rt)
+    rd = zeros if rd is None else list(rd)
+    imm = zeros if imm is None else list(imm)
+    ids = list(ids)
+    if not len(rs) == len(rt) == len(rd) == len(imm) == n:
+        raise ValueError("Las columnas deben tener la misma longitud")
+    _check_range("id", ids, 0, len(MNEMONICS) - 1)
+    for name, column in (("rs", rs), ("rt", rt), ("rd", rd)):
+        _check_range(name, column, 0, 31)
+
+    words = array('I', zeros)
+    for row, (mid, s, t, d, value) in enumerate(zip(ids, rs, rt, rd, imm)):
+        word = BASE[mid]
+        if USE_RS[mid]:
+            word |= s << 21
+        if USE_RT[mid]:
+            word |= t << 16
+        if USE_RD[mid]:
+            word |= d << 11
+        mode = IMM_MODE[mid]
+        if mode == IMM_16:
+            word |= value & 0xFFFF
+        elif mode == IMM_SHAMT:
+            if not 0 <= value <= 31:
+                raise ValueError(f"Fila {row}: shamt fuera de rango: {value}")
+            word |= value << 6
+        elif mode == IMM_JUMP:
+            word |= (value // 4) & 0x03FFFFFF
+        elif mode == IMM_WORD:
+            word = value & 0xFFFFFFFF
+        words[row] = word
+    return words
+
+
+def _encode_numpy(n, ids, rs, rt, rd, imm):
+    """encode_columns con operaciones sobre arreglos"""
+    def column(values):
+        if values is None:
+            return np.zeros(n, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        if values.shape != (n,):
+            raise ValueError("Las columnas deben tener la misma longitud")
+        return values
+
+    ids, rs, rt, rd, imm = (column(c) for c in (ids, rs, rt, rd, imm))
+    _check_range("id", ids, 0, len(MNEMONICS) - 1)
+    for name, values in (("rs", rs), ("rt", rt), ("rd", rd)):
+        _check_range(name, values, 0, 31)
+
+    mode = np.asarray(IMM_MODE, dtype=np.int64)[ids]
+    shift = mode == IMM_SHAMT
+    _check_range("shamt", np.where(shift, imm, 0), 0, 31)
+
+    words = (np.asarray(BASE, dtype=np.int64)[ids]
+             | (rs * np.asarray(USE_RS, dtype=np.int64)[ids]) << 21
+             | (rt * np.asarray(USE_RT, dtype=np.int64)[ids]) << 16
+             | (rd * np.asarray(USE_RD, dtype=np.int64)[ids]) << 11
+             | np.where(mode == IMM_16, imm & 0xFFFF, 0)
+             | np.where(shift, imm << 6, 0)
+             | np.where(mode == IMM_JUMP, (imm // 4) & 0x03FFFFFF, 0))
+    words = np.where(mode == IMM_WORD, imm & 0xFFFFFFFF, words)
+    out = array('I')
+    out.frombytes(words.astype(np.uint32).tobytes())
+    return out
+
+
+# ============================================================================
+# Comparación contra el camino de texto
+# ============================================================================
+
+def random_columns(amount, seed=0):
+    """Columnas aleatorias válidas (para pruebas de carga)"""
+    import random
+
+    rng = random.Random(seed)
+    usable = [i for i, kind in enumerate(KINDS) if kind != KIND_WORD]
+    ids = [rng.choice(usable) for _ in range(amount)]
+    regs = lambda: [rng.randrange(32) for _ in range(amount)]
+    imm = [rng.randrange(32) if KINDS[i] == KIND_SHIFT else
+           rng.randrange(0, 1 << 12) * 4 if KINDS[i] == KIND_JUMP else
+           rng.randrange(-32768, 32768) for i in ids]
+    return ids, regs(), regs(), regs(), imm
+
+
+def columns_to_text(ids, rs, rt, rd, imm):
+    """Mismo programa como texto para MIPSDecoder (referencia)"""
+    lines = []
+    for mid, s, t, d, value in zip(ids, rs, rt, rd, imm):
+        name = MNEMONICS[mid]
+        kind = KINDS[mid]
+        if kind == KIND_R:
+            lines.append(f"{name} ${d}, ${s}, ${t}")
+        elif kind == KIND_SHIFT:
+            lines.append(f"{name} ${d}, ${t}, {value}")
+        elif kind == KIND_I:
+            lines.append(f"{name} ${t}, ${s}, {value}")
+        elif kind == KIND_MEM:
+            lines.append(f"{name} ${t}, {value}(${s})")
+        elif kind == KIND_LUI:
+            lines.append(f"{name} ${t}, {value}")
+        elif kind == KIND_BRANCH:
+            lines.append(f"{name} ${s}, ${t}, {value}")
+        elif kind == KIND_JUMP:
+            lines.append(f"{name} {value}")
+        else:
+            lines.append("nop")
+    return '\n'.join(lines)
+
+
+def benchmark(amount=1000000, seed=0):
+    """Instrucciones/s por columnas contra texto + MIPSDecoder.assemble"""
+    import time
+
+    columns = random_columns(amount, seed)
+    start = time.perf_counter()
+    words = encode_columns(*columns)
+    columnar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = MIPSDecoder().assemble(columns_to_text(*columns)).words
+    text = time.perf_counter() - start
+
+    if words != reference:
+        raise AssertionError("Las palabras no coinciden con MIPSDecoder")
+    return {'instrucciones': amount, 'columnas_s': columnar, 'texto_s': text,
+            'aceleracion': text / columnar if columnar else float('inf'),
+            'numpy': np is not None}
+
+
+def main_cli():
+    """Modo línea de comandos: compara contra el camino de texto"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Codificador MIPS por columnas (comparación contra texto)")
+    parser.add_argument("--monto", type=int, default=1000000,
+                        help="instrucciones aleatorias a codificar")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    info = benchmark(args.monto, args.semilla)
+    n = info['instrucciones']
+    print(f"Instrucciones: {n:,}  (NumPy: {'sí' if info['numpy'] else 'no'})")
+    print(f"Columnas:      {info['columnas_s']:.3f} s  ({n / info['columnas_s']:,.0f} instr/s)")
+    print(f"Texto:         {info['texto_s']:.3f} s  ({n / info['texto_s']:,.0f} instr/s)")
+    print(f"Aceleración:   {info['aceleracion']:.1f}x  (palabras idénticas)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Fuzzer de ida y vuelta: ensamblar -> desensamblar -> ensamblar
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Genera programas válidos al azar (con etiquetas, alias de registros,
+# inmediatos en decimal/hex/binario, comentarios y espacios variados) para
+# todos los mnemónicos de MIPSDecoder y revisa por cada programa:
+#
+#   1. MIPSDecoder.assemble() no reporta errores y produce las mismas
+#      palabras que mips_encoder.encode_columns() con los campos que se
+#      generaron (oráculo independiente del texto)
+#   2. Los mnemónicos que ve el desensamblador son los generados
+#   3. El listado del desensamblador vuelve a ensamblar a las mismas palabras
+#      (con alias de registros o, en las semillas impares, con $n)
+#
+# Los casos se reparten en procesos (cada uno con su rango de semillas) y
+# los que fallan se reducen quitando líneas mientras el fallo se mantenga.
+# ============================================================================
+
+import random
+import sys
+import time
+
+from mips_decoder import MIPSDecoder
+from mips_disassembler import (MNEMONICS, KINDS, KIND_WORD, KIND_NOP, KIND_R,
+                               KIND_SHIFT, KIND_I, KIND_MEM, KIND_LUI,
+                               KIND_BRANCH, MNEMONIC_IDS,
+                               Disassembler, split_fields)
+from mips_encoder import encode_columns
+
+USABLE_IDS = [i for i, kind in enumerate(KINDS) if kind != KIND_WORD]
+
+
+def register_aliases(decoder=None):
+    """Todos los nombres aceptados de cada registro"""
+    decoder = decoder or MIPSDecoder()
+    aliases = [[] for _ in range(32)]
+    for name, number in decoder.registers.items():
+        aliases[number].append(name)
+    return aliases
+
+
+ALIASES = register_aliases()
+
+
+# ============================================================================
+# Generación
+# ============================================================================
+
+class Instr:
+    """Línea generada: 'target' es la etiqueta de beq/bne/j/jal (None si el
+    inmediato es numérico); con mid None la línea solo tiene la etiqueta"""
+
+    __slots__ = ('label', 'mid', 'rs', 'rt', 'rd', 'imm', 'target', 'text')
+
+    def __init__(self, label, mid, rs=0, rt=0, rd=0, imm=0, target=None, text=''):
+        self.label = label
+        self.mid = mid
+        self.rs = rs
+        self.rt = rt
+        self.rd = rd
+        self.imm = imm
+        self.target = target
+        self.text = text
+
+
+def _reg(rng, number):
+    name = rng.choice(ALIASES[number])
+    return name.upper() if rng.random() < 0.1 else name
+
+
+def _imm(rng, value):
+    """Inmediato en decimal, hex o binario (parse_immediate)"""
+    if value >= 0:
+        form = rng.random()
+        if form < 0.2:
+            return hex(value)
+        if form < 0.3:
+            return bin(value)
+    return str(value)
+
+
+def _sep(rng):
+    return rng.choice((', ', ',', ' , ', ' ', ',\t'))
+
+
+def generate_program(seed, size=64, label_rate=0.15):
+    """Programa aleatorio válido de 'size' instrucciones"""
+    rng = random.Random(seed)
+    labels = [f"{rng.choice(('L', 'loop', 'fin', 'salto', '_x'))}{k}"
+              for k in range(max(1, int(size * label_rate)))]
+    # Cada etiqueta se coloca antes de una instrucción (o al final)
+    positions = {}
+    for name in labels:
+        positions.setdefault(rng.randint(0, size), []).append(name)
+
+    program = []
+    for index in range(size + 1):
+        names = positions.get(index, [])
+        # Etiquetas extra en su propia línea
+        while len(names) > 1 or (names and index == size):
+            name = names.pop()
+            program.append(Instr(name, None, text=f"{name}:"))
+        if index == size:
+            break
+        label = names[0] if names else None
+
+        mid = rng.choice(USABLE_IDS)
+        kind = KINDS[mid]
+        name = MNEMONICS[mid]
+        op = name.upper() if rng.random() < 0.1 else name
+        rs, rt, rd = rng.randrange(32), rng.randrange(32), rng.randrange(32)
+        imm, target = 0, None
+        sep = _sep(rng)
+
+        if kind == KIND_NOP:
+            rs = rt = rd = 0
+            text = op
+        elif kind == KIND_R:
+            text = f"{op} {_reg(rng, rd)}{sep}{_reg(rng, rs)}{sep}{_reg(rng, rt)}"
+        elif kind == KIND_SHIFT:
+            rs = 0
+            imm = rng.randrange(32)
+            text = f"{op} {_reg(rng, rd)}{sep}{_reg(rng, rt)}{sep}{_imm(rng, imm)}"
+        elif kind == KIND_I:
+            imm = rng.randrange(-32768, 65536)
+            text = f"{op} {_reg(rng, rt)}{sep}{_reg(rng, rs)}{sep}{_imm(rng, imm)}"
+        elif kind == KIND_MEM:
+            imm = rng.randrange(-32768, 32768)
+            text = f"{op} {_reg(rng, rt)}{sep}{imm}({_reg(rng, rs)})"
+        elif kind == KIND_LUI:
+            rs = 0
+            imm = rng.randrange(65536)
+            text = f"{op} {_reg(rng, rt)}{sep}{_imm(rng, imm)}"
+        elif kind == KIND_BRANCH:
+            if rng.random() < 0.85:
+                target = rng.choice(labels)
+                dest = target
+            else:
+                imm = rng.randrange(-32768, 32768)
+                dest = str(imm)
+            text = f"{op} {_reg(rng, rs)}{sep}{_reg(rng, rt)}{sep}{dest}"
+        else:  # KIND_JUMP
+            if rng.random() < 0.85:
+                target = rng.choice(labels)
+                dest = target
+            else:
+                imm = rng.randrange(1 << 20) * 4
+                dest = _imm(rng, imm)
+            text = f"{op} {dest}"
+
+        if rng.random() < 0.1:
+            text += rng.choice(('  ', '\t', '')) + f"# comentario {index}"
+        if label is not None:
+            text = label + ':' + rng.choice(('', ' ', '\t')) + text
+        program.append(Instr(label, mid, rs, rt, rd, imm, target,
+                             rng.choice(('', '    ', '\t')) + text))
+    return program
+
+
+def program_text(program):
+    return '\n'.join(instr.text for instr in program)
+
+
+def expected_words(program):
+    """Palabras esperadas calculadas desde los campos (sin texto)"""
+    addresses = {}
+    index = 0
+    for instr in program:
+        if instr.label is not None:
+            addresses[instr.label] = index
+        if instr.mid is not None:
+            index += 1
+
+    ids, rs, rt, rd, imm = [], [], [], [], []
+    index = 0
+    for instr in program:
+        if instr.mid is None:
+            continue
+        value = instr.imm
+        if instr.target is not None:
+            target = addresses[instr.target]
+            if KINDS[instr.mid] == KIND_BRANCH:
+                value = target - (index + 1)
+            else:
+                value = target * 4
+        ids.append(instr.mid)
+        rs.append(instr.rs)
+        rt.append(instr.rt)
+        rd.append(instr.rd)
+        imm.append(value)
+        index += 1
+    return encode_columns(ids, rs, rt, rd, imm), ids
+
+
+# ============================================================================
+# Verificación
+# ============================================================================
+
+def numeric_listing(case_seed):
+    """¿El caso revisa el listado con registros numéricos ($n)?"""
+    return case_seed % 2 == 1
+
+
+def check_program(program, decoder=None, numeric=False):
+    """Regresa None si el programa pasa o una descripción del fallo"""
+    decoder = decoder or MIPSDecoder()
+    text = program_text(program)
+    try:
+        defined = {instr.label for instr in program}
+        if any(instr.target is not None and instr.target not in defined
+               for instr in program):
+            return "programa inválido (etiqueta faltante)"
+        expected, ids = expected_words(program)
+
+        result = decoder.assemble(text)
+        if decoder.errors:
+            return f"errores al ensamblar: {decoder.errors[0]}"
+        if result.words != expected:
+            return _first_difference("ensamblado", result.words, expected)
+
+        seen = split_fields(expected)['id']
+        seen = [int(mid) for mid in seen]
+        nop = MNEMONIC_IDS['nop']
+        want = [nop if word == 0 else mid for mid, word in zip(ids, expected)]
+        if seen != want:
+            row = next(i for i, (a, b) in enumerate(zip(seen, want)) if a != b)
+            return (f"desensamblado: instrucción {row} se leyó como "
+                    f"{MNEMONICS[seen[row]]}, se generó {MNEMONICS[want[row]]}")
+
+        listing = Disassembler(numeric=numeric).listing(expected)
+        again = decoder.assemble(listing)
+        if decoder.errors:
+            return f"errores al re-ensamblar el listado: {decoder.errors[0]}"
+        if again.words != expected:
+            return _first_difference("ida y vuelta", again.words, expected)
+    except Exception as e:
+        return f"excepción: {type(e).__name__}: {e}"
+    return None
+
+
+def _first_difference(stage, got, expected):
+    if len(got) != len(expected):
+        return f"{stage}: {len(got)} palabras, se esperaban {len(expected)}"
+    row = next(i for i, (a, b) in enumerate(zip(got, expected)) if a != b)
+    return f"{stage}: palabra {row} = {got[row]:08x}, se esperaba {expected[row]:08x}"
+
+
+def minimize(program, failure, decoder=None, numeric=False):
+    """Quita bloques de líneas mientras el fallo siga siendo el mismo"""
+    decoder = decoder or MIPSDecoder()
+    kind = failure.split(':')[0]
+
+    def still_fails(candidate):
+        result = check_program(candidate, decoder, numeric)
+        return result is not None and result.split(':')[0] == kind
+
+    chunk = max(1, len(program) // 2)
+    while chunk >= 1:
+        start = 0
+        while start < len(program):
+            candidate = program[:start] + program[start + chunk:]
+            if candidate and still_fails(candidate):
+                program = candidate
+            else:
+                start += chunk
+        chunk //= 2
+    return program
+
+
+# ============================================================================
+# Ejecución por procesos
+# ============================================================================
+
+def run_shard(job):
+    """Ejecuta los casos [first, last) de una semilla base. Regresa
+    (instrucciones, casos, fallos) con fallos = [(semilla, descripción)]."""
+    seed, first, last, size = job
+    decoder = MIPSDecoder()
+    instructions = 0
+    failures = []
+    for case in range(first, last):
+        case_seed = seed * 1000003 + case
+        program = generate_program(case_seed, size)
+        instructions += size
+        failure = check_program(program, decoder, numeric_listing(case_seed))
+        if failure is not None:
+            failures.append((case_seed, failure))
+    return instructions, last - first, failures
+
+
+def fuzz(total_instructions=1000000, size=64, seed=0, jobs=None, shards=None):
+    """Reparte los casos entre procesos; regresa un resumen"""
+    import os
+
+    cases = max(1, total_instructions // size)
+    jobs = jobs or os.cpu_count() or 1
+    shards = shards or jobs * 4
+    bounds = [cases * k // shards for k in range(shards + 1)]
+    work = [(seed, bounds[k], bounds[k + 1], size)
+            for k in range(shards) if bounds[k] < bounds[k + 1]]
+
+    start = time.perf_counter()
+    if jobs == 1:
+        results = [run_shard(job) for job in work]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(run_shard, work))
+    elapsed = time.perf_counter() - start
+
+    instructions = sum(r[0] for r in results)
+    return {
+        'instrucciones': instructions,
+        'casos': sum(r[1] for r in results),
+        'fallos': [failure for r in results for failure in r[2]],
+        'segundos': elapsed,
+        'instr_por_s': instructions / elapsed if elapsed else 0.0,
+        'procesos': jobs,
+    }
+
+
+def report_failure(case_seed, failure, size):
+    """Imprime el fallo con el programa mínimo que lo reproduce"""
+    program = generate_program(case_seed, size)
+    small = minimize(program, failure, numeric=numeric_listing(case_seed))
+    print(f"❌ semilla {case_seed}: {failure}")
+    print(f"   programa mínimo ({len(small)} de {len(program)} líneas):")
+    for line in program_text(small).split('\n'):
+        print(f"     {line}")
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Fuzzer ensamblar/desensamblar de MIPSDecoder")
+    parser.add_argument("-n", "--instrucciones", type=int, default=1000000,
+                        help="instrucciones a generar en total")
+    parser.add_argument("--tam", type=int, default=64,
+                        help="instrucciones por programa")
+    parser.add_argument("-j", "--procesos", type=int, default=None,
+                        help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--reproducir", type=int, metavar="SEMILLA", default=None,
+                        help="revisar un solo caso y mostrarlo reducido")
+    parser.add_argument("--max-reportes", type=int, default=5,
+                        help="fallos a reducir y mostrar")
+    args = parser.parse_args()
+
+    if args.reproducir is not None:
+        program = generate_program(args.reproducir, args.tam)
+        failure = check_program(program, numeric=numeric_listing(args.reproducir))
+        if failure is None:
+            print(f"✅ semilla {args.reproducir}: sin fallos")
+            return
+        report_failure(args.reproducir, failure, args.tam)
+        sys.exit(1)
+
+    info = fuzz(args.instrucciones, args.tam, args.semilla, args.procesos)
+    print(f"Casos: {info['casos']:,}  Instrucciones: {info['instrucciones']:,}  "
+          f"Procesos: {info['procesos']}")
+    print(f"Tiempo: {info['segundos']:.2f} s  ({info['instr_por_s']:,.0f} instr/s)")
+    failures = info['fallos']
+    if not failures:
+        print("✅ Sin fallos")
+        return
+    print(f"❌ {len(failures)} caso(s) con fallos")
+    for case_seed, failure in failures[:args.max_reportes]:
+        report_failure(case_seed, failure, args.tam)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
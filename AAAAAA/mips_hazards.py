@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Análisis estático de riesgos RAW e inserción mínima de NOPs
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# MIPS_Pipeline.v no tiene forwarding ni detección de riesgos: una
+# instrucción que lee un registro debe entrar a EX al menos RAW_DISTANCE (3)
+# ciclos después de la que lo escribe. Este paso revisa la distancia entre
+# cada productor y sus consumidores siguiendo todos los caminos posibles:
+#
+#   - Secuencial: la instrucción anterior (distancia 1) y la de antes (2),
+#     salvo después de un J (no hay caída) o de las ranuras de un
+#     "beq $r, $r" (siempre se toma) a las que no salta ningún beq o j
+#   - BEQ tomado: beq, ranura 1, ranura 2, burbuja, destino. La ranura 2
+#     queda a distancia 2 del destino
+#   - J: j, burbuja, destino. Nada queda a menos de 3
+#
+# y agrega exactamente los NOPs que faltan, en el punto más cercano al
+# consumidor:
+#
+#   - Riesgo por el camino secuencial: los NOPs van antes de la etiqueta
+#     (los saltos a ella no los pagan)
+#   - Riesgo por un BEQ tomado: los NOPs van después de la etiqueta
+#
+# Nunca se inserta entre un BEQ y sus 2 ranuras de retardo (cambiaría qué
+# instrucciones se ejecutan al tomarlo); un riesgo que solo se arregla ahí
+# se reporta como no resuelto. Las etiquetas se recalculan al ensamblar el
+# texto resultante y los desplazamientos/direcciones numéricos de
+# beq/bne/j/jal se reescriben para apuntar a la misma instrucción.
+#
+# La semántica es la del datapath (mips_pipeline.register_use): bne, lui y
+# jal son NOP en el RTL y no leen ni escriben registros.
+#
+#   python mips_hazards.py programa.asm [-o programa_nops.asm]
+#   python mips_hazards.py --verificar      (casos de regresión)
+# ============================================================================
+
+import sys
+
+from mips_decoder import MIPSDecoder
+from mips_isa import REGISTER_ALIASES
+from mips_pipeline import (BRANCH_SLOTS, MEM_WORDS, RAW_DISTANCE, decode_word,
+                           register_use)
+
+# Elementos del programa durante el análisis
+ENTRY, INSTR, NOP = range(3)
+
+
+def control_flow(words):
+    """Control de flujo del RTL por instrucción: (es J, es beq, siempre se
+    toma (beq $r, $r), destino del beq o None, índices a los que salta
+    algún beq o j)"""
+    records = [decode_word(word) for word in words]
+    jumps = [bool(record[2]) for record in records]
+    branches = [bool(record[4][4]) for record in records]
+    always = [branches[i] and records[i][0] == records[i][1]
+              for i in range(len(words))]
+    targets = [i + 1 + ((word & 0xFFFF) ^ 0x8000) - 0x8000
+               if branches[i] else None
+               for i, word in enumerate(words)]
+    entered = {target for target in targets if target is not None}
+    entered.update(record[3] >> 2 for record in records if record[2])
+    return jumps, branches, always, targets, entered
+
+
+def falls_through(original, k, jumps, always, entered):
+    """¿La ejecución puede pasar secuencialmente de la posición k a la k+1?
+    original(j) es el índice original de la instrucción en la posición j
+    (None para un NOP insertado). Después de la segunda ranura de un
+    "beq $r, $r" solo se cae si alguna ranura es destino de un salto."""
+    i = original(k)
+    if i is not None and jumps[i]:
+        return False
+    b = k - BRANCH_SLOTS
+    if b >= 0:
+        branch = original(b)
+        if branch is not None and always[branch]:
+            return any(original(slot) in entered for slot in range(b + 1, k + 1))
+    return True
+
+
+class Hazard:
+    """Un consumidor a menos de RAW_DISTANCE de su productor"""
+
+    __slots__ = ('consumer', 'producer', 'register', 'distance', 'taken')
+
+    def __init__(self, consumer, producer, register, distance, taken):
+        self.consumer = consumer    # Índice de la instrucción original
+        self.producer = producer
+        self.register = register
+        self.distance = distance
+        self.taken = taken          # True: por un BEQ tomado
+
+    def __repr__(self):
+        return (f"Hazard({self.producer}->{self.consumer}, ${self.register}, "
+                f"d={self.distance}{', beq' if self.taken else ''})")
+
+
+class HazardAnalyzer:
+    """Programa como lista de elementos: (ENTRY, i) marca a dónde saltan los
+    branches a la instrucción original i, (INSTR, i) es la instrucción y
+    (NOP, info) un NOP insertado"""
+
+    def __init__(self, code, decoder=None):
+        self.decoder = decoder or MIPSDecoder()
+        self.code = code
+        result = self.decoder.assemble(code)
+        if self.decoder.errors:
+            raise ValueError("El programa tiene errores:\n" +
+                             '\n'.join(self.decoder.errors))
+        self.words = list(result.words)
+        self.lines = list(result.lines)
+        self.use = [register_use(word) for word in self.words]
+        self.loads = [bool(decode_word(word)[4][1]) for word in self.words]
+        n = len(self.words)
+        # self.targets: destino (índice original) de cada beq del RTL
+        (self.jumps, self.branches, self.always, self.targets,
+         self.entered) = control_flow(self.words)
+        self.layout = []
+        for i in range(n):
+            self.layout += [(ENTRY, i), (INSTR, i)]
+        self.unresolved = []
+
+    # ------------------------------------------------------------------
+    # Posiciones
+    # ------------------------------------------------------------------
+
+    def slots(self):
+        """(elemento por ciclo, posición en layout por ciclo, ciclo de
+        entrada de cada instrucción original)"""
+        items, where, entry = [], [], {}
+        for k, item in enumerate(self.layout):
+            if item[0] == ENTRY:
+                entry[item[1]] = len(items)
+            else:
+                items.append(item)
+                where.append(k)
+        return items, where, entry
+
+    def _allowed(self, items, gap):
+        """¿Se puede insertar entre los ciclos gap-1 y gap? (no dentro de
+        las ranuras de un BEQ)"""
+        for b in range(max(0, gap - BRANCH_SLOTS), gap):
+            if items[b][0] == INSTR and self.branches[items[b][1]]:
+                return False
+        return True
+
+    def _falls_into(self, items, k):
+        """¿La ejecución puede pasar secuencialmente del ciclo k al k+1?"""
+        return falls_through(lambda j: items[j][1] if items[j][0] == INSTR else None,
+                             k, self.jumps, self.always, self.entered)
+
+    # ------------------------------------------------------------------
+    # Riesgos
+    # ------------------------------------------------------------------
+
+    def hazards_at(self, items, incoming, c):
+        """Riesgos del consumidor en el ciclo c: [(productor, ciclo del
+        productor, registro, distancia, por beq tomado)]"""
+        item = items[c]
+        if item[0] != INSTR:
+            return []
+        reads = self.use[item[1]][1]
+        if not reads:
+            return []
+        found = []
+
+        def check(p, distance, taken):
+            producer = items[p]
+            if producer[0] == INSTR:
+                reg = self.use[producer[1]][0]
+                if reg and reg in reads:
+                    found.append((producer[1], p, reg, distance, taken))
+
+        # Camino secuencial (distancias 1 .. RAW_DISTANCE-1)
+        k = c
+        for distance in range(1, RAW_DISTANCE):
+            k -= 1
+            if k < 0 or not self._falls_into(items, k):
+                break
+            check(k, distance, False)
+        # BEQ tomado: la última ranura queda a BRANCH_SLOTS del destino
+        for slot in incoming.get(c, ()):
+            for distance in range(BRANCH_SLOTS, RAW_DISTANCE):
+                p = slot - (distance - BRANCH_SLOTS)
+                check(p, distance, True)
+        return found
+
+    def _incoming(self, items, entry):
+        """Ciclo de destino -> ciclos de la última ranura de los BEQ que
+        saltan ahí"""
+        incoming = {}
+        for k, item in enumerate(items):
+            if item[0] == INSTR and self.branches[item[1]]:
+                slot = k + BRANCH_SLOTS
+                target = self.targets[item[1]]
+                if slot < len(items) and target in entry:
+                    incoming.setdefault(entry[target], []).append(slot)
+        return incoming
+
+    def hazards(self):
+        """Todos los riesgos del programa en su forma actual"""
+        items, _, entry = self.slots()
+        incoming = self._incoming(items, entry)
+        return [Hazard(items[c][1], producer, reg, distance, taken)
+                for c in range(len(items))
+                for producer, _, reg, distance, taken
+                in self.hazards_at(items, incoming, c)]
+
+    # ------------------------------------------------------------------
+    # Inserción de NOPs
+    # ------------------------------------------------------------------
+
+    def pad(self):
+        """Inserta los NOPs mínimos; regresa cuántos se agregaron"""
+        added = 0
+        start = 0
+        skipped = set()
+        while True:
+            items, where, entry = self.slots()
+            incoming = self._incoming(items, entry)
+            for c in range(start, len(items)):
+                if c in skipped:
+                    continue
+                found = self.hazards_at(items, incoming, c)
+                if found:
+                    break
+            else:
+                return added
+
+            consumer = items[c][1]
+            taken = [h for h in found if h[4]]
+            if taken:
+                # Después de la etiqueta: lo pagan el salto y la caída
+                need = max(RAW_DISTANCE - h[3] for h in taken)
+                gap, index, hazard = c, where[c], max(taken, key=lambda h: -h[3])
+            else:
+                need = max(RAW_DISTANCE - h[3] for h in found)
+                hazard = min(found, key=lambda h: h[3])
+                gap = c
+                if not self._allowed(items, gap):
+                    # Solo queda entre el productor más lejano y el siguiente
+                    far = [h for h in found if h[3] > 1]
+                    if len(far) == len(found):
+                        gap = c - 1
+                        need = max(RAW_DISTANCE - h[3] for h in far)
+                # Antes de la etiqueta: los saltos no lo pagan
+                index = where[gap - 1] + 1 if gap else 0
+
+            if not self._allowed(items, gap):
+                self.unresolved.append(
+                    f"Línea {self.lines[consumer]}: ${hazard[2]} de la línea "
+                    f"{self.lines[hazard[0]]} a distancia {hazard[3]}; solo se "
+                    f"arregla dentro de las ranuras de un beq")
+                skipped.add(c)
+                start = c
+                continue
+
+            cause = 'load_use' if self.loads[hazard[0]] else 'raw'
+            info = (cause, hazard[2], hazard[0], consumer)
+            self.layout[index:index] = [(NOP, info)] * need
+            added += need
+            # Los consumidores anteriores al punto de inserción no cambian
+            skipped = {k + need if k >= gap else k for k in skipped}
+            start = gap
+
+    # ------------------------------------------------------------------
+    # Texto
+    # ------------------------------------------------------------------
+
+    def render(self):
+        """Código fuente con los NOPs y los destinos numéricos corregidos"""
+        items, _, entry = self.slots()
+        position = {item[1]: k for k, item in enumerate(items) if item[0] == INSTR}
+        total = len(items)
+        n = len(self.words)
+
+        def entry_of(index):
+            if 0 <= index < n:
+                return entry[index]
+            return total + index - n if index >= n else index
+
+        # NOPs antes de la etiqueta / después de la etiqueta de cada instrucción
+        before = [[] for _ in range(n)]
+        after = [[] for _ in range(n)]
+        pending = []
+        for item in self.layout:
+            if item[0] == NOP:
+                pending.append(item[1])
+            elif item[0] == ENTRY:
+                before[item[1]] = pending
+                pending = []
+            else:
+                after[item[1]] = pending
+                pending = []
+
+        lines = self.code.strip().split('\n')
+        instr_at = {line: i for i, line in enumerate(self.lines)}
+        # Los NOPs "antes de la etiqueta" van antes de la primera línea con
+        # etiqueta desde la instrucción anterior (o de la instrucción)
+        label_line = {}
+        previous = 0
+        for i, line_num in enumerate(self.lines):
+            for number in range(previous + 1, line_num + 1):
+                if self.decoder.split_line(lines[number - 1])[0] is not None:
+                    label_line[number] = i
+                    break
+            previous = line_num
+        labeled = set(label_line.values())
+
+        def nop_lines(infos, indent):
+            return [f"{indent}nop  # {cause}: {REGISTER_ALIASES[reg]}/${reg} "
+                    f"(línea {self.lines[producer]} -> "
+                    f"{self.lines[consumer]})"
+                    for cause, reg, producer, consumer in infos]
+
+        out = []
+        for number, line in enumerate(lines, 1):
+            if number in label_line:
+                out += nop_lines(before[label_line[number]], self._indent(line))
+            i = instr_at.get(number)
+            if i is None:
+                out.append(line)
+                continue
+            if i not in labeled:
+                out += nop_lines(before[i], self._indent(line))
+            line = self._retarget(line, i, position, entry_of)
+            label, _ = self.decoder.split_line(line)
+            if after[i] and label is not None:
+                # Separar "etiqueta: instrucción" para poner los NOPs en medio
+                colon = line.index(':') + 1
+                column = len(line) - len(line[colon:].lstrip())
+                out.append(line[:colon])
+                out += nop_lines(after[i], ' ' * column)
+                out.append(' ' * column + line[column:])
+                continue
+            out += nop_lines(after[i], self._indent(line))
+            out.append(line)
+        return '\n'.join(out) + '\n'
+
+    @staticmethod
+    def _indent(line):
+        """Sangría de una línea de instrucción (4 espacios si empieza con
+        etiqueta)"""
+        stripped = line.lstrip()
+        if ':' in stripped.partition('#')[0]:
+            return '    '
+        return line[:len(line) - len(stripped)]
+
+    def _retarget(self, line, i, position, entry_of):
+        """Reescribe el destino numérico de beq/bne/j/jal"""
+        _, text = self.decoder.split_line(line)
+        parts = text.replace(',', ' ').split()
+        name = parts[0].lower()
+        if name not in ('beq', 'bne', 'j', 'jal') or len(parts) < 2:
+            return line
+        operand = parts[-1]
+        if operand in self.decoder.labels:
+            return line
+        word = self.words[i]
+        if name in ('j', 'jal'):
+            new = str(entry_of(word & 0x03FFFFFF) * 4)
+        else:
+            target = i + 1 + ((word & 0xFFFF) ^ 0x8000) - 0x8000
+            new = str(entry_of(target) - (position[i] + 1))
+        if new == operand:
+            return line
+        start = line.index(text) + text.rindex(operand)
+        return line[:start] + new + line[start + len(operand):]
+
+    def report(self, added):
+        causes = {'raw': 0, 'load_use': 0}
+        for item in self.layout:
+            if item[0] == NOP:
+                causes[item[1][0]] += 1
+        size = len(self.words) + added
+        return {
+            'nops': added,
+            'por_causa': causes,
+            'instrucciones_antes': len(self.words),
+            'instrucciones': size,
+            'cabe_en_rom': size <= MEM_WORDS,
+            'sin_resolver': list(self.unresolved),
+        }
+
+
+def pad_hazards(code, decoder=None):
+    """Agrega los NOPs mínimos para que ninguna instrucción lea un registro
+    antes de que se escriba. Regresa (código nuevo, reporte)."""
+    analyzer = HazardAnalyzer(code, decoder)
+    added = analyzer.pad()
+    return analyzer.render(), analyzer.report(added)
+
+
+def find_hazards(code, decoder=None):
+    """Riesgos RAW que tiene el programa tal como está"""
+    return HazardAnalyzer(code, decoder).hazards()
+
+
+def format_report(report):
+    """Resumen del reporte para consola"""
+    causes = report['por_causa']
+    lines = [f"NOPs insertados: {report['nops']}  (RAW {causes['raw']}, "
+             f"load-use {causes['load_use']})",
+             f"Instrucciones: {report['instrucciones_antes']} -> {report['instrucciones']}"]
+    if not report['cabe_en_rom']:
+        lines.append(f"⚠️ El programa ya no cabe en la ROM ({MEM_WORDS} palabras)")
+    for message in report['sin_resolver']:
+        lines.append(f"⚠️ Sin resolver: {message}")
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# Casos de regresión
+# ============================================================================
+
+# (descripción, programa, registros esperados al final)
+REGRESSION_CASES = [
+    ("ranura de un 'beq $r, $r' que también es destino de otro beq",
+     """\
+        beq  $0, $0, L15
+        addi $3, $0, 6
+        nop
+L14:    beq  $0, $0, L18
+L15:    addi $5, $0, 1
+L16:    xori $2, $3, 4
+L17:    xori $4, $2, 14
+L18:    j    L18
+""", {2: 2, 3: 6, 4: 12, 5: 1}),
+]
+
+
+def verify_padding(code, cycles=2000):
+    """Ejecuta el programa con NOPs en MIPSPipeline y en MIPSSimulator
+    (referencia sin riesgos, con las ranuras de BEQ). Regresa (registros
+    del pipeline, diferencias)"""
+    from mips_isa_sim import MIPSSimulator
+    from mips_pipeline import MIPSPipeline
+
+    padded, _ = pad_hazards(code)
+    words = list(MIPSDecoder().assemble(padded).words)
+    cpu = MIPSPipeline(words)
+    cpu.run(cycles)
+    sim = MIPSSimulator(words)
+    sim.run(cycles)
+    diffs = [f"${i}: referencia={a} pipeline={b}"
+             for i, (a, b) in enumerate(zip(sim.registers, cpu.registers)) if a != b]
+    diffs += [f"mem[{i * 4}]: referencia={a} pipeline={b}"
+              for i, (a, b) in enumerate(zip(sim.dmem, cpu.dmem)) if a != b]
+    return cpu.registers, diffs
+
+
+def run_regression():
+    """Corre REGRESSION_CASES; regresa la lista de fallas"""
+    failures = []
+    for name, code, expected in REGRESSION_CASES:
+        registers, diffs = verify_padding(code)
+        diffs += [f"${reg}: se esperaba {value}, quedó {registers[reg]}"
+                  for reg, value in expected.items() if registers[reg] != value]
+        failures += [f"{name}: {diff}" for diff in diffs]
+    return failures
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Inserta los NOPs mínimos para los riesgos RAW de MIPS_Pipeline.v")
+    parser.add_argument("entrada", nargs="?", help="archivo .asm")
+    parser.add_argument("-o", "--salida", default=None,
+                        help="archivo .asm con los NOPs (por defecto, salida estándar)")
+    parser.add_argument("--verificar", action="store_true",
+                        help="correr los casos de regresión en el modelo del pipeline")
+    args = parser.parse_args()
+
+    if args.verificar:
+        failures = run_regression()
+        for failure in failures:
+            print(f"❌ {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"✅ {len(REGRESSION_CASES)} caso(s) de regresión correctos")
+        return
+    if args.entrada is None:
+        parser.error("falta el archivo .asm")
+
+    try:
+        with open(args.entrada, 'r') as f:
+            code, report = pad_hazards(f.read())
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(code)
+    else:
+        sys.stdout.write(code)
+    print(format_report(report), file=sys.stderr)
+    if report['sin_resolver']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
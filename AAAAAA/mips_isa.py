@@ -0,0 +1,264 @@
+# ============================================================================
+# Especificación del ISA compartida
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Única fuente de las tablas para mips_decoder.py (AAAAAA) y txt.py (QUEKA):
+#   - funct/opcode por mnemónico (el orden define los ids de
+#     mips_disassembler.MNEMONICS)
+#   - Una sola tabla de registros: $0-$31 y sus alias ($zero, $t0, ...)
+#   - Por mnemónico, la palabra base con los campos fijos ya puestos
+#     (opcode y funct) y la forma de sus operandos
+#
+# Codificar es buscar el mnemónico en INSTRUCTIONS, leer los operandos con
+# el parser de su forma y hacer OR con la palabra base. Una instrucción
+# agregada aquí aparece en el ensamblador, el desensamblador, el
+# codificador por columnas y txt.py.
+# ============================================================================
+
+import re
+
+# Forma de los operandos
+KIND_WORD, KIND_NOP, KIND_R, KIND_SHIFT, KIND_I, KIND_MEM, KIND_LUI, \
+    KIND_BRANCH, KIND_JUMP = range(9)
+
+# Instrucciones R-type (opcode = 000000): funct
+R_TYPE_FUNCT = {
+    'add':  0b100000,  # 32
+    'sub':  0b100010,  # 34
+    'and':  0b100100,  # 36
+    'or':   0b100101,  # 37
+    'slt':  0b101010,  # 42
+    'sll':  0b000000,  # 0
+    'srl':  0b000010,  # 2
+}
+
+# Instrucciones I-type: opcode
+I_TYPE_OPCODE = {
+    'addi': 0b001000,  # 8
+    'andi': 0b001100,  # 12
+    'ori':  0b001101,  # 13
+    'xori': 0b001110,  # 14
+    'slti': 0b001010,  # 10
+    'beq':  0b000100,  # 4
+    'bne':  0b000101,  # 5
+    'lw':   0b100011,  # 35
+    'sw':   0b101011,  # 43
+    'lui':  0b001111,  # 15
+}
+
+# Instrucciones J-type: opcode
+J_TYPE_OPCODE = {
+    'j':    0b000010,  # 2
+    'jal':  0b000011,  # 3
+}
+
+# Alias de cada registro en orden ($zero = 0 ... $ra = 31)
+REGISTER_ALIASES = (
+    '$zero', '$at', '$v0', '$v1', '$a0', '$a1', '$a2', '$a3',
+    '$t0', '$t1', '$t2', '$t3', '$t4', '$t5', '$t6', '$t7',
+    '$s0', '$s1', '$s2', '$s3', '$s4', '$s5', '$s6', '$s7',
+    '$t8', '$t9', '$k0', '$k1', '$gp', '$sp', '$fp', '$ra',
+)
+
+# Tabla única de registros: el alias va antes que $n (nombre preferido)
+REGISTERS = {}
+for _number, _alias in enumerate(REGISTER_ALIASES):
+    REGISTERS[_alias] = _number
+    REGISTERS[f'${_number}'] = _number
+del _number, _alias
+
+_MEM_OPERAND = re.compile(r'(-?\d+)\((\$\w+)\)')
+
+
+# ============================================================================
+# Operandos
+# ============================================================================
+
+def parse_register(reg_str):
+    """Convierte string de registro a número"""
+    reg_str = reg_str.strip().lower()
+    if reg_str in REGISTERS:
+        return REGISTERS[reg_str]
+    # Formas numéricas que el ensamblador de QUEKA siempre aceptó ($03, $+3)
+    if reg_str.startswith('$'):
+        try:
+            reg_num = int(reg_str[1:])
+        except ValueError:
+            reg_num = -1
+        if 0 <= reg_num <= 31:
+            return reg_num
+    raise ValueError(f"Registro inválido: {reg_str}")
+
+
+def parse_immediate(imm_str):
+    """Convierte string de inmediato a número (decimal, 0x o 0b)"""
+    imm_str = imm_str.strip()
+    try:
+        if imm_str.startswith('0x') or imm_str.startswith('0X'):
+            return int(imm_str, 16)
+        elif imm_str.startswith('0b') or imm_str.startswith('0B'):
+            return int(imm_str, 2)
+        else:
+            return int(imm_str)
+    except ValueError:
+        raise ValueError(f"Inmediato inválido: {imm_str}")
+
+
+def to_twos_complement(value, bits):
+    """Convierte a complemento a 2"""
+    if value < 0:
+        value = (1 << bits) + value
+    return value & ((1 << bits) - 1)
+
+
+# Cada parser recibe (parts, etiquetas, dirección) y regresa los campos
+# variables ya en su posición; parts[0] es el mnemónico.
+
+def _nop_operands(parts, labels, address):
+    return 0
+
+
+def _r_operands(parts, labels, address):
+    # add rd, rs, rt
+    rd = parse_register(parts[1])
+    rs = parse_register(parts[2])
+    rt = parse_register(parts[3])
+    return (rs << 21) | (rt << 16) | (rd << 11)
+
+
+def _shift_operands(parts, labels, address):
+    # sll rd, rt, shamt
+    rd = parse_register(parts[1])
+    rt = parse_register(parts[2])
+    shamt = parse_immediate(parts[3])
+    return (rt << 16) | (rd << 11) | (shamt << 6)
+
+
+def _i_operands(parts, labels, address):
+    # addi rt, rs, imm
+    rt = parse_register(parts[1])
+    rs = parse_register(parts[2])
+    imm = to_twos_complement(parse_immediate(parts[3]), 16)
+    return (rs << 21) | (rt << 16) | imm
+
+
+def _mem_operands(parts, labels, address):
+    # lw rt, offset(rs)
+    rt = parse_register(parts[1])
+    match = _MEM_OPERAND.match(parts[2])
+    if not match:
+        raise ValueError(f"Formato inválido para {parts[0].lower()}: {parts[2]}")
+    offset = parse_immediate(match.group(1))
+    rs = parse_register(match.group(2))
+    return (rs << 21) | (rt << 16) | to_twos_complement(offset, 16)
+
+
+def _lui_operands(parts, labels, address):
+    # lui rt, imm
+    rt = parse_register(parts[1])
+    return (rt << 16) | to_twos_complement(parse_immediate(parts[2]), 16)
+
+
+def _branch_operands(parts, labels, address):
+    # beq rs, rt, etiqueta (o desplazamiento en palabras)
+    rs = parse_register(parts[1])
+    rt = parse_register(parts[2])
+    label = parts[3].strip()
+    if label in labels:
+        # Offset relativo al PC+4 (en palabras)
+        offset = (labels[label] - (address + 4)) // 4
+    else:
+        try:
+            offset = parse_immediate(label)
+        except ValueError:
+            raise ValueError(f"Etiqueta no encontrada: {label}") from None
+    return (rs << 21) | (rt << 16) | to_twos_complement(offset, 16)
+
+
+def _jump_operands(parts, labels, address):
+    # j etiqueta (o dirección en bytes)
+    label = parts[1].strip()
+    if label in labels:
+        target = labels[label] // 4
+    else:
+        try:
+            target = parse_immediate(label) // 4
+        except ValueError:
+            raise ValueError(f"Etiqueta no encontrada: {label}") from None
+    return target & 0x03FFFFFF
+
+
+OPERAND_PARSERS = {
+    KIND_NOP: _nop_operands,
+    KIND_R: _r_operands,
+    KIND_SHIFT: _shift_operands,
+    KIND_I: _i_operands,
+    KIND_MEM: _mem_operands,
+    KIND_LUI: _lui_operands,
+    KIND_BRANCH: _branch_operands,
+    KIND_JUMP: _jump_operands,
+}
+
+# Sintaxis de cada forma (para mensajes y ayuda)
+OPERAND_SYNTAX = {
+    KIND_NOP: '',
+    KIND_R: '$rd, $rs, $rt',
+    KIND_SHIFT: '$rd, $rt, shamt',
+    KIND_I: '$rt, $rs, imm',
+    KIND_MEM: '$rt, offset($rs)',
+    KIND_LUI: '$rt, imm',
+    KIND_BRANCH: '$rs, $rt, etiqueta',
+    KIND_JUMP: 'etiqueta',
+}
+
+
+# ============================================================================
+# Tabla de instrucciones
+# ============================================================================
+
+def instruction_kind(name):
+    """Forma de los operandos de un mnemónico de las tablas"""
+    if name in R_TYPE_FUNCT:
+        return KIND_SHIFT if name in ('sll', 'srl') else KIND_R
+    if name in ('beq', 'bne'):
+        return KIND_BRANCH
+    if name in ('lw', 'sw'):
+        return KIND_MEM
+    if name == 'lui':
+        return KIND_LUI
+    if name in J_TYPE_OPCODE:
+        return KIND_JUMP
+    return KIND_I
+
+
+def build_instructions():
+    """mnemónico -> (palabra base, forma, parser de operandos)"""
+    table = {'nop': (0, KIND_NOP, _nop_operands)}
+    for name, funct in R_TYPE_FUNCT.items():
+        kind = instruction_kind(name)
+        table[name] = (funct, kind, OPERAND_PARSERS[kind])
+    for name, opcode in list(I_TYPE_OPCODE.items()) + list(J_TYPE_OPCODE.items()):
+        kind = instruction_kind(name)
+        table[name] = (opcode << 26, kind, OPERAND_PARSERS[kind])
+    return table
+
+
+INSTRUCTIONS = build_instructions()
+
+
+def encode(parts, labels=None, address=0):
+    """Codifica una instrucción separada en partes ([mnemónico, op1, ...])
+    en la dirección 'address' (para el desplazamiento de beq/bne)"""
+    name = parts[0].lower()
+    try:
+        base, _, operands = INSTRUCTIONS[name]
+    except KeyError:
+        raise ValueError(f"Instrucción desconocida: {name}") from None
+    return base | operands(parts, labels or {}, address)
+
+
+def syntax(name):
+    """Ejemplo de sintaxis de un mnemónico ('add $rd, $rs, $rt')"""
+    operands = OPERAND_SYNTAX[INSTRUCTIONS[name][1]]
+    return f"{name} {operands}".strip()
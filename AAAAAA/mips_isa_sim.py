@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Simulador funcional (ISA) con código predecodificado
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Ejecuta una instrucción por paso, sin pipeline, para obtener el
+# resultado "de referencia" de un programa y compararlo contra el RTL.
+#
+# Instrucciones (las que acepta ControlUnit.v):
+#   R-TYPE: ADD, SUB, AND, OR, SLT
+#   I-TYPE: ADDI, ANDI, ORI, XORI, SLTI, BEQ, LW, SW
+#   J-TYPE: J
+#
+# Cada palabra de la ROM se decodifica UNA vez al cargar la imagen y se
+# convierte en un manejador (closure) que ya trae sus operandos y regresa
+# el índice de la siguiente instrucción. El ciclo de ejecución solo hace
+# pc = code[pc]().
+#
+# La decodificación es la del datapath (ControlUnit.v + ALUControl.v +
+# SignExtend.v): el inmediato de ANDI/ORI/XORI se extiende con signo y los
+# opcodes no reconocidos se comportan como NOP.
+#
+# Saltos como en MIPS_Pipeline.v: BEQ se resuelve en MEM, así que las 2
+# instrucciones que lo siguen (BRANCH_SLOTS) se ejecutan siempre, la
+# tercera se descarta y luego llega el destino. J se resuelve en ID y
+# descarta la instrucción siguiente. Un BEQ tomado regresa su destino
+# codificado en negativo y el ciclo de ejecución sale del camino rápido
+# para ejecutar sus ranuras.
+# ============================================================================
+
+import os
+
+from mips_pipeline import (MASK32, MEM_WORDS, ALU_ADD, ALU_SUB, ALU_AND,
+                           ALU_OR, ALU_XOR, ALU_SLT, BRANCH_SLOTS,
+                           control_signals, alu_control, format_state,
+                           load_readmem)
+
+# Límite de la línea de comandos: un programa sin 'j' a sí mismo (o que
+# nunca sale de un ciclo) no debe dejar colgada la terminal
+DEFAULT_MAX_STEPS = 10_000_000
+
+
+class Halt(Exception):
+    """Se alcanzó un salto a sí mismo (fin del programa)"""
+
+
+# ============================================================================
+# Construcción de manejadores
+# ============================================================================
+
+def _alu_handler(regs, ctrl, rs, rt, dst, imm, use_imm, nxt):
+    """Manejador para instrucciones que solo escriben el resultado de la ALU"""
+    if dst == 0:
+        # Escribir en $0 no tiene efecto
+        return lambda: nxt
+
+    if use_imm:
+        if ctrl == ALU_ADD:
+            def handler():
+                regs[dst] = (regs[rs] + imm) & MASK32
+                return nxt
+        elif ctrl == ALU_AND:
+            def handler():
+                regs[dst] = regs[rs] & imm
+                return nxt
+        elif ctrl == ALU_OR:
+            def handler():
+                regs[dst] = regs[rs] | imm
+                return nxt
+        elif ctrl == ALU_XOR:
+            def handler():
+                regs[dst] = regs[rs] ^ imm
+                return nxt
+        elif ctrl == ALU_SLT:
+            simm = imm ^ 0x80000000
+
+            def handler():
+                regs[dst] = 1 if (regs[rs] ^ 0x80000000) < simm else 0
+                return nxt
+        else:
+            def handler():
+                regs[dst] = (regs[rs] - imm) & MASK32
+                return nxt
+        return handler
+
+    if ctrl == ALU_ADD:
+        def handler():
+            regs[dst] = (regs[rs] + regs[rt]) & MASK32
+            return nxt
+    elif ctrl == ALU_SUB:
+        def handler():
+            regs[dst] = (regs[rs] - regs[rt]) & MASK32
+            return nxt
+    elif ctrl == ALU_AND:
+        def handler():
+            regs[dst] = regs[rs] & regs[rt]
+            return nxt
+    elif ctrl == ALU_OR:
+        def handler():
+            regs[dst] = regs[rs] | regs[rt]
+            return nxt
+    elif ctrl == ALU_XOR:
+        def handler():
+            regs[dst] = regs[rs] ^ regs[rt]
+            return nxt
+    else:
+        def handler():
+            regs[dst] = 1 if (regs[rs] ^ 0x80000000) < (regs[rt] ^ 0x80000000) else 0
+            return nxt
+    return handler
+
+
+def make_handler(word, index, regs, dmem):
+    """Convierte la palabra en la posición 'index' de la ROM en su manejador"""
+    opcode = (word >> 26) & 0x3F
+    rs = (word >> 21) & 0x1F
+    rt = (word >> 16) & 0x1F
+    rd = (word >> 11) & 0x1F
+    funct = word & 0x3F
+    imm = word & 0xFFFF
+    sign_ext = imm | 0xFFFF0000 if imm & 0x8000 else imm
+    nxt = (index + 1) % MEM_WORDS
+
+    (reg_dst, alu_src, mem_to_reg, reg_write, mem_read, mem_write,
+     branch, alu_op, jump) = control_signals(opcode)
+
+    if jump:
+        target = word & 0xFF    # Address[9:2] de {PC+4[31:28], addr, 00}
+        if target == index:
+            def handler():
+                raise Halt()
+        else:
+            def handler():
+                return target
+        return handler
+
+    if branch:
+        # Tomado: ~(destino, siguiente) para que run() ejecute las ranuras
+        taken = ~(((nxt + sign_ext) % MEM_WORDS) * MEM_WORDS + nxt)
+        if rs == rt:
+            return lambda: taken
+
+        def handler():
+            return taken if regs[rs] == regs[rt] else nxt
+        return handler
+
+    if mem_read:
+        if rt == 0:
+            return lambda: nxt
+
+        def handler():
+            regs[rt] = dmem[((regs[rs] + sign_ext) >> 2) & 0xFF]
+            return nxt
+        return handler
+
+    if mem_write:
+        def handler():
+            dmem[((regs[rs] + sign_ext) >> 2) & 0xFF] = regs[rt]
+            return nxt
+        return handler
+
+    if reg_write:
+        return _alu_handler(regs, alu_control(alu_op, funct, opcode), rs, rt,
+                            rd if reg_dst else rt, sign_ext, alu_src, nxt)
+
+    # NOP / opcode no reconocido
+    return lambda: nxt
+
+
+# ============================================================================
+# Simulador
+# ============================================================================
+
+class MIPSSimulator:
+    """Simulador funcional con código predecodificado"""
+
+    def __init__(self, instrucciones=None, datos=None):
+        # Los manejadores capturan estas listas: se modifican en su lugar
+        self.registers = [0] * 32
+        self.dmem = [0] * MEM_WORDS
+        self._dmem_init = list(self.dmem)
+        self.load_instructions(instrucciones if instrucciones is not None else [])
+        if datos is not None:
+            self.load_data(datos)
+        self.reset()
+
+    def load_instructions(self, source):
+        """Carga la ROM desde un archivo $readmemb o una lista de palabras
+        y la predecodifica (aplica desde la siguiente instrucción, como en
+        MIPSPipeline; registros, memoria y PC no cambian)"""
+        if isinstance(source, (str, os.PathLike)):
+            source = load_readmem(source)
+        self.imem = [0] * MEM_WORDS
+        for i, word in enumerate(source[:MEM_WORDS]):
+            self.imem[i] = word & MASK32
+        self._code = [make_handler(word, i, self.registers, self.dmem)
+                      for i, word in enumerate(self.imem)]
+        # Destino de cada J (None si no es J) para las ranuras de BEQ
+        self._jump_targets = [word & 0xFF if control_signals(word >> 26)[8] else None
+                              for word in self.imem]
+
+    def load_data(self, source):
+        """Carga la memoria de datos desde un archivo $readmemb o una lista;
+        como en MIPSPipeline, reemplaza la memoria actual y la de reset()"""
+        if isinstance(source, (str, os.PathLike)):
+            source = load_readmem(source) if os.path.exists(source) else []
+        self._dmem_init = [0] * MEM_WORDS
+        for i, word in enumerate(source[:MEM_WORDS]):
+            self._dmem_init[i] = word & MASK32
+        self.dmem[:] = self._dmem_init
+
+    def reset(self):
+        """Reinicia registros, memoria de datos y PC"""
+        self.registers[:] = [0] * 32
+        self.dmem[:] = self._dmem_init
+        self.pc_index = 0
+        self.steps = 0
+        self.halted = False
+
+    @property
+    def pc(self):
+        """PC en bytes"""
+        return self.pc_index * 4
+
+    def run(self, max_steps=None):
+        """Ejecuta hasta 'max_steps' instrucciones (más las ranuras de un
+        BEQ tomado al final) o hasta un 'j' a sí mismo. Regresa el número
+        de instrucciones ejecutadas."""
+        if max_steps is None:
+            max_steps = 1 << 62
+        code = self._code
+        pc = self.pc_index
+        executed = max_steps
+        slots = 0
+        try:
+            for executed in range(max_steps):
+                pc = code[pc]()
+                if pc < 0:
+                    pc, count = self._delay_slots(~pc)
+                    slots += count
+            else:
+                executed = max_steps
+        except Halt:
+            self.halted = True
+        self.pc_index = pc
+        executed += slots
+        self.steps += executed
+        return executed
+
+    def _delay_slots(self, taken):
+        """Ejecuta las ranuras de un BEQ tomado. Se cuentan búsquedas
+        desde el BEQ (0): un BEQ tomado descarta la búsqueda +3 y manda al
+        destino en la +4; un J descarta la +1 y manda al destino en la +2
+        (y gana si coincide con un BEQ, como PC_Sel). Regresa (índice de la
+        siguiente instrucción, instrucciones ejecutadas)."""
+        code = self._code
+        jump_targets = self._jump_targets
+        target, pc = divmod(taken, MEM_WORDS)
+        redirect = {BRANCH_SLOTS + 2: target}
+        squashed = {BRANCH_SLOTS + 1}
+        executed = 0
+        fetch = 1
+        while True:
+            if fetch in redirect:
+                pc = redirect.pop(fetch)
+                if not redirect:
+                    return pc, executed
+            if fetch in squashed:
+                pc = (pc + 1) % MEM_WORDS
+            elif jump_targets[pc] is not None:
+                executed += 1
+                squashed.add(fetch + 1)
+                redirect[fetch + 2] = jump_targets[pc]
+                pc = (pc + 1) % MEM_WORDS
+            else:
+                executed += 1
+                pc = code[pc]()
+                if pc < 0:
+                    target, pc = divmod(~pc, MEM_WORDS)
+                    squashed.add(fetch + BRANCH_SLOTS + 1)
+                    redirect[fetch + BRANCH_SLOTS + 2] = target
+            fetch += 1
+
+    def dump(self):
+        """Regresa un resumen del estado"""
+        estado = "detenido (j a sí mismo)" if self.halted else "en ejecución"
+        return format_state(self.pc, self.registers, self.dmem,
+                            f"Instrucciones = {self.steps} ({estado})")
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Simulador funcional MIPS (resultado de referencia)")
+    parser.add_argument("instrucciones", nargs="?", default="instrucciones.txt",
+                        help="archivo $readmemb de la ROM (instrucciones.txt)")
+    parser.add_argument("datos", nargs="?", default="datos.txt",
+                        help="archivo $readmemb de la RAM (datos.txt)")
+    parser.add_argument("-n", "--pasos", type=int, default=DEFAULT_MAX_STEPS,
+                        help="máximo de instrucciones a ejecutar "
+                             f"(por defecto {DEFAULT_MAX_STEPS:,})")
+    parser.add_argument("--pipeline", type=int, metavar="CICLOS", default=None,
+                        help="simular también MIPS_Pipeline.v por CICLOS ciclos "
+                             "y mostrar diferencias con la referencia")
+    args = parser.parse_args()
+
+    sim = MIPSSimulator(args.instrucciones, args.datos)
+    start = time.perf_counter()
+    executed = sim.run(args.pasos)
+    elapsed = time.perf_counter() - start
+    print(sim.dump())
+    if elapsed > 0:
+        print(f"Ejecutadas {executed} instrucciones en {elapsed:.3f} s "
+              f"({executed / elapsed:,.0f} instr/s)")
+    if not sim.halted:
+        print(f"⚠️ Se alcanzó el límite de {args.pasos:,} instrucciones sin llegar "
+              f"a un 'j' a sí mismo (use --pasos para cambiarlo)")
+
+    if args.pipeline is not None:
+        from mips_pipeline import MIPSPipeline
+
+        cpu = MIPSPipeline(args.instrucciones, args.datos)
+        cpu.run(args.pipeline)
+        diffs = [f"  ${i}: referencia={a:08x} pipeline={b:08x}"
+                 for i, (a, b) in enumerate(zip(sim.registers, cpu.registers))
+                 if a != b]
+        diffs += [f"  mem[{i * 4}]: referencia={a:08x} pipeline={b:08x}"
+                  for i, (a, b) in enumerate(zip(sim.dmem, cpu.dmem))
+                  if a != b]
+        if diffs:
+            print(f"❌ {len(diffs)} diferencia(s) contra el pipeline:")
+            print("\n".join(diffs))
+        else:
+            print("✅ Registros y memoria coinciden con el pipeline")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,182 @@
+# ============================================================================
+# Escritura de imágenes de memoria (BIN, $readmemb, $readmemh, disperso)
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Capa de salida compartida por mips_decoder.py y QUEKA/python/txt.py.
+# Todo se serializa directo desde un buffer de palabras de 32 bits
+# (array('I'), lista, o un AssemblyResult con atributo .words):
+#
+#   bin        Big Endian, un array.byteswap() + tofile()
+#   readmemb   32 dígitos binarios por línea (MemoriaInstrucciones.v)
+#   readmemh   8 dígitos hex por línea (para $readmemh, mitad de tamaño)
+#   sparse-b   Registros @dirección + palabras binarias; las palabras en 0
+#   sparse-h   (NOP, valor inicial de la ROM) no se escriben
+# ============================================================================
+
+import sys
+from array import array
+
+FORMATS = ('bin', 'readmemb', 'readmemh', 'sparse-b', 'sparse-h')
+
+# Extensión -> formato (para los diálogos de guardar)
+EXTENSIONS = {
+    '.bin': 'bin',
+    '.txt': 'readmemb',
+    '.hex': 'readmemh',
+    '.mem': 'sparse-h',
+}
+
+CHUNK_WORDS = 4096      # Palabras por escritura en modo streaming
+
+_WORD_FORMAT = {
+    'readmemb': '{:032b}'.format,
+    'readmemh': '{:08x}'.format,
+    'sparse-b': '{:032b}'.format,
+    'sparse-h': '{:08x}'.format,
+}
+
+
+def word_buffer(words):
+    """Regresa las palabras como array('I') sin copiar si ya lo son"""
+    words = getattr(words, 'words', words)
+    if isinstance(words, array) and words.typecode == 'I':
+        return words
+    return array('I', words)
+
+
+def format_for_path(path, default='readmemb'):
+    """Formato de salida según la extensión del archivo"""
+    for ext, fmt in EXTENSIONS.items():
+        if str(path).lower().endswith(ext):
+            return fmt
+    return default
+
+
+# ============================================================================
+# Serialización en bloque
+# ============================================================================
+
+def to_bytes(words):
+    """Imagen binaria Big Endian (MIPS)"""
+    buf = array('I', word_buffer(words))
+    if sys.byteorder == 'little':
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def to_text(words, fmt='readmemb'):
+    """Imagen de texto: un solo join sobre todo el buffer"""
+    words = word_buffer(words)
+    if fmt.startswith('sparse'):
+        return ''.join(_sparse_records(words, _WORD_FORMAT[fmt]))
+    if not words:
+        return ''
+    return '\n'.join(map(_WORD_FORMAT[fmt], words)) + '\n'
+
+
+def _sparse_records(words, fmt_word, base=0):
+    """Genera el texto disperso: '@dir' (hex, en palabras) antes de cada
+    tramo de palabras distintas de 0"""
+    n = len(words)
+    i = 0
+    while i < n:
+        if not words[i]:
+            i += 1
+            continue
+        j = i
+        while j < n and words[j]:
+            j += 1
+        yield f'@{base + i:x}\n'
+        yield '\n'.join(map(fmt_word, words[i:j]))
+        yield '\n'
+        i = j
+
+
+def write_words(path, words, fmt=None):
+    """Escribe la imagen completa en 'path' (formato por extensión si no
+    se indica). Regresa los bytes escritos."""
+    fmt = fmt or format_for_path(path)
+    if fmt == 'bin':
+        buf = array('I', word_buffer(words))
+        if sys.byteorder == 'little':
+            buf.byteswap()
+        with open(path, 'wb') as f:
+            buf.tofile(f)
+        return len(buf) * 4
+    text = to_text(words, fmt)
+    with open(path, 'w') as f:
+        f.write(text)
+        # Bytes en disco (con '\r\n' en Windows), no caracteres
+        return f.tell()
+
+
+# ============================================================================
+# Escritura incremental (palabras que llegan de un generador)
+# ============================================================================
+
+class WordWriter:
+    """Escribe palabras conforme llegan, en bloques de CHUNK_WORDS"""
+
+    def __init__(self, f, fmt='readmemb'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconocido: {fmt}")
+        self.f = f
+        self.fmt = fmt
+        self.pending = array('I')
+        self.count = 0          # Palabras recibidas (dirección siguiente)
+        self.bytes_written = 0
+        self._last_written = None  # Para el formato disperso
+
+    def write(self, word):
+        self.pending.append(word)
+        if len(self.pending) >= CHUNK_WORDS:
+            self.flush()
+
+    def flush(self):
+        words = self.pending
+        if not words:
+            return
+        base = self.count
+        self.count += len(words)
+        self.pending = array('I')
+        if self.fmt == 'bin':
+            if sys.byteorder == 'little':
+                words.byteswap()
+            data = words.tobytes()
+            self.f.write(data)
+            self.bytes_written += len(data)
+            return
+        if self.fmt.startswith('sparse'):
+            text = ''.join(self._sparse_chunk(words, base))
+        else:
+            text = '\n'.join(map(_WORD_FORMAT[self.fmt], words)) + '\n'
+        self.f.write(text)
+        self.bytes_written += len(text)
+
+    def _sparse_chunk(self, words, base):
+        """Como _sparse_records, pero continúa un tramo del bloque anterior
+        sin repetir el registro @dirección"""
+        for record in _sparse_records(words, _WORD_FORMAT[self.fmt], base):
+            if record.startswith('@'):
+                if self._last_written == int(record[1:], 16) - 1:
+                    continue
+            yield record
+        # Última dirección escrita de este bloque
+        for i in range(len(words) - 1, -1, -1):
+            if words[i]:
+                self._last_written = base + i
+                break
+
+    def close(self):
+        self.flush()
+
+
+def write_stream(f, words, fmt='readmemb'):
+    """Escribe un iterable de palabras en el archivo abierto 'f'.
+    Regresa (palabras, bytes escritos)."""
+    writer = WordWriter(f, fmt)
+    for word in words:
+        writer.write(word)
+    writer.close()
+    return writer.count, writer.bytes_written
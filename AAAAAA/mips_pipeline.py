@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Modelo ciclo a ciclo del MIPS Pipeline de 5 etapas
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Reproduce en Python el comportamiento de MIPS_Pipeline.v:
+#   IF  -> IF/ID -> ID -> ID/EX -> EX -> EX/MEM -> MEM -> MEM/WB -> WB
+#
+# Igual que el RTL:
+#   - Sin unidad de forwarding ni deteccion de hazards
+#   - BancoRegistros escribe en flanco negativo (el dato de WB se ve en ID
+#     en el mismo ciclo)
+#   - BEQ se resuelve en MEM y solo limpia IF/ID (las 2 instrucciones
+#     siguientes ya en ID y EX se ejecutan)
+#   - J se resuelve en ID y tiene prioridad sobre el branch
+#   - Opcodes no reconocidos por ControlUnit.v se comportan como NOP
+#
+# Carga los mismos archivos que MemoriaInstrucciones.v ("instrucciones.txt")
+# y MemoriaDatos.v ("datos.txt") con $readmemb.
+#
+# Contadores de rendimiento (MIPSPipeline(counters=True) o --contadores):
+# ciclos, instrucciones retiradas, CPI, burbujas por causa, mezcla dinámica
+# por mnemónico y branches tomados/no tomados; reporte en JSON con --json.
+# ============================================================================
+
+import os
+import re
+
+MASK32 = 0xFFFFFFFF
+MEM_WORDS = 256
+
+# Opcodes (ControlUnit.v)
+OP_RTYPE = 0b000000
+OP_J     = 0b000010
+OP_BEQ   = 0b000100
+OP_ADDI  = 0b001000
+OP_SLTI  = 0b001010
+OP_ANDI  = 0b001100
+OP_ORI   = 0b001101
+OP_XORI  = 0b001110
+OP_LW    = 0b100011
+OP_SW    = 0b101011
+
+# Campos funct (ALUControl.v)
+FUNCT_ADD = 0b100000
+FUNCT_SUB = 0b100010
+FUNCT_AND = 0b100100
+FUNCT_OR  = 0b100101
+FUNCT_SLT = 0b101010
+
+# Codigos de control de la ALU (ALU.v)
+ALU_AND = 0b0000
+ALU_OR  = 0b0001
+ALU_ADD = 0b0010
+ALU_XOR = 0b0011
+ALU_SUB = 0b0110
+ALU_SLT = 0b0111
+
+
+# ============================================================================
+# Carga de archivos $readmemb / $readmemh
+# ============================================================================
+
+_COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+
+
+def load_readmem(path, base=2, size=MEM_WORDS):
+    """Lee un archivo $readmemb/$readmemh y regresa una lista de palabras
+    (size=None: tantas palabras como tenga el archivo)"""
+    words = [0] * (size or 0)
+    with open(path, 'r') as f:
+        text = _COMMENT_RE.sub(' ', f.read())
+
+    addr = 0
+    for token in text.split():
+        if token.startswith('@'):
+            addr = int(token[1:], 16)
+            continue
+        # Los bits x/z se cargan como 0 (la memoria se inicializa en 0)
+        token = token.replace('_', '')
+        token = re.sub(r'[xXzZ]', '0', token)
+        if size is None and addr >= len(words):
+            words.extend([0] * (addr + 1 - len(words)))
+        if addr < len(words):
+            words[addr] = int(token, base) & MASK32
+        addr += 1
+    return words
+
+
+# ============================================================================
+# Decodificacion (ControlUnit.v + ALUControl.v + SignExtend.v)
+# ============================================================================
+
+def control_signals(opcode):
+    """Señales de ControlUnit.v: (RegDst, ALUSrc, MemtoReg, RegWrite,
+    MemRead, MemWrite, Branch, ALUOp, Jump). Los valores 'x' se toman como 0."""
+    if opcode == OP_RTYPE:
+        return (1, 0, 0, 1, 0, 0, 0, 0b10, 0)
+    if opcode == OP_LW:
+        return (0, 1, 1, 1, 1, 0, 0, 0b00, 0)
+    if opcode == OP_SW:
+        return (0, 1, 0, 0, 0, 1, 0, 0b00, 0)
+    if opcode == OP_BEQ:
+        return (0, 0, 0, 0, 0, 0, 1, 0b01, 0)
+    if opcode == OP_J:
+        return (0, 0, 0, 0, 0, 0, 0, 0b00, 1)
+    if opcode in (OP_ADDI, OP_ANDI, OP_ORI, OP_XORI):
+        return (0, 1, 0, 1, 0, 0, 0, 0b00, 0)
+    if opcode == OP_SLTI:
+        return (0, 1, 0, 1, 0, 0, 0, 0b11, 0)
+    # default: NOP / instruccion no reconocida
+    return (0, 0, 0, 0, 0, 0, 0, 0b00, 0)
+
+
+def alu_control(alu_op, funct, opcode):
+    """Código de ALUControl.v"""
+    if alu_op == 0b00:
+        if opcode == OP_ANDI:
+            return ALU_AND
+        if opcode == OP_ORI:
+            return ALU_OR
+        if opcode == OP_XORI:
+            return ALU_XOR
+        return ALU_ADD
+    if alu_op == 0b01:
+        return ALU_SUB
+    if alu_op == 0b10:
+        return {
+            FUNCT_ADD: ALU_ADD,
+            FUNCT_SUB: ALU_SUB,
+            FUNCT_AND: ALU_AND,
+            FUNCT_OR:  ALU_OR,
+            FUNCT_SLT: ALU_SLT,
+        }.get(funct, ALU_ADD)
+    return ALU_SLT
+
+
+def decode_word(word):
+    """Predecodifica una palabra de la ROM en la tupla que viaja por el pipeline:
+    (rs, rt, Jump, JumpAddr28, (RegWrite, MemtoReg, MemRead, MemWrite,
+     Branch, ALUOp_EX, WriteReg, SignExtImm, BranchOffset))
+
+    ALUOp_EX combina ALUCtrl con ALUSrc: ALUCtrl + 8 si el operando B es
+    el inmediato extendido."""
+    opcode = (word >> 26) & 0x3F
+    rs = (word >> 21) & 0x1F
+    rt = (word >> 16) & 0x1F
+    rd = (word >> 11) & 0x1F
+    funct = word & 0x3F
+    imm = word & 0xFFFF
+
+    (reg_dst, alu_src, mem_to_reg, reg_write, mem_read, mem_write,
+     branch, alu_op, jump) = control_signals(opcode)
+
+    sign_ext = imm | 0xFFFF0000 if imm & 0x8000 else imm
+    write_reg = rd if reg_dst else rt
+    alu_ex = alu_control(alu_op, funct, opcode) + (8 if alu_src else 0)
+    jump_addr28 = (word & 0x03FFFFFF) << 2
+
+    return (rs, rt, jump, jump_addr28,
+            (reg_write, mem_to_reg, mem_read, mem_write, branch, alu_ex,
+             write_reg, sign_ext, (sign_ext << 2) & MASK32))
+
+
+NOP = decode_word(0)
+
+# Distancia mínima (en ciclos de entrada a EX) entre una instrucción que
+# escribe un registro y una que lo lee: WB escribe en el flanco negativo y
+# ID lee en el mismo ciclo, sin forwarding
+RAW_DISTANCE = 3
+# Instrucciones después de BEQ que se ejecutan siempre (se resuelve en MEM)
+BRANCH_SLOTS = 2
+
+
+def register_use(word):
+    """(registro escrito o 0, registros leídos distintos de $0) de una
+    palabra según el datapath: lo que importa para los riesgos RAW"""
+    rs, rt, jump, _, control = decode_word(word)
+    reg_write, _, _, mem_write, branch, alu_ex, write_reg = control[:7]
+    if jump or not word:
+        reads = ()
+    elif alu_ex >= 8 and not mem_write:     # Operando B inmediato
+        reads = (rs,)
+    elif reg_write or mem_write or branch:
+        reads = (rs, rt)
+    else:                                   # NOP / no reconocida
+        reads = ()
+    return (write_reg if reg_write else 0), tuple(reg for reg in reads if reg)
+
+
+# ============================================================================
+# Modelo del pipeline
+# ============================================================================
+
+class MIPSPipeline:
+    """Modelo ciclo a ciclo de MIPS_Pipeline.v"""
+
+    def __init__(self, instrucciones=None, datos=None, counters=False):
+        # Traza de la etapa ID para los contadores (None = desactivados)
+        self._trace = [] if counters else None
+        self._repeats = []
+        self.imem = [0] * MEM_WORDS
+        self.dmem = [0] * MEM_WORDS
+        self._rom = [NOP] * MEM_WORDS
+        self._dmem_init = list(self.dmem)
+        if instrucciones is not None:
+            self.load_instructions(instrucciones)
+        if datos is not None:
+            self.load_data(datos)
+        self.reset()
+
+    # ------------------------------------------------------------------
+    # Carga de memorias
+    # ------------------------------------------------------------------
+
+    def load_instructions(self, source):
+        """Carga la ROM desde un archivo $readmemb o una lista de palabras"""
+        if isinstance(source, (str, os.PathLike)):
+            source = load_readmem(source)
+        self.imem = [0] * MEM_WORDS
+        for i, word in enumerate(source[:MEM_WORDS]):
+            self.imem[i] = word & MASK32
+        self._rom = [decode_word(w) for w in self.imem]
+
+    def load_data(self, source):
+        """Carga la memoria de datos desde un archivo $readmemb o una lista"""
+        if isinstance(source, (str, os.PathLike)):
+            # MemoriaDatos.v deja la memoria en 0 si no existe datos.txt
+            if not os.path.exists(source):
+                source = []
+            else:
+                source = load_readmem(source)
+        self.dmem = [0] * MEM_WORDS
+        for i, word in enumerate(source[:MEM_WORDS]):
+            self.dmem[i] = word & MASK32
+        self._dmem_init = list(self.dmem)
+
+    def reset(self):
+        """Reset: PC = 0, buffers en 0 y banco de registros en 0"""
+        self.dmem = list(self._dmem_init)
+        self.registers = [0] * 32
+        self.cycles = 0
+        self.pc = 0
+        # IF/ID
+        self.if_id = (0, NOP)
+        # ID/EX: (PC+4, instruccion predecodificada, ReadData1, ReadData2)
+        self.id_ex = (0, NOP, 0, 0)
+        # EX/MEM: (RegWrite, MemtoReg, MemRead, MemWrite, Branch,
+        #          BranchAddr, Zero, ALUResult, ReadData2, WriteReg)
+        self.ex_mem = (0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+        # MEM/WB: (RegWrite, MemtoReg, ReadData, ALUResult, WriteReg)
+        self.mem_wb = (0, 0, 0, 0, 0)
+        # Detector de ciclo estable (p. ej. "halt: j halt")
+        self._writes = 0
+        if self._trace is not None:
+            self.enable_counters()
+
+    def enable_counters(self):
+        """Empieza (o reinicia) los contadores de rendimiento desde el
+        ciclo actual"""
+        self._trace = []
+        self._repeats = []
+        self._trace_start = self.cycles
+
+    # ------------------------------------------------------------------
+    # Simulacion
+    # ------------------------------------------------------------------
+
+    def step(self):
+        """Avanza un ciclo de reloj"""
+        self.run(1)
+
+    def run(self, cycles):
+        """Avanza 'cycles' ciclos de reloj"""
+        rom = self._rom
+        regs = self.registers
+        dmem = self.dmem
+        nop = NOP
+        pc = self.pc
+        id_pc4, id_rec = self.if_id
+        ex_pc4, ex_rec, ex_rd1, ex_rd2 = self.id_ex
+        (m_rw, m_mtr, m_mr, m_mw, m_br, m_baddr, m_zero, m_alu, m_rd2,
+         m_wr) = self.ex_mem
+        w_rw, w_mtr, w_rdata, w_alu, w_wr = self.mem_wb
+        writes = self._writes
+        # Por ciclo: PC+4 de la instrucción que pasa de ID a EX (0 =
+        # burbuja) + 1 si ese ciclo MEM tomó un branch
+        trace = self._trace
+
+        halt_state = None
+        halt_index = 0
+        remaining = cycles
+
+        while remaining:
+            skip = 0
+            for i in range(remaining):
+                # ------------- WB (BancoRegistros, flanco negativo) -------
+                # Cada etapa consume su buffer antes de que la etapa
+                # anterior lo sobrescriba: los buffers se actualizan en
+                # su lugar
+                if w_rw and w_wr:
+                    value = w_rdata if w_mtr else w_alu
+                    if regs[w_wr] != value:
+                        regs[w_wr] = value
+                        writes += 1
+
+                # ------------- MEM ----------------------------------------
+                w_rw = m_rw
+                w_mtr = m_mtr
+                w_alu = m_alu
+                w_wr = m_wr
+                if m_mr:
+                    w_rdata = dmem[(m_alu >> 2) & 0xFF]
+                else:
+                    w_rdata = 0
+                    if m_mw:
+                        idx = (m_alu >> 2) & 0xFF
+                        if dmem[idx] != m_rd2:
+                            dmem[idx] = m_rd2
+                            writes += 1
+                pc_src = m_br and m_zero
+                branch_addr = m_baddr
+
+                # ------------- EX (ALUControl + ALU) ----------------------
+                (m_rw, m_mtr, m_mr, m_mw, m_br, e_op, m_wr, e_imm,
+                 e_off) = ex_rec[4]
+                if e_op == 10:      # ADD inmediato
+                    m_alu = (ex_rd1 + e_imm) & MASK32
+                elif e_op == 2:     # ADD
+                    m_alu = (ex_rd1 + ex_rd2) & MASK32
+                elif e_op == 6:     # SUB
+                    m_alu = (ex_rd1 - ex_rd2) & MASK32
+                elif e_op == 7:     # SLT
+                    m_alu = 1 if (ex_rd1 ^ 0x80000000) < (ex_rd2 ^ 0x80000000) else 0
+                elif e_op == 15:    # SLTI
+                    m_alu = 1 if (ex_rd1 ^ 0x80000000) < (e_imm ^ 0x80000000) else 0
+                elif e_op == 0:     # AND
+                    m_alu = ex_rd1 & ex_rd2
+                elif e_op == 1:     # OR
+                    m_alu = ex_rd1 | ex_rd2
+                elif e_op == 8:     # ANDI
+                    m_alu = ex_rd1 & e_imm
+                elif e_op == 9:     # ORI
+                    m_alu = ex_rd1 | e_imm
+                elif e_op == 11:    # XORI
+                    m_alu = ex_rd1 ^ e_imm
+                elif e_op == 3:     # XOR
+                    m_alu = ex_rd1 ^ ex_rd2
+                else:               # SUB inmediato
+                    m_alu = (ex_rd1 - e_imm) & MASK32
+                m_baddr = (ex_pc4 + e_off) & MASK32
+                m_zero = not m_alu
+                m_rd2 = ex_rd2
+
+                # ------------- ID -----------------------------------------
+                if trace is not None:
+                    trace.append(id_pc4 | pc_src)
+                ex_pc4 = id_pc4
+                ex_rec = id_rec
+                ex_rd1 = regs[id_rec[0]]
+                ex_rd2 = regs[id_rec[1]]
+
+                # ------------- IF / siguiente PC --------------------------
+                if id_rec[2]:
+                    pc = (id_pc4 & 0xF0000000) | id_rec[3]
+                    id_rec = nop
+                    if pc == id_pc4 - 4:
+                        # Salto a si mismo: si el estado completo se
+                        # repite, el pipeline quedo en un ciclo estable y
+                        # se puede avanzar sin simularlo
+                        state = (pc, ex_rd1, ex_rd2, m_rw, m_mtr, m_mr,
+                                 m_mw, m_br, m_baddr, m_zero, m_alu, m_rd2,
+                                 m_wr, w_rw, w_mtr, w_rdata, w_alu, w_wr,
+                                 writes)
+                        if state == halt_state:
+                            skip = i - halt_index
+                            id_pc4 = 0
+                            break
+                        halt_state = state
+                        halt_index = i
+                    id_pc4 = 0
+                elif pc_src:
+                    pc = branch_addr
+                    id_pc4 = 0
+                    id_rec = nop
+                else:
+                    id_rec = rom[(pc >> 2) & 0xFF]
+                    pc = (pc + 4) & MASK32
+                    id_pc4 = pc
+
+            if skip:
+                remaining -= i + 1
+                if trace is not None:
+                    # El último periodo de la traza se repite en los
+                    # ciclos que se saltan
+                    self._repeats.append((len(trace) - skip, len(trace),
+                                          remaining // skip))
+                remaining %= skip
+                halt_state = None
+                halt_index = 0
+            else:
+                remaining = 0
+
+        self.pc = pc
+        self.if_id = (id_pc4, id_rec)
+        self.id_ex = (ex_pc4, ex_rec, ex_rd1, ex_rd2)
+        self.ex_mem = (m_rw, m_mtr, m_mr, m_mw, m_br, m_baddr, int(m_zero),
+                       m_alu, m_rd2, m_wr)
+        self.mem_wb = (w_rw, w_mtr, w_rdata, w_alu, w_wr)
+        self._writes = writes
+        self.cycles += cycles
+
+    # ------------------------------------------------------------------
+    # Contadores de rendimiento
+    # ------------------------------------------------------------------
+
+    def performance(self):
+        """Contadores desde enable_counters() (o el reset). Las burbujas se
+        cuentan en la entrada a EX, por causa:
+          arranque   IF/ID vacío después del reset
+          salto      IF/ID limpiado por J
+          branch     IF/ID limpiado por un BEQ tomado, o NOP en sus 2
+                     ranuras de retardo
+          raw        NOP entre un productor y su consumidor a distancia <= 3
+          load_use   igual, cuando el productor es LW
+          otros      NOP sin causa identificada
+        Los ciclos adelantados en un ciclo estable (halt) se cuentan
+        repitiendo su periodo."""
+        trace = self._trace
+        if trace is None:
+            raise RuntimeError("Contadores desactivados: use counters=True")
+        from mips_disassembler import MNEMONICS, split_fields
+
+        names = [MNEMONICS[mid] if mid >= 0 else '?'
+                 for mid in split_fields(self.imem)['id']]
+        n = len(trace)
+        weights = [1] * n
+        for start, stop, times in self._repeats:
+            for k in range(start, stop):
+                weights[k] += times
+
+        # Por posición: índice en la ROM (-1 = burbuja)
+        index = [((entry & ~3) - 4) >> 2 & 0xFF if entry & ~3 else -1
+                 for entry in trace]
+        rom = self._rom
+
+        use = [register_use(word) for word in self.imem]
+
+        def writes(k):
+            """Registro que escribe la instrucción en k (0 = ninguno)"""
+            return use[index[k]][0] if index[k] >= 0 else 0
+
+        def reads(k):
+            """Registros que usa la instrucción en k"""
+            return use[index[k]][1] if index[k] >= 0 else ()
+
+        bubbles = dict.fromkeys(('arranque', 'salto', 'branch', 'raw',
+                                 'load_use', 'otros'), 0)
+        mix = {}
+        taken = not_taken = pending = violations = 0
+        retired = useful = 0
+
+        for k in range(n):
+            w = weights[k]
+            i = index[k]
+            if i < 0:
+                if k and index[k - 1] >= 0 and rom[index[k - 1]][2]:
+                    bubbles['salto'] += w
+                elif k and trace[k - 1] & 1:
+                    bubbles['branch'] += w
+                else:
+                    bubbles['arranque'] += w
+                continue
+
+            name = names[i]
+            mix[name] = mix.get(name, 0) + w
+            retired += w
+            useful += w if self.imem[i] else 0
+            if name == 'beq':
+                if k + 2 >= n:
+                    pending += w
+                elif trace[k + 2] & 1:
+                    taken += w
+                else:
+                    not_taken += w
+
+            # Lecturas de un registro que aún no se escribe (sin forwarding)
+            for reg in reads(k):
+                if any(writes(p) == reg
+                       for p in range(max(0, k - RAW_DISTANCE + 1), k)):
+                    violations += w
+                    break
+
+            if self.imem[i]:
+                continue
+            # NOP: ¿separa a un productor de su consumidor?
+            cause = None
+            for p in range(max(0, k - RAW_DISTANCE + 1), k):
+                reg = writes(p)
+                if reg and any(reg in reads(c)
+                               for c in range(k + 1, min(n, p + RAW_DISTANCE + 1))):
+                    cause = 'load_use' if rom[index[p]][4][1] else 'raw'
+                    if cause == 'load_use':
+                        break
+            if cause is None and any(index[p] >= 0 and names[index[p]] == 'beq'
+                                     for p in range(max(0, k - BRANCH_SLOTS), k)):
+                cause = 'branch'
+            bubbles[cause or 'otros'] += w
+
+        # Instrucciones aún en el pipeline (entraron a EX en los últimos 3
+        # ciclos) no cuentan como retiradas
+        for k in range(max(0, n - 3), n):
+            if index[k] >= 0:
+                retired -= 1
+                useful -= 1 if self.imem[index[k]] else 0
+        cycles = sum(weights)
+        return {
+            'ciclos': cycles,
+            'instrucciones': retired,
+            'utiles': useful,
+            'cpi': cycles / retired if retired else None,
+            'cpi_utiles': cycles / useful if useful else None,
+            'burbujas': bubbles,
+            'total_burbujas': sum(bubbles.values()),
+            'mezcla': dict(sorted(mix.items(), key=lambda item: -item[1])),
+            'branches': {'tomados': taken, 'no_tomados': not_taken,
+                         'pendientes': pending},
+            'lecturas_sin_dato': violations,
+        }
+
+    def performance_summary(self):
+        """Contadores en texto para consola"""
+        info = self.performance()
+        cpi = f"{info['cpi']:.3f}" if info['cpi'] else "-"
+        cpi_useful = f"{info['cpi_utiles']:.3f}" if info['cpi_utiles'] else "-"
+        lines = ["=== CONTADORES ===",
+                 f"Ciclos = {info['ciclos']}  Instrucciones = {info['instrucciones']} "
+                 f"(útiles {info['utiles']})  CPI = {cpi} (útiles {cpi_useful})",
+                 f"Burbujas = {info['total_burbujas']}: " + ", ".join(
+                     f"{cause} {count}" for cause, count in info['burbujas'].items()),
+                 "Branches: " + ", ".join(
+                     f"{kind.replace('_', ' ')} {count}"
+                     for kind, count in info['branches'].items()),
+                 "Mezcla: " + ", ".join(
+                     f"{name} {count}" for name, count in info['mezcla'].items())]
+        if info['lecturas_sin_dato']:
+            lines.append(f"⚠️ Lecturas de registro antes de su escritura (RAW sin "
+                         f"NOP suficientes): {info['lecturas_sin_dato']}")
+        lines.append("==================")
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------------
+
+    def dump(self):
+        """Regresa un resumen del estado (similar al $display del testbench)"""
+        return format_state(self.pc, self.registers, self.dmem,
+                            f"Ciclos = {self.cycles}")
+
+
+def format_state(pc, registers, dmem, header=None):
+    """Formatea PC, banco de registros y memoria de datos para consola"""
+    lines = ["=== RESULTADOS ==="]
+    if header:
+        lines.append(header)
+    lines.append(f"PC = {pc:08x}")
+    for i in range(0, 32, 4):
+        lines.append("  ".join(f"${j:<2}={value:08x}"
+                               for j, value in enumerate(registers[i:i + 4], i)))
+    used = [(i, w) for i, w in enumerate(dmem) if w]
+    if used:
+        lines.append("Memoria de datos (palabras distintas de 0):")
+        for i, w in used:
+            lines.append(f"  mem[{i * 4}] = {w} (0x{w:08x})")
+    lines.append("=================")
+    return "\n".join(lines)
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Simula MIPS_Pipeline.v ciclo a ciclo")
+    parser.add_argument("instrucciones", nargs="?", default="instrucciones.txt",
+                        help="archivo $readmemb de la ROM (instrucciones.txt)")
+    parser.add_argument("datos", nargs="?", default="datos.txt",
+                        help="archivo $readmemb de la RAM (datos.txt)")
+    parser.add_argument("-c", "--ciclos", type=int, default=500,
+                        help="ciclos a simular después del reset (default: 500, "
+                             "igual que tb_MIPS_Pipeline.v)")
+    parser.add_argument("--contadores", action="store_true",
+                        help="mostrar CPI, burbujas por causa, mezcla y branches")
+    parser.add_argument("--json", metavar="ARCHIVO",
+                        help="escribir los contadores en JSON ('-' = salida estándar)")
+    args = parser.parse_args()
+
+    counters = args.contadores or args.json is not None
+    cpu = MIPSPipeline(args.instrucciones, args.datos, counters=counters)
+    start = time.perf_counter()
+    cpu.run(args.ciclos)
+    elapsed = time.perf_counter() - start
+    if args.json == '-':
+        import json
+        print(json.dumps(cpu.performance(), indent=2, ensure_ascii=False))
+        return
+    print(cpu.dump())
+    if args.contadores:
+        print(cpu.performance_summary())
+    if args.json:
+        import json
+        with open(args.json, 'w') as f:
+            json.dump(cpu.performance(), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+    if elapsed > 0:
+        print(f"Simulados {args.ciclos} ciclos en {elapsed:.3f} s "
+              f"({args.ciclos / elapsed:,.0f} ciclos/s)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Planificación de instrucciones (list scheduling) por bloque básico
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# mips_hazards.py arregla los riesgos RAW con NOPs; aquí primero se
+# reordenan las instrucciones independientes para que ocupen esos huecos.
+#
+# Bloques: tramos de instrucciones consecutivas sin control de flujo. Se
+# cortan en cada destino de beq/bne/j/jal (por etiqueta o numérico) y
+# beq/bne/j/jal y las 2 ranuras de retardo de BEQ no se mueven, así que los
+# destinos y desplazamientos quedan igual. Dentro de un bloque se respetan:
+#
+#   - RAW (lectura después de escritura): latencia RAW_DISTANCE
+#   - WAR / WAW: solo el orden
+#   - Memoria: un sw no cruza otro lw/sw, salvo misma base sin cambiar y
+#     desplazamientos que caen en palabras distintas de MemoriaDatos
+#     (índice (dirección >> 2) & 0xFF)
+#
+# Se planifica con prioridad a la ruta crítica (incluyendo lo que leen las
+# 2 instrucciones después del bloque y lo que escriben las 2 antes). Los NOP
+# que ya tenga el bloque sirven de relleno en los huecos. Si el orden nuevo
+# no es mejor que el original, el bloque queda igual. Al final se pasa
+# mips_hazards.pad_hazards para los riesgos que queden.
+#
+#   python mips_scheduler.py programa.asm [-o salida.asm]
+#   python mips_scheduler.py programa.asm --comprobar [--palabras 47,25,10,5,1]
+#
+# --comprobar ejecuta en mips_pipeline el programa con NOPs (antes) y el
+# planificado (después) y compara registros y memoria cada vez que entra un
+# J a EX (3 ciclos después, cuando el bloque ya terminó y el siguiente aún
+# no escribe), además de los contadores de rendimiento.
+# ============================================================================
+
+import sys
+
+from mips_decoder import MIPSDecoder
+from mips_hazards import control_flow, falls_through, pad_hazards
+from mips_isa import I_TYPE_OPCODE, J_TYPE_OPCODE
+from mips_pipeline import (BRANCH_SLOTS, MEM_WORDS, RAW_DISTANCE,
+                           MIPSPipeline, register_use)
+
+OP_LUI = I_TYPE_OPCODE['lui']
+OP_BEQ = I_TYPE_OPCODE['beq']
+OP_LW = I_TYPE_OPCODE['lw']
+OP_SW = I_TYPE_OPCODE['sw']
+CONTROL_OPCODES = {OP_BEQ, I_TYPE_OPCODE['bne'], *J_TYPE_OPCODE.values()}
+
+
+def dependencies(word):
+    """(registros escritos, registros leídos) para reordenar: los del
+    datapath y, para lui, también el que escribe en MIPS32"""
+    dest, reads = register_use(word)
+    writes = {dest} - {0}
+    rt = (word >> 16) & 0x1F
+    if word >> 26 == OP_LUI and rt:
+        writes.add(rt)
+    return writes, set(reads)
+
+
+class Scheduler:
+    """Reordena cada bloque básico de un programa ensamblable"""
+
+    def __init__(self, code, decoder=None):
+        self.decoder = decoder or MIPSDecoder()
+        self.code = code
+        result = self.decoder.assemble(code)
+        if self.decoder.errors:
+            raise ValueError("El programa tiene errores:\n" +
+                             '\n'.join(self.decoder.errors))
+        self.words = list(result.words)
+        self.lines = list(result.lines)
+        self.uses = [dependencies(word) for word in self.words]
+        n = len(self.words)
+
+        # Destinos y control de flujo
+        self.targets = set()
+        pinned = [False] * n
+        for i, word in enumerate(self.words):
+            opcode = word >> 26
+            if opcode not in CONTROL_OPCODES:
+                continue
+            pinned[i] = True
+            if opcode in J_TYPE_OPCODE.values():
+                self.targets.add(word & 0x03FFFFFF)
+            else:
+                self.targets.add(i + 1 + ((word & 0xFFFF) ^ 0x8000) - 0x8000)
+            if opcode == OP_BEQ:
+                for slot in range(i + 1, min(n, i + 1 + BRANCH_SLOTS)):
+                    pinned[slot] = True
+        self.pinned = pinned
+        # ¿Se pasa secuencialmente de i a i+1? (la misma regla que mips_hazards)
+        jumps, _, always, _, entered = control_flow(self.words)
+        self.falls = [falls_through(lambda j: j, i, jumps, always, entered)
+                      for i in range(n)]
+        # BEQ que saltan a cada destino (su última ranura llega a distancia 2)
+        self.incoming = {}
+        for i, word in enumerate(self.words):
+            if word >> 26 == OP_BEQ:
+                target = i + 1 + ((word & 0xFFFF) ^ 0x8000) - 0x8000
+                self.incoming.setdefault(target, []).append(i + BRANCH_SLOTS)
+
+    def blocks(self):
+        """Tramos [inicio, fin) de instrucciones que se pueden reordenar"""
+        found = []
+        start = None
+        for i in range(len(self.words) + 1):
+            cut = (i == len(self.words) or self.pinned[i] or i in self.targets)
+            if cut and start is not None:
+                found.append((start, i))
+                start = None
+            if i < len(self.words) and not self.pinned[i] and start is None:
+                start = i
+        return [(start, stop) for start, stop in found if stop - start > 1]
+
+    # ------------------------------------------------------------------
+    # Bloque
+    # ------------------------------------------------------------------
+
+    def _context(self, start, stop):
+        """(registro -> primer ciclo del bloque en que ya se puede leer,
+        [(ciclo después del bloque, registros que lee)])"""
+        ready = {}
+
+        def produced(p, distance):
+            if 0 <= p < len(self.words):
+                for reg in self.uses[p][0]:
+                    ready[reg] = max(ready.get(reg, 0), RAW_DISTANCE - distance)
+
+        # Antes: caída secuencial y la última ranura de un BEQ tomado
+        if start > 0 and self.falls[start - 1]:
+            produced(start - 1, 1)
+            if start > 1 and self.falls[start - 2]:
+                produced(start - 2, 2)
+        for slot in self.incoming.get(start, ()):
+            produced(slot, BRANCH_SLOTS)
+
+        # Después: lo que leen las siguientes instrucciones
+        after = []
+        i = stop
+        for offset in range(RAW_DISTANCE - 1):
+            if i >= len(self.words) or not self.falls[i - 1]:
+                break
+            after.append((offset, self.uses[i][1]))
+            i += 1
+        return ready, after
+
+    def _graph(self, block):
+        """Predecesores de cada instrucción del bloque: [(nodo, latencia)]"""
+        preds = [[] for _ in block]
+        for b, j in enumerate(block):
+            writes_j, reads_j = self.uses[j]
+            for a in range(b):
+                i = block[a]
+                writes_i, reads_i = self.uses[i]
+                if writes_i & reads_j:
+                    preds[b].append((a, RAW_DISTANCE))
+                elif writes_i & writes_j or reads_i & writes_j or \
+                        self._memory_conflict(block, a, b):
+                    preds[b].append((a, 1))
+        return preds
+
+    def _memory_conflict(self, block, a, b):
+        """¿Los accesos a memoria a y b deben conservar su orden?"""
+        op_a = self.words[block[a]] >> 26
+        op_b = self.words[block[b]] >> 26
+        if OP_SW not in (op_a, op_b) or not {op_a, op_b} <= {OP_LW, OP_SW}:
+            return False
+        word_a, word_b = self.words[block[a]], self.words[block[b]]
+        base = (word_a >> 21) & 0x1F
+        if base != (word_b >> 21) & 0x1F:
+            return True
+        # Misma base: MemoriaDatos usa (dirección >> 2) & 0xFF, así que dos
+        # desplazamientos son palabras distintas solo si difieren en un
+        # múltiplo de 4 que no lo sea de 4 * MEM_WORDS
+        delta = (((word_a & 0xFFFF) ^ 0x8000) - ((word_b & 0xFFFF) ^ 0x8000))
+        if delta % 4 or (delta >> 2) % MEM_WORDS == 0:
+            return True
+        # ... y si la base no cambia en medio
+        return any(base in self.uses[block[k]][0] for k in range(a, b))
+
+    def cost(self, block, order, preds, ready, after):
+        """Ciclos del bloque (con los huecos que necesita) en ese orden"""
+        slot = {}
+        time = 0
+        for node in order:
+            start = self._earliest(block, node, preds, slot, ready)
+            slot[node] = max(time, start)
+            time = slot[node] + 1
+        return time + self._tail_stall(block, slot, time, after)
+
+    def _earliest(self, block, node, preds, slot, ready):
+        start = max((slot[a] + latency for a, latency in preds[node]), default=0)
+        for reg in self.uses[block[node]][1]:
+            start = max(start, ready.get(reg, 0))
+        return start
+
+    def _tail_stall(self, block, slot, time, after):
+        stall = 0
+        for offset, reads in after:
+            for node, at in slot.items():
+                if self.uses[block[node]][0] & reads:
+                    stall = max(stall, at + RAW_DISTANCE - (time + offset))
+        return stall
+
+    def schedule_block(self, start, stop):
+        """Orden nuevo (índices originales) del bloque [start, stop)"""
+        block = list(range(start, stop))
+        preds = self._graph(block)
+        ready, after = self._context(start, stop)
+        succs = [[] for _ in block]
+        for b, edges in enumerate(preds):
+            for a, latency in edges:
+                succs[a].append((b, latency))
+
+        # Altura: ciclos mínimos desde el nodo hasta el final
+        height = [0] * len(block)
+        for b in reversed(range(len(block))):
+            h = max((latency + height[s] for s, latency in succs[b]), default=0)
+            for offset, reads in after:
+                if self.uses[block[b]][0] & reads:
+                    h = max(h, RAW_DISTANCE - offset)
+            height[b] = h
+
+        fillers = [b for b in range(len(block)) if not self.words[block[b]]]
+        pending = set(range(len(block))) - set(fillers)
+        done = set()
+        slot = {}
+        order = []
+        time = 0
+        while pending:
+            candidates = [b for b in pending
+                          if all(a in done for a, _ in preds[b])]
+            starts = {b: self._earliest(block, b, preds, slot, ready) for b in candidates}
+            now = [b for b in candidates if starts[b] <= time]
+            if not now and fillers:
+                # Hueco: se llena con un NOP que ya estaba en el bloque
+                b = fillers.pop(0)
+            else:
+                pool = now or [min(candidates, key=lambda b: (starts[b], -height[b], b))]
+                b = max(pool, key=lambda b: (height[b], -b))
+                pending.discard(b)
+            slot[b] = max(time, starts.get(b, 0))
+            time = slot[b] + 1
+            done.add(b)
+            order.append(b)
+        order += fillers
+
+        original = list(range(len(block)))
+        if self.cost(block, order, preds, ready, after) >= \
+                self.cost(block, original, preds, ready, after):
+            order = original
+        return [block[b] for b in order]
+
+    # ------------------------------------------------------------------
+    # Programa
+    # ------------------------------------------------------------------
+
+    def schedule(self):
+        """Regresa (código reordenado, instrucciones que cambiaron de lugar,
+        bloques)"""
+        placement = list(range(len(self.words)))
+        blocks = self.blocks()
+        for start, stop in blocks:
+            placement[start:stop] = self.schedule_block(start, stop)
+        moved = sum(1 for k, i in enumerate(placement) if k != i)
+        return self.render(placement), moved, len(blocks)
+
+    def render(self, placement):
+        """Texto con la instrucción placement[k] en la línea de la k-ésima
+        (la etiqueta y la sangría de cada línea se quedan en su lugar)"""
+        lines = self.code.strip().split('\n')
+        bodies = []
+        prefixes = []
+        for line_num in self.lines:
+            line = lines[line_num - 1]
+            label, text = self.decoder.split_line(line)
+            if label is not None:
+                colon = line.index(':') + 1
+                column = colon + len(line[colon:]) - len(line[colon:].lstrip())
+            else:
+                column = len(line) - len(line.lstrip())
+            prefixes.append(line[:column])
+            bodies.append(line[column:])
+        for k, i in enumerate(placement):
+            if k != i:
+                lines[self.lines[k] - 1] = prefixes[k] + bodies[i]
+        return '\n'.join(lines) + '\n'
+
+
+def schedule_program(code, decoder=None):
+    """Reordena los bloques y agrega los NOPs que falten. Regresa (código,
+    reporte con NOPs y tamaño antes/después)."""
+    scheduler = Scheduler(code, decoder)
+    reordered, moved, blocks = scheduler.schedule()
+    before_code, before = pad_hazards(code)
+    after_code, after = pad_hazards(reordered)
+    return after_code, {
+        'bloques': blocks,
+        'movidas': moved,
+        'antes': before,
+        'despues': after,
+        'codigo_antes': before_code,
+    }
+
+
+# ============================================================================
+# Comprobación en el modelo del pipeline
+# ============================================================================
+
+def jump_checkpoints(code, cycles, data=None):
+    """Ejecuta 'code' en MIPSPipeline y toma (ciclo, registros, memoria) 3
+    ciclos después de que cada J entra a EX. Regresa (puntos, contadores)."""
+    words = list(MIPSDecoder().assemble(code).words)
+    cpu = MIPSPipeline(words, data, counters=True)
+    points = []
+    due = []
+    for _ in range(cycles):
+        cpu.step()
+        pc4, record = cpu.id_ex[0], cpu.id_ex[1]
+        if pc4 and record[2]:
+            due.append(cpu.cycles + RAW_DISTANCE)
+        if due and due[0] == cpu.cycles:
+            due.pop(0)
+            points.append((cpu.cycles, list(cpu.registers), list(cpu.dmem)))
+    return points, cpu.performance()
+
+
+def compare_on_pipeline(before_code, after_code, cycles=2000, data=None):
+    """Compara estado y rendimiento de dos versiones del mismo programa"""
+    before, perf_before = jump_checkpoints(before_code, cycles, data)
+    after, perf_after = jump_checkpoints(after_code, cycles, data)
+    common = min(len(before), len(after))
+    mismatch = next((k for k in range(common)
+                     if before[k][1:] != after[k][1:]), None)
+    return {
+        'puntos': common,
+        'iguales': mismatch is None,
+        'primer_diferente': mismatch,
+        # Ciclos hasta el último punto que ambos alcanzaron
+        'ciclos_antes': before[common - 1][0] if common else None,
+        'ciclos_despues': after[common - 1][0] if common else None,
+        'contadores_antes': perf_before,
+        'contadores_despues': perf_after,
+    }
+
+
+def format_report(report):
+    before, after = report['antes'], report['despues']
+    return '\n'.join([
+        f"Bloques: {report['bloques']}  Instrucciones movidas: {report['movidas']}",
+        f"NOPs necesarios: antes {before['nops']}, después {after['nops']}",
+        f"Ciclos por pasada (instrucciones + NOPs): antes {before['instrucciones']}, "
+        f"después {after['instrucciones']}",
+    ] + [f"⚠️ Sin resolver: {message}" for message in after['sin_resolver']])
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Reordena instrucciones para llenar los huecos de riesgos RAW")
+    parser.add_argument("entrada", help="archivo .asm")
+    parser.add_argument("-o", "--salida", default=None,
+                        help="archivo .asm planificado (por defecto, salida estándar)")
+    parser.add_argument("--comprobar", action="store_true",
+                        help="comparar antes/después en el modelo del pipeline")
+    parser.add_argument("--ciclos", type=int, default=2000,
+                        help="ciclos a simular con --comprobar")
+    parser.add_argument("--datos", default=None,
+                        help="archivo $readmemb para la memoria de datos")
+    parser.add_argument("--palabras", default=None,
+                        help="memoria de datos inicial como lista (47,25,10,5,1)")
+    args = parser.parse_args()
+
+    try:
+        with open(args.entrada, 'r') as f:
+            code, report = schedule_program(f.read())
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(code)
+    elif not args.comprobar:
+        sys.stdout.write(code)
+    print(format_report(report), file=sys.stderr)
+
+    if args.comprobar:
+        data = args.datos
+        if args.palabras:
+            data = [int(value, 0) for value in args.palabras.split(',')]
+        info = compare_on_pipeline(report['codigo_antes'], code, args.ciclos, data)
+        before, after = info['contadores_antes'], info['contadores_despues']
+        print(f"Modelo del pipeline ({args.ciclos} ciclos):")
+        print(f"  Puntos de control (después de cada J): {info['puntos']}  "
+              f"{'✅ mismo estado' if info['iguales'] else '❌ estado distinto'}")
+        if info['puntos']:
+            print(f"  Ciclos hasta el punto {info['puntos']}: antes {info['ciclos_antes']}, "
+                  f"después {info['ciclos_despues']}")
+        cpi = lambda info: f"{info['cpi_utiles']:.3f}" if info['cpi_utiles'] else "-"
+        print(f"  Instrucciones útiles: antes {before['utiles']}, después {after['utiles']}  "
+              f"CPI útil: antes {cpi(before)}, después {cpi(after)}")
+        if not info['iguales']:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
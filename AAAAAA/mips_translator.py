@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Traductor dinámico por bloques básicos (MIPS -> funciones de Python)
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# Divide el programa en bloques básicos (terminan en BEQ, BNE o J) y
+# traduce cada bloque "caliente" a una sola función de Python generada con
+# exec(). Dentro del bloque los registros viven en variables locales; solo
+# se leen del banco al entrar y se escriben al salir.
+#
+# Las instrucciones se reconocen con las tablas de MIPSDecoder
+# (r_type_funct, i_type_opcode, j_type_opcode), así que se ejecutan las
+# mismas instrucciones que el decodificador sabe ensamblar (incluye BNE,
+# LUI, SLL, SRL y JAL). Como en el datapath, el inmediato se extiende con
+# signo y la memoria de datos es de 256 palabras.
+#
+# Los bloques traducidos se guardan en caché y se invalidan cuando cambia
+# la memoria de instrucciones.
+# ============================================================================
+
+import os
+
+from mips_decoder import MIPSDecoder
+from mips_isa_sim import DEFAULT_MAX_STEPS
+from mips_pipeline import MASK32, MEM_WORDS, format_state, load_readmem
+
+MAX_BLOCK = 64          # Máximo de instrucciones por bloque
+
+# Un 'j' a sí mismo detiene el programa: los bloques regresan ~índice
+# (negativo) y el despachador termina. Un destino fuera de la memoria de
+# instrucciones también detiene la ejecución.
+
+
+def build_tables():
+    """Invierte las tablas de MIPSDecoder: código -> mnemónico"""
+    decoder = MIPSDecoder()
+    funct = {code: name for name, code in decoder.r_type_funct.items()}
+    opcode = {code: name for name, code in decoder.i_type_opcode.items()}
+    opcode.update({code: name for name, code in decoder.j_type_opcode.items()})
+    return funct, opcode
+
+
+FUNCT_NAMES, OPCODE_NAMES = build_tables()
+
+
+def decode_word(word):
+    """Regresa (mnemónico, rs, rt, rd, shamt, inmediato con signo, addr26)"""
+    opcode = (word >> 26) & 0x3F
+    funct = word & 0x3F
+    if opcode == 0:
+        name = FUNCT_NAMES.get(funct, 'nop')
+    else:
+        name = OPCODE_NAMES.get(opcode, 'nop')
+    imm = word & 0xFFFF
+    simm = imm - 0x10000 if imm & 0x8000 else imm
+    return (name, (word >> 21) & 0x1F, (word >> 16) & 0x1F,
+            (word >> 11) & 0x1F, (word >> 6) & 0x1F, simm, word & 0x03FFFFFF)
+
+
+BRANCHES = ('beq', 'bne')
+JUMPS = ('j', 'jal')
+
+
+def branch_target(index, offset, size):
+    """Índice destino de un branch (fuera de memoria -> 'size', se detiene)"""
+    target = index + 1 + offset
+    return target if 0 <= target < size else size
+
+
+def is_halt(rec, index):
+    """True si la instrucción es un 'j' a sí mismo"""
+    return rec[0] == 'j' and rec[6] & 0xFF == index
+
+
+# ============================================================================
+# Generación de código
+# ============================================================================
+
+class _BlockBuilder:
+    """Genera el código fuente de un bloque básico"""
+
+    def __init__(self):
+        self.loaded = set()
+        self.written = set()
+        self.body = []
+
+    def read(self, reg):
+        if reg == 0:
+            return '0'
+        if reg not in self.loaded and reg not in self.written:
+            self.loaded.add(reg)
+        return f'x{reg}'
+
+    def write(self, reg, expr):
+        if reg == 0:
+            return
+        self.body.append(f'    x{reg} = {expr}')
+        self.written.add(reg)
+
+    def emit(self, rec, index):
+        """Agrega una instrucción que no termina el bloque"""
+        name, rs, rt, rd, shamt, simm, _ = rec
+        uimm = simm & MASK32
+        if name == 'add':
+            self.write(rd, f'({self.read(rs)} + {self.read(rt)}) & {MASK32}')
+        elif name == 'sub':
+            self.write(rd, f'({self.read(rs)} - {self.read(rt)}) & {MASK32}')
+        elif name == 'and':
+            self.write(rd, f'{self.read(rs)} & {self.read(rt)}')
+        elif name == 'or':
+            self.write(rd, f'{self.read(rs)} | {self.read(rt)}')
+        elif name == 'slt':
+            self.write(rd, f'1 if ({self.read(rs)} ^ 2147483648) < '
+                           f'({self.read(rt)} ^ 2147483648) else 0')
+        elif name == 'sll':
+            self.write(rd, f'({self.read(rt)} << {shamt}) & {MASK32}')
+        elif name == 'srl':
+            self.write(rd, f'{self.read(rt)} >> {shamt}')
+        elif name == 'addi':
+            self.write(rt, f'({self.read(rs)} + {uimm}) & {MASK32}')
+        elif name == 'andi':
+            self.write(rt, f'{self.read(rs)} & {uimm}')
+        elif name == 'ori':
+            self.write(rt, f'{self.read(rs)} | {uimm}')
+        elif name == 'xori':
+            self.write(rt, f'{self.read(rs)} ^ {uimm}')
+        elif name == 'slti':
+            self.write(rt, f'1 if ({self.read(rs)} ^ 2147483648) < '
+                           f'{uimm ^ 0x80000000} else 0')
+        elif name == 'lui':
+            self.write(rt, str((simm << 16) & MASK32))
+        elif name == 'lw':
+            addr = self.read(rs)
+            self.write(rt, f'm[(({addr} + {uimm}) >> 2) & 255]')
+        elif name == 'sw':
+            self.body.append(f'    m[(({self.read(rs)} + {uimm}) >> 2) & 255]'
+                             f' = {self.read(rt)}')
+        # nop / no reconocida: sin efecto
+
+    def source(self, func_name, start, recs, size):
+        """Genera la función completa para el bloque [start, start+len(recs))"""
+        last = recs[-1]
+        end_index = start + len(recs) - 1
+        for i, rec in enumerate(recs[:-1]):
+            self.emit(rec, start + i)
+
+        name = last[0]
+        nxt = end_index + 1
+        exit_lines = []
+        if name in BRANCHES:
+            target = branch_target(end_index, last[5], size)
+            a, b = self.read(last[1]), self.read(last[2])
+            op = '==' if name == 'beq' else '!='
+            exit_lines.append(f'    if {a} {op} {b}: return {target}')
+            exit_lines.append(f'    return {nxt}')
+        elif name in JUMPS:
+            if name == 'jal':
+                self.write(31, str(nxt * 4))
+            target = last[6] & 0xFF
+            exit_lines.append(f'    return {~end_index if target == end_index else target}')
+        else:
+            self.emit(last, end_index)
+            exit_lines.append(f'    return {nxt}')
+
+        lines = [f'def {func_name}(r, m):']
+        lines += [f'    x{reg} = r[{reg}]' for reg in sorted(self.loaded)]
+        lines += self.body
+        lines += [f'    r[{reg}] = x{reg}' for reg in sorted(self.written)]
+        lines += exit_lines
+        return '\n'.join(lines) + '\n'
+
+
+# ============================================================================
+# Motor de traducción
+# ============================================================================
+
+class BlockTranslator:
+    """Ejecuta un programa MIPS traduciendo sus bloques básicos calientes"""
+
+    def __init__(self, instrucciones=None, datos=None, hot_threshold=2):
+        self.hot_threshold = hot_threshold
+        self.imem = []
+        self._decoded = []
+        self._dmem_init = [0] * MEM_WORDS
+        self.invalidate()
+        if instrucciones is not None:
+            self.load_instructions(instrucciones)
+        if datos is not None:
+            self.load_data(datos)
+        self.reset()
+
+    # ------------------------------------------------------------------
+    # Memorias
+    # ------------------------------------------------------------------
+
+    def load_instructions(self, source):
+        """Carga la memoria de instrucciones (archivo $readmemb o lista)"""
+        if isinstance(source, (str, os.PathLike)):
+            source = load_readmem(source)
+            # Quitar las palabras en 0 del final de la ROM
+            while source and not source[-1]:
+                source.pop()
+        self.imem = [word & MASK32 for word in source]
+        self._decoded = [decode_word(word) for word in self.imem]
+        self.invalidate()
+
+    def load_data(self, source):
+        """Carga la memoria de datos (archivo $readmemb o lista)"""
+        if isinstance(source, (str, os.PathLike)):
+            source = load_readmem(source) if os.path.exists(source) else []
+        self._dmem_init = [0] * MEM_WORDS
+        for i, word in enumerate(source[:MEM_WORDS]):
+            self._dmem_init[i] = word & MASK32
+
+    def store_instruction(self, index, word):
+        """Modifica una palabra de la memoria de instrucciones e invalida
+        los bloques traducidos que la contienen"""
+        self.imem[index] = word & MASK32
+        self._decoded[index] = decode_word(self.imem[index])
+        stale = [start for start, (_, _, span) in self._cache.items()
+                 if start <= index < start + span]
+        for start in stale:
+            del self._cache[start]
+        # Cambia el límite de los bloques: recalcular conteos
+        self._heat.clear()
+
+    def invalidate(self):
+        """Descarta todos los bloques traducidos"""
+        self._cache = {}
+        self._heat = {}
+
+    def reset(self):
+        """Reinicia registros, memoria de datos y PC (conserva la caché)"""
+        self.registers = [0] * 32
+        self.dmem = list(self._dmem_init)
+        self.pc_index = 0
+        self.steps = 0
+        self.halted = False
+
+    @property
+    def pc(self):
+        """PC en bytes"""
+        return self.pc_index * 4
+
+    @property
+    def translated_blocks(self):
+        """Número de bloques en la caché"""
+        return len(self._cache)
+
+    # ------------------------------------------------------------------
+    # Bloques
+    # ------------------------------------------------------------------
+
+    def find_block(self, start):
+        """Regresa las instrucciones decodificadas del bloque que inicia en
+        'start' (hasta BEQ/BNE/J/JAL, MAX_BLOCK o fin de memoria)"""
+        decoded = self._decoded
+        end = min(len(decoded), start + MAX_BLOCK)
+        for i in range(start, end):
+            if decoded[i][0] in BRANCHES or decoded[i][0] in JUMPS:
+                return decoded[start:i + 1]
+        return decoded[start:end]
+
+    def translate(self, start):
+        """Traduce el bloque que inicia en 'start' y lo guarda en la caché"""
+        recs = self.find_block(start)
+        func_name = f'block_{start:04x}'
+        source = _BlockBuilder().source(func_name, start, recs, len(self.imem))
+        namespace = {}
+        exec(compile(source, f'<mips {func_name}>', 'exec'), namespace)
+        # El 'j' final de un programa no cuenta como instrucción ejecutada,
+        # pero sigue siendo parte del bloque para invalidarlo
+        span = len(recs)
+        length = span - 1 if is_halt(recs[-1], start + span - 1) else span
+        entry = (namespace[func_name], length, span)
+        self._cache[start] = entry
+        return entry
+
+    def block_source(self, start):
+        """Código generado para el bloque que inicia en 'start' (depuración)"""
+        recs = self.find_block(start)
+        return _BlockBuilder().source(f'block_{start:04x}', start, recs,
+                                      len(self.imem))
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def run(self, max_steps=None):
+        """Ejecuta hasta 'max_steps' instrucciones (redondeado al final del
+        bloque) o hasta un 'j' a sí mismo. Regresa las instrucciones
+        ejecutadas."""
+        if max_steps is None:
+            max_steps = 1 << 62
+        regs = self.registers
+        dmem = self.dmem
+        cache = self._cache
+        heat = self._heat
+        threshold = self.hot_threshold
+        size = len(self.imem)
+        pc = self.pc_index
+        steps = 0
+
+        while steps < max_steps:
+            entry = cache.get(pc)
+            if entry is None:
+                if not 0 <= pc < size:
+                    self.halted = True
+                    break
+                count = heat.get(pc, 0) + 1
+                if count < threshold:
+                    # Bloque frío: interpretarlo
+                    heat[pc] = count
+                    pc, executed = self._interpret_block(pc)
+                    steps += executed
+                    continue
+                entry = self.translate(pc)
+            func, length, _ = entry
+            pc = func(regs, dmem)
+            steps += length
+
+        if pc < 0:
+            pc = ~pc
+        self.pc_index = pc
+        self.steps += steps
+        return steps
+
+    def _interpret_block(self, start):
+        """Ejecuta un bloque instrucción por instrucción"""
+        regs = self.registers
+        dmem = self.dmem
+        recs = self.find_block(start)
+        size = len(self.imem)
+        for i, rec in enumerate(recs):
+            index = start + i
+            nxt = self.step(rec, index, regs, dmem, size)
+            if nxt < 0:
+                return nxt, i
+            if nxt != index + 1:
+                return nxt, i + 1
+        return start + len(recs), len(recs)
+
+    def step(self, rec, index, regs, dmem, size):
+        """Ejecuta una instrucción decodificada; regresa el siguiente índice"""
+        name, rs, rt, rd, shamt, simm, addr = rec
+        uimm = simm & MASK32
+        value = None
+        dst = rt
+        if name == 'add':
+            value, dst = (regs[rs] + regs[rt]) & MASK32, rd
+        elif name == 'sub':
+            value, dst = (regs[rs] - regs[rt]) & MASK32, rd
+        elif name == 'and':
+            value, dst = regs[rs] & regs[rt], rd
+        elif name == 'or':
+            value, dst = regs[rs] | regs[rt], rd
+        elif name == 'slt':
+            value = 1 if (regs[rs] ^ 0x80000000) < (regs[rt] ^ 0x80000000) else 0
+            dst = rd
+        elif name == 'sll':
+            value, dst = (regs[rt] << shamt) & MASK32, rd
+        elif name == 'srl':
+            value, dst = regs[rt] >> shamt, rd
+        elif name == 'addi':
+            value = (regs[rs] + uimm) & MASK32
+        elif name == 'andi':
+            value = regs[rs] & uimm
+        elif name == 'ori':
+            value = regs[rs] | uimm
+        elif name == 'xori':
+            value = regs[rs] ^ uimm
+        elif name == 'slti':
+            value = 1 if (regs[rs] ^ 0x80000000) < (uimm ^ 0x80000000) else 0
+        elif name == 'lui':
+            value = (simm << 16) & MASK32
+        elif name == 'lw':
+            value = dmem[((regs[rs] + uimm) >> 2) & 0xFF]
+        elif name == 'sw':
+            dmem[((regs[rs] + uimm) >> 2) & 0xFF] = regs[rt]
+        elif name in BRANCHES:
+            if (regs[rs] == regs[rt]) == (name == 'beq'):
+                return branch_target(index, simm, size)
+        elif name in JUMPS:
+            if name == 'jal':
+                regs[31] = (index + 1) * 4
+            target = addr & 0xFF
+            return ~index if target == index else target
+        if value is not None and dst:
+            regs[dst] = value
+        return index + 1
+
+    def interpret(self, max_steps=None):
+        """Intérprete simple (sin traducción), usado como referencia"""
+        if max_steps is None:
+            max_steps = 1 << 62
+        regs = self.registers
+        dmem = self.dmem
+        decoded = self._decoded
+        size = len(decoded)
+        step = self.step
+        pc = self.pc_index
+        steps = 0
+        while steps < max_steps:
+            if not 0 <= pc < size:
+                self.halted = True
+                break
+            pc = step(decoded[pc], pc, regs, dmem, size)
+            if pc < 0:
+                self.halted = True
+                pc = ~pc
+                break
+            steps += 1
+        self.pc_index = pc
+        self.steps += steps
+        return steps
+
+    def dump(self):
+        """Regresa un resumen del estado"""
+        estado = "detenido" if self.halted else "en ejecución"
+        return format_state(self.pc, self.registers, self.dmem,
+                            f"Instrucciones = {self.steps} ({estado}), "
+                            f"bloques traducidos = {len(self._cache)}")
+
+
+# ============================================================================
+# Benchmark: traductor vs intérprete con el programa voraz
+# ============================================================================
+
+def benchmark(asm_path, amount=1000000, repeat=3):
+    """Compara traductor e intérprete con programa_voraz.asm.
+    'amount' es el monto a cambiar (mem[0]); un monto grande alarga los
+    ciclos de cada denominación. Regresa un dict con los tiempos."""
+    import time
+
+    decoder = MIPSDecoder()
+    with open(asm_path, 'r') as f:
+        instructions = decoder.assemble(f.read())
+    if decoder.errors:
+        raise ValueError("; ".join(decoder.errors))
+    words = [instr['binary'] for instr in instructions]
+    data = [amount, 25, 10, 5, 1]
+
+    results = {}
+    for mode in ('interpret', 'run'):
+        best = None
+        for _ in range(repeat):
+            engine = BlockTranslator(words, data)
+            start = time.perf_counter()
+            steps = getattr(engine, mode)()
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best[0]:
+                best = (elapsed, steps, engine)
+        elapsed, steps, engine = best
+        results[mode] = {
+            'segundos': elapsed,
+            'instrucciones': steps,
+            'instr_por_segundo': steps / elapsed if elapsed else 0.0,
+            'memoria': engine.dmem[5:10],
+        }
+    if results['interpret']['memoria'] != results['run']['memoria']:
+        raise AssertionError("El traductor y el intérprete no coinciden")
+    results['aceleracion'] = (results['interpret']['segundos'] /
+                              results['run']['segundos'])
+    return results
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Ejecuta un programa MIPS con traducción por bloques")
+    parser.add_argument("instrucciones", nargs="?", default="instrucciones.txt",
+                        help="archivo $readmemb de la ROM (instrucciones.txt)")
+    parser.add_argument("datos", nargs="?", default="datos.txt",
+                        help="archivo $readmemb de la RAM (datos.txt)")
+    parser.add_argument("-n", "--pasos", type=int, default=DEFAULT_MAX_STEPS,
+                        help="máximo de instrucciones a ejecutar "
+                             f"(por defecto {DEFAULT_MAX_STEPS:,})")
+    parser.add_argument("--bench", metavar="ASM", nargs="?",
+                        const="programa_voraz.asm", default=None,
+                        help="comparar contra el intérprete con el programa "
+                             "voraz (default: programa_voraz.asm)")
+    parser.add_argument("--monto", type=int, default=1000000,
+                        help="monto a cambiar en el benchmark (mem[0])")
+    args = parser.parse_args()
+
+    if args.bench:
+        results = benchmark(args.bench, args.monto)
+        for mode, label in (('interpret', 'Intérprete'), ('run', 'Traductor')):
+            r = results[mode]
+            print(f"{label:<11} {r['instrucciones']:>12,} instr  "
+                  f"{r['segundos']:8.3f} s  {r['instr_por_segundo']:>14,.0f} instr/s")
+        print(f"Aceleración: {results['aceleracion']:.1f}x")
+        print(f"Monedas [25, 10, 5, 1] y total: {results['run']['memoria']}")
+        return
+
+    engine = BlockTranslator(args.instrucciones, args.datos)
+    engine.run(args.pasos)
+    print(engine.dump())
+    if not engine.halted:
+        print(f"⚠️ Se alcanzó el límite de {args.pasos:,} instrucciones sin llegar "
+              f"a un 'j' a sí mismo (use --pasos para cambiarlo)")
+
+
+if __name__ == "__main__":
+    main_cli()
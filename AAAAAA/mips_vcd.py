@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+# ============================================================================
+# Lector de VCD en streaming con índice de tiempos
+# ============================================================================
+# Proyecto Final - Arquitectura de Computadoras
+#
+# ModelSim guarda cada bus bit por bit (PC_current [31] ... PC_current [0]).
+# Este lector:
+#   - Recorre el archivo línea por línea (memoria acotada: solo el valor
+#     actual de cada señal), sin importar el tamaño del dump
+#   - Junta las variables de un bit en vectores enteros (PC_current)
+#   - Construye un índice a un lado (<archivo>.vcd.idx) con puntos de
+#     control cada cierto número de bytes (tiempo, posición en el archivo,
+#     ciclo, valor de todas las señales y posición en el archivo de
+#     escrituras), para contestar "PC en el ciclo N" sin volver a recorrer
+#     el archivo completo
+#   - Las escrituras al BancoRegistros van a otro archivo a un lado
+#     (<archivo>.vcd.esc), una por línea, conforme se encuentran; nunca se
+#     tienen todas en memoria
+#
+# Ciclo N = N-ésimo flanco de subida de clk con reset en 0 (igual que
+# MIPSPipeline.run(N)); el valor "en el ciclo N" es el que queda después
+# de ese flanco. Las escrituras al banco se toman en el flanco de bajada
+# (BancoRegistros.v) con RegWrite=1, reset=0 y WriteReg != 0.
+# ============================================================================
+
+import json
+import os
+import re
+import sys
+
+INDEX_VERSION = 2
+DEFAULT_INTERVAL = 1 << 20      # Bytes entre puntos de control
+
+_BIT_SELECT = re.compile(r'^\[(\d+)(?::(\d+))?\]$')
+_XZ_TO_ZERO = bytes.maketrans(b'xXzZ', b'0000')
+_XZ_MASK = bytes.maketrans(b'01xXzZ', b'001111')
+# Primer byte de un cambio escalar -> (valor, xmask) (None si no es escalar),
+# y primeros bytes de un vector/real
+_SCALARS = tuple((1 if c == '1' else 0, 0 if c in '01' else 1) if c in '01xXzZ' else None
+                 for c in map(chr, range(256)))
+_VECTORS = frozenset(b'bBrR')
+
+
+class Signal:
+    """Señal agrupada (vector o escalar)"""
+
+    __slots__ = ('name', 'index', 'width', 'lsb', 'kind')
+
+    def __init__(self, name, index, kind):
+        self.name = name
+        self.index = index
+        self.width = 0
+        self.lsb = None
+        self.kind = kind
+
+    def __repr__(self):
+        return f"Signal({self.name!r}, ancho={self.width})"
+
+
+class VCDReader:
+    """Lector de un archivo VCD"""
+
+    def __init__(self, path, clock='clk', reset='reset', regfile='regfile'):
+        self.path = os.fspath(path)
+        self.signals = []           # Signal por índice
+        self.by_name = {}
+        self.timescale = None
+        self._ids = {}              # código -> [(índice, bit o None)]
+        self.header_end = 0
+        self._parse_header()
+        self.clock = self._optional(clock)
+        self.reset = self._optional(reset)
+        self.regfile = {port: self._optional(f"{regfile}.{port}")
+                        for port in ('RegWrite', 'WriteReg', 'WriteData')}
+        self._index = None
+
+    # ------------------------------------------------------------------
+    # Encabezado
+    # ------------------------------------------------------------------
+
+    def _parse_header(self):
+        """Lee las definiciones hasta $enddefinitions"""
+        scopes = []
+        tokens = []
+        with open(self.path, 'rb') as f:
+            pos = 0
+            for line in f:
+                pos += len(line)
+                tokens.extend(line.split())
+                while b'$end' in tokens:
+                    end = tokens.index(b'$end')
+                    command = tokens[:end]
+                    del tokens[:end + 1]
+                    if command and command[0] == b'$enddefinitions':
+                        self.header_end = pos
+                        self._relative_bits()
+                        return
+                    self._header_command(command, scopes)
+        raise ValueError(f"{self.path}: falta $enddefinitions")
+
+    def _header_command(self, command, scopes):
+        if not command:
+            return
+        keyword = command[0]
+        if keyword == b'$scope':
+            scopes.append(command[2].decode())
+        elif keyword == b'$upscope':
+            scopes.pop()
+        elif keyword == b'$timescale':
+            self.timescale = b' '.join(command[1:]).decode()
+        elif keyword == b'$var':
+            kind = command[1].decode()
+            size = int(command[2])
+            code = command[3]
+            ref = command[4].decode()
+            select = command[5].decode() if len(command) > 5 else ''
+            match = _BIT_SELECT.match(select)
+            if not match and '[' in ref:
+                ref, _, rest = ref.partition('[')
+                match = _BIT_SELECT.match('[' + rest)
+            name = '.'.join(scopes + [ref])
+
+            signal = self.by_name.get(name)
+            if signal is None:
+                signal = self.by_name[name] = Signal(name, len(self.signals), kind)
+                self.signals.append(signal)
+            if size == 1 and match and match.group(2) is None:
+                # Un bit de un bus: se agrupa con los demás bits
+                bit = int(match.group(1))
+                if signal.lsb is None:
+                    low = high = bit
+                else:
+                    low = min(signal.lsb, bit)
+                    high = max(signal.lsb + signal.width - 1, bit)
+                signal.lsb = low
+                signal.width = high - low + 1
+                self._ids.setdefault(code, []).append((signal.index, bit))
+            else:
+                if match and match.group(2) is not None:
+                    signal.lsb = min(int(match.group(1)), int(match.group(2)))
+                else:
+                    signal.lsb = 0
+                signal.width = size
+                self._ids.setdefault(code, []).append((signal.index, None))
+
+    def _relative_bits(self):
+        """Bits de cada código relativos al lsb final de su vector"""
+        for code, targets in self._ids.items():
+            self._ids[code] = [(index, None if bit is None
+                                else bit - self.signals[index].lsb)
+                               for index, bit in targets]
+
+    # ------------------------------------------------------------------
+    # Búsqueda de señales
+    # ------------------------------------------------------------------
+
+    def find(self, name):
+        """Señal por nombre completo o por sufijo ('uut.PC_current',
+        'PC_current'); si hay varias, la de menor profundidad"""
+        if name in self.by_name:
+            return self.by_name[name]
+        suffix = '.' + name
+        matches = [s for s in self.signals if s.name.endswith(suffix)]
+        if not matches:
+            raise KeyError(f"Señal no encontrada: {name}")
+        depth = min(s.name.count('.') for s in matches)
+        shallow = [s for s in matches if s.name.count('.') == depth]
+        if len(shallow) > 1:
+            names = ', '.join(s.name for s in shallow)
+            raise KeyError(f"Señal ambigua: {name} ({names})")
+        return shallow[0]
+
+    def _optional(self, name):
+        try:
+            return self.find(name)
+        except KeyError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Recorrido
+    # ------------------------------------------------------------------
+
+    def _scan(self, offset, values, xmasks):
+        """Generador: aplica los cambios desde 'offset' sobre values/xmasks
+        y, al terminar cada tiempo, produce (tiempo, posición de la línea
+        '#' siguiente, {índice: (valor, xmask) anterior})"""
+        ids = self._ids
+        lookup = ids.get
+        apply_scalar = self._apply_scalar
+        time = None
+        old = {}
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            pos = offset
+            pending = None          # Valor de 'b'/'r' esperando su código
+            skipping = False        # Dentro de $comment ... $end
+            for line in f:
+                start = pos
+                pos += len(line)
+                # Camino rápido: un cambio por línea (lo normal en un VCD)
+                if pending is None and not skipping:
+                    first = line[0]
+                    scalar = _SCALARS[first]
+                    if scalar is not None:
+                        code = line[1:].rstrip()
+                        targets = lookup(code)
+                        if targets is not None:
+                            apply_scalar(targets, scalar, values, xmasks, old)
+                            continue
+                        if b' ' not in code and b'\t' not in code:
+                            continue        # Código que no se sigue
+                    elif first == 0x23:                     # '#'
+                        try:
+                            new_time = int(line[1:])
+                        except ValueError:
+                            pass
+                        else:
+                            if time is not None:
+                                yield time, start, old
+                                old = {}
+                            time = new_time
+                            continue
+                    elif first in _VECTORS:
+                        tokens = line.split()
+                        if len(tokens) == 2:
+                            self._apply_vector(lookup(tokens[1], ()), tokens[0],
+                                               values, xmasks, old)
+                            continue
+                # Camino general, token por token ($comandos, varios
+                # cambios en una línea, $comment de varias líneas)
+                for token in line.split():
+                    if skipping:
+                        skipping = token != b'$end'
+                        continue
+                    first = token[0]
+                    if pending is not None:
+                        self._apply_vector(lookup(token, ()), pending,
+                                           values, xmasks, old)
+                        pending = None
+                    elif first == 0x23:                     # '#'
+                        if time is not None:
+                            yield time, start, old
+                            old = {}
+                        time = int(token[1:])
+                    elif _SCALARS[first] is not None:
+                        apply_scalar(lookup(token[1:], ()), _SCALARS[first],
+                                     values, xmasks, old)
+                    elif first in _VECTORS:
+                        pending = token
+                    elif token == b'$comment':
+                        skipping = True
+                    # $dumpvars, $dumpon, $dumpoff, $dumpall, $end: nada
+        if time is not None:
+            yield time, pos, old
+
+    @staticmethod
+    def _apply_scalar(targets, scalar, values, xmasks, old):
+        bit_value, unknown = scalar
+        for index, bit in targets:
+            if index not in old:
+                old[index] = (values[index], xmasks[index])
+            if bit is None:
+                values[index] = bit_value
+                xmasks[index] = unknown
+            else:
+                mask = 1 << bit
+                values[index] = (values[index] & ~mask) | (bit_value << bit)
+                xmasks[index] = (xmasks[index] & ~mask) | (unknown << bit)
+
+    def _apply_vector(self, targets, token, values, xmasks, old):
+        if token[0] in b'rR':
+            value, unknown = float(token[1:]), 0
+            digits = None
+        else:
+            digits = token[1:]
+            value = int(digits.translate(_XZ_TO_ZERO), 2)
+            unknown = int(digits.translate(_XZ_MASK), 2)
+        for index, bit in targets:
+            if index not in old:
+                old[index] = (values[index], xmasks[index])
+            if bit is not None:
+                mask = 1 << bit
+                values[index] = (values[index] & ~mask) | ((value & 1) << bit)
+                xmasks[index] = (xmasks[index] & ~mask) | ((unknown & 1) << bit)
+                continue
+            if digits is not None and len(digits) < self.signals[index].width \
+                    and digits[:1] in (b'x', b'X', b'z', b'Z'):
+                # Extensión a la izquierda con x/z (regla de VCD)
+                width = self.signals[index].width
+                unknown |= ((1 << width) - 1) ^ ((1 << len(digits)) - 1)
+            values[index] = value
+            xmasks[index] = unknown
+
+    def initial_state(self):
+        """Valores al inicio (todo en x)"""
+        n = len(self.signals)
+        return [0] * n, [(1 << max(s.width, 1)) - 1 for s in self.signals]
+
+    def changes(self, names=None, start=None, end=None):
+        """Generador de (tiempo, nombre, valor, xmask) por cada señal que
+        cambió en ese tiempo (los bits de un bus se juntan en un solo
+        cambio). Con 'start' se usa el índice para no recorrer el inicio."""
+        wanted = (None if names is None else
+                  {self.find(name).index for name in names})
+        values, xmasks, offset = self._resume(start)
+        for time, _, old in self._scan(offset, values, xmasks):
+            if end is not None and time > end:
+                return
+            if start is not None and time < start:
+                continue
+            for index, (value, unknown) in old.items():
+                if wanted is not None and index not in wanted:
+                    continue
+                if (values[index], xmasks[index]) != (value, unknown):
+                    yield (time, self.signals[index].name,
+                           values[index], xmasks[index])
+
+    def _resume(self, start=None):
+        """Estado y posición desde donde empezar a recorrer para 'start'"""
+        values, xmasks = self.initial_state()
+        offset = self.header_end
+        if start is not None:
+            index = self.index()
+            best = None
+            for checkpoint in index['puntos']:
+                if checkpoint[0] <= start:
+                    best = checkpoint
+            if best is not None:
+                return self._restore(best) + (best[1],)
+        return values, xmasks, offset
+
+    def _restore(self, checkpoint):
+        values = [int(v, 16) for v in checkpoint[3]]
+        xmasks = [int(v, 16) for v in checkpoint[4]]
+        return values, xmasks
+
+    # ------------------------------------------------------------------
+    # Índice a un lado
+    # ------------------------------------------------------------------
+
+    @property
+    def index_path(self):
+        return self.path + '.idx'
+
+    @property
+    def writes_path(self):
+        return self.path + '.esc'
+
+    def _fingerprint(self):
+        st = os.stat(self.path)
+        return {'tamano': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    def build_index(self, interval=DEFAULT_INTERVAL):
+        """Recorre el archivo una vez y escribe el índice (atómico)"""
+        values, xmasks = self.initial_state()
+        clock = self.clock.index if self.clock else None
+        reset = self.reset.index if self.reset else None
+        regfile = self.regfile
+        write_ports = (None if None in regfile.values() else
+                       [regfile[p].index for p in ('RegWrite', 'WriteReg', 'WriteData')])
+
+        checkpoints = [[0, self.header_end, 0,
+                        [format(v, 'x') for v in values],
+                        [format(x, 'x') for x in xmasks], 0]]
+        writes = 0
+        cycle = 0
+        last_offset = self.header_end
+        end_time = 0
+        writes_tmp = self.writes_path + '.tmp'
+        try:
+            with open(writes_tmp, 'w') as out:
+                for time, next_offset, old in self._scan(self.header_end, values, xmasks):
+                    end_time = time
+                    if clock is not None and clock in old:
+                        if self._posedge(old, values, clock, reset):
+                            cycle += 1
+                        elif old[clock][0] == 1 and values[clock] == 0 and write_ports is not None:
+                            # Valores antes del flanco (BancoRegistros en negedge)
+                            sampled = [old.get(i, (values[i], xmasks[i])) for i in write_ports]
+                            reset_before = (old.get(reset, (values[reset],))[0]
+                                            if reset is not None else 0)
+                            (rw, rw_x), (wr, wr_x), (data, data_x) = sampled
+                            if rw == 1 and not rw_x and wr and not wr_x and not reset_before:
+                                out.write(json.dumps([time, cycle, wr, data, data_x]) + '\n')
+                                writes += 1
+                    if next_offset - last_offset >= interval:
+                        checkpoints.append([time + 1, next_offset, cycle,
+                                            [format(v, 'x') for v in values],
+                                            [format(x, 'x') for x in xmasks],
+                                            out.tell()])
+                        last_offset = next_offset
+                writes_size = out.tell()
+            os.replace(writes_tmp, self.writes_path)
+        except BaseException:
+            # No dejar el .esc.tmp a medias si el recorrido falla
+            if os.path.exists(writes_tmp):
+                os.remove(writes_tmp)
+            raise
+
+        index = {
+            'version': INDEX_VERSION,
+            'vcd': self._fingerprint(),
+            'intervalo': interval,
+            'senales': [s.name for s in self.signals],
+            'fin': end_time,
+            'ciclos': cycle,
+            'puntos': checkpoints,
+            'escrituras': writes,
+            'escrituras_bytes': writes_size,
+        }
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp, self.index_path)
+        self._index = index
+        return self._index
+
+    def index(self, rebuild=False):
+        """Carga el índice; lo reconstruye si no existe o el VCD cambió"""
+        if self._index is not None and not rebuild:
+            return self._index
+        if not rebuild:
+            try:
+                with open(self.index_path) as f:
+                    index = json.load(f)
+                if (index.get('version') == INDEX_VERSION and
+                        index.get('vcd') == self._fingerprint() and
+                        index.get('senales') == [s.name for s in self.signals] and
+                        index.get('escrituras_bytes') == os.path.getsize(self.writes_path)):
+                    self._index = index
+                    return self._index
+            except (OSError, ValueError):
+                pass
+        return self.build_index()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def value_at_cycle(self, name, cycle):
+        """(valor, xmask) de la señal después del flanco del ciclo 'cycle'
+        (ciclo 0: antes del primer flanco sin reset)"""
+        if self.clock is None:
+            raise KeyError("El VCD no tiene señal de reloj")
+        index = self.index()
+        if not 0 <= cycle <= index['ciclos']:
+            raise ValueError(f"Ciclo fuera del dump: {cycle} (hay {index['ciclos']})")
+        target = self.find(name).index
+        clock = self.clock.index
+        reset = self.reset.index if self.reset else None
+
+        best = index['puntos'][0]
+        for checkpoint in index['puntos']:
+            if checkpoint[2] < cycle:
+                best = checkpoint
+        values, xmasks = self._restore(best)
+        current = best[2]
+        for _, _, old in self._scan(best[1], values, xmasks):
+            if self._posedge(old, values, clock, reset):
+                if current == cycle:
+                    # Ciclo 0: valor antes del primer flanco
+                    return old.get(target, (values[target], xmasks[target]))
+                current += 1
+                if current == cycle:
+                    return values[target], xmasks[target]
+        if current == cycle:
+            return values[target], xmasks[target]
+        raise ValueError(f"No se encontró el ciclo {cycle}")
+
+    @staticmethod
+    def _posedge(old, values, clock, reset):
+        """Flanco de subida de clk en este tiempo con reset en 0"""
+        return (clock in old and old[clock][0] == 0 and values[clock] == 1 and
+                not (reset is not None and values[reset] == 1))
+
+    def value_at(self, name, time):
+        """(valor, xmask) de la señal al final del tiempo 'time'"""
+        target = self.find(name).index
+        values, xmasks, offset = self._resume(time)
+        result = (values[target], xmasks[target])
+        for t, _, _ in self._scan(offset, values, xmasks):
+            if t > time:
+                break
+            result = (values[target], xmasks[target])
+        return result
+
+    def register_writes(self, register=None, start_cycle=None):
+        """Generador de escrituras al BancoRegistros desde el archivo de
+        escrituras: (tiempo, ciclo, registro, dato, xmask). Con
+        'start_cycle' empieza en el punto de control anterior a ese ciclo."""
+        index = self.index()
+        offset = 0
+        if start_cycle is not None:
+            for checkpoint in index['puntos']:
+                if checkpoint[2] < start_cycle:
+                    offset = checkpoint[5]
+        with open(self.writes_path) as f:
+            f.seek(offset)
+            for line in f:
+                write = tuple(json.loads(line))
+                if start_cycle is not None and write[1] < start_cycle:
+                    continue
+                if register is None or write[2] == register:
+                    yield write
+
+
+def format_value(value, xmask, width):
+    """Valor en hex, o en binario con x si tiene bits desconocidos"""
+    if isinstance(value, float):
+        return repr(value)
+    if not xmask:
+        return f"0x{value:0{max(1, (width + 3) // 4)}x}"
+    return ''.join('x' if (xmask >> b) & 1 else str((value >> b) & 1)
+                   for b in range(width - 1, -1, -1))
+
+
+def main_cli():
+    """Modo línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lector de VCD (tb_MIPS_Pipeline.vcd)")
+    parser.add_argument("vcd", nargs="?", default="tb_MIPS_Pipeline.vcd")
+    parser.add_argument("--indexar", action="store_true",
+                        help="reconstruir el índice <vcd>.idx")
+    parser.add_argument("--intervalo", type=int, default=DEFAULT_INTERVAL,
+                        help="bytes entre puntos de control del índice")
+    parser.add_argument("--senales", action="store_true",
+                        help="listar las señales agrupadas")
+    parser.add_argument("--valor", metavar="SEÑAL", help="valor de una señal")
+    parser.add_argument("--ciclo", type=int, help="ciclo para --valor")
+    parser.add_argument("--tiempo", type=int, help="tiempo para --valor")
+    parser.add_argument("--escrituras", action="store_true",
+                        help="escrituras al BancoRegistros")
+    parser.add_argument("--desde-ciclo", type=int, default=None,
+                        help="primer ciclo para --escrituras")
+    parser.add_argument("--cambios", metavar="SEÑAL", action="append",
+                        help="cambios de una señal (se puede repetir)")
+    parser.add_argument("--desde", type=int, default=None)
+    parser.add_argument("--hasta", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        reader = VCDReader(args.vcd)
+        if args.indexar:
+            index = reader.index(rebuild=True)
+            print(f"✅ Índice: {reader.index_path}  ({len(index['puntos'])} puntos, "
+                  f"{index['ciclos']} ciclos, {index['escrituras']} escrituras)")
+        if args.senales:
+            for signal in reader.signals:
+                print(f"{signal.width:>3}  {signal.kind:<9} {signal.name}")
+        if args.valor:
+            signal = reader.find(args.valor)
+            if args.ciclo is not None:
+                value, xmask = reader.value_at_cycle(args.valor, args.ciclo)
+                when = f"ciclo {args.ciclo}"
+            else:
+                time = args.tiempo if args.tiempo is not None else reader.index()['fin']
+                value, xmask = reader.value_at(args.valor, time)
+                when = f"t={time}"
+            print(f"{signal.name} @ {when} = {format_value(value, xmask, signal.width)}")
+        if args.escrituras:
+            for time, cycle, reg, data, xmask in reader.register_writes(start_cycle=args.desde_ciclo):
+                print(f"t={time:<8} ciclo {cycle:<6} ${reg:<2} <- {format_value(data, xmask, 32)}")
+        if args.cambios:
+            widths = {reader.find(n).name: reader.find(n).width for n in args.cambios}
+            for time, name, value, xmask in reader.changes(args.cambios, args.desde, args.hasta):
+                print(f"t={time:<8} {name} = {format_value(value, xmask, widths[name])}")
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,25 +1,215 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
+import re
+import sys
 import struct
-import platform
-import subprocess
-import datetime
+from array import array
+
+# tkinter se importa solo al abrir la GUI (load_tk): el modo de línea de
+# comandos funciona sin pantalla y arranca sin pagar el costo de Tk (los
+# módulos que solo usa la GUI también se importan dentro de sus métodos)
+tk = ttk = filedialog = messagebox = scrolledtext = None
+
+# Capa de salida compartida con el decodificador de AAAAAA
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'AAAAAA'))
+from mips_output import write_words, to_text, format_for_path
+from mips_isa import (INSTRUCTIONS, OPERAND_SYNTAX, REGISTERS, encode,
+                      parse_register, syntax)
+
+# Operandos de cada forma ('$rt, offset($rs)' son 2)
+OPERAND_COUNT = {kind: len(text.replace(',', ' ').split())
+                 for kind, text in OPERAND_SYNTAX.items()}
+
+# Tramo de código de una línea: sin comentario ni espacios en los extremos
+_CODE_SPAN = re.compile(r'\s*([^#]*?)\s*(?:#|$)')
+
+def load_tk():
+    """Importa tkinter (solo la GUI lo necesita)"""
+    global tk, ttk, filedialog, messagebox, scrolledtext
+    if tk is None:
+        import tkinter as tk
+        from tkinter import ttk, filedialog, messagebox, scrolledtext
+
+# Decodificación de archivos en segundo plano
+BATCH_LINES = 2000      # Líneas por lote enviado a la GUI
+QUEUE_BATCHES = 32      # Lotes en espera antes de frenar al hilo de trabajo
+POLL_MS = 50            # Intervalo del temporizador que vacía la cola
+DRAIN_SECONDS = 0.03    # Tiempo máximo de GUI por cada vaciado
+PREVIEW_WORDS = 1000    # Palabras que se muestran al terminar (el archivo lleva todas)
+
+class _cached_view:
+    """Propiedad calculada al pedirla y guardada en el slot '_<nombre>'"""
+    
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+    
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+    
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            value = self.func(obj)
+            setattr(obj, self.slot, value)
+            return value
+
+class DecodedInstruction:
+    """Resultado de decodificar una línea: solo la palabra de 32 bits y el
+    tramo del texto fuente. Las vistas (hex, bytes, binario) se calculan la
+    primera vez que se piden; también se puede leer como diccionario
+    (result['encoded_hex'])."""
+    
+    __slots__ = ('encoded', 'source', 'start', 'end',
+                 '_encoded_hex', '_bytes_data', '_bytes_hex', '_bytes_bin',
+                 '_binary_string')
+    
+    KEYS = ('original', 'encoded_hex', 'bytes_hex', 'bytes_bin', 'bytes_data',
+            'encoded', 'binary_string')
+    
+    def __init__(self, encoded, source, start=0, end=None):
+        self.encoded = encoded
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+    
+    @property
+    def original(self):
+        """Texto de la instrucción (sin comentario)"""
+        return self.source[self.start:self.end]
+    
+    @_cached_view
+    def encoded_hex(self):
+        return f"{self.encoded:08X}"
+    
+    @_cached_view
+    def bytes_data(self):
+        """Bytes Big Endian"""
+        return struct.pack('>I', self.encoded)
+    
+    @_cached_view
+    def bytes_hex(self):
+        return ' '.join(f"{b:02X}" for b in self.bytes_data)
+    
+    @_cached_view
+    def bytes_bin(self):
+        return ' '.join(f"{b:08b}" for b in self.bytes_data)
+    
+    @_cached_view
+    def binary_string(self):
+        """Cadena binaria continua"""
+        return format(self.encoded, '032b')
+    
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __repr__(self):
+        return f"DecodedInstruction({self.original!r}, 0x{self.encoded:08X})"
 
 class MIPSDecoder:
+    """Núcleo del codificador: sin Tk, se puede usar desde scripts, otros
+    procesos o la línea de comandos"""
+    
     def __init__(self):
-        # Tabla de instrucciones para escalabilidad
-        self.instruction_table = {
-            'ADD': {'type': 'R', 'opcode': 0x00, 'funct': 0x20, 'operand_parser': self.parse_r_type},
-            'SUB': {'type': 'R', 'opcode': 0x00, 'funct': 0x22, 'operand_parser': self.parse_r_type},
-            'OR':  {'type': 'R', 'opcode': 0x00, 'funct': 0x25, 'operand_parser': self.parse_r_type}
-        }
+        # Tablas compartidas con el ensamblador de AAAAAA (mips_isa):
+        # mnemónico -> (palabra base, forma, parser de operandos)
+        self.instruction_table = INSTRUCTIONS
+        
+        # Registros $0-$31 y alias ($zero, $t0, ...)
+        self.register_map = REGISTERS
         
-        # Mapeo de registros
-        self.register_map = {f'${i}': i for i in range(32)}
+        # Buffer de palabras de 32 bits decodificadas
+        self.words = array('I')
+    
+    def parse_register(self, reg_str):
+        """Convierte string de registro a número"""
+        return parse_register(reg_str)
+    
+    def clean_line(self, line):
+        """Limpia línea de comentarios y espacios extra"""
+        return _CODE_SPAN.match(line).group(1)
+    
+    def encode_instruction(self, instruction, operands):
+        """Codifica instrucción a binario MIPS32 (palabra base OR operandos)"""
+        name = instruction.lower()
+        expected = OPERAND_COUNT[self.instruction_table[name][1]]
+        if len(operands) > expected:
+            raise ValueError(f"Se esperaban {expected} operandos. Formato: {syntax(name).upper()}")
+        try:
+            return encode([instruction] + operands)
+        except IndexError:
+            raise ValueError(f"Faltan operandos. Formato: {syntax(instruction.lower()).upper()}")
+    
+    def to_big_endian_bytes(self, instruction_32bit):
+        """Convierte instrucción de 32 bits a bytes Big Endian"""
+        # Usar struct para empaquetar en Big Endian
+        return struct.pack('>I', instruction_32bit)
+    
+    def decode_single_instruction(self, line, line_num=None):
+        """Decodifica una sola instrucción"""
+        try:
+            start, end = _CODE_SPAN.match(line).span(1)
+            if start == end:
+                return None, "Línea vacía o comentario"
+            text = line[start:end]
+            
+            parts = text.replace(',', ' ').split()
+            instruction = parts[0].upper()
+            operands = parts[1:]
+            
+            # Verificar si la instrucción existe
+            if instruction.lower() not in self.instruction_table:
+                raise ValueError(f"Instrucción no soportada: {instruction}")
+            
+            # Codificar instrucción; las vistas (hex, bytes) se calculan al
+            # pedirlas
+            encoded = self.encode_instruction(instruction, operands)
+            result = DecodedInstruction(encoded, line, start, end)
+            
+            line_info = f"Línea {line_num}: " if line_num is not None else ""
+            return result, f"{line_info}✓ {text} -> {encoded:08X}"
+            
+        except Exception as e:
+            line_info = f"Línea {line_num}: " if line_num is not None else ""
+            return None, f"{line_info}✗ Error: {str(e)}"
+    
+    def decode_file(self, filename):
+        """Decodifica un archivo completo (línea por línea). Regresa
+        (palabras, errores); las líneas vacías o de comentario no cuentan
+        como error."""
+        words = array('I')
+        errors = []
+        with open(filename, 'r', encoding='utf-8') as file:
+            for i, line in enumerate(file, 1):
+                if not self.clean_line(line):
+                    continue
+                result, message = self.decode_single_instruction(line, i)
+                if result:
+                    words.append(result.encoded)
+                else:
+                    errors.append(message)
+        self.words = words
+        return words, errors
+    
+    def save_binary_file(self, filename, words):
+        """Guarda SOLO las palabras (formato según la extensión: .txt binario,
+        .hex, .mem disperso o .bin)"""
+        write_words(filename, words, format_for_path(filename))
+
+class MIPSDecoderGUI(MIPSDecoder):
+    """Interfaz gráfica sobre el núcleo"""
+    
+    def __init__(self):
+        super().__init__()
+        load_tk()
         
-        # Inicializar lista vacía de instrucciones binarias
-        self.binary_strings = []
+        # Hilo de decodificación de archivos (None si no hay uno activo)
+        self.worker = None
         
         self.setup_gui()
     
@@ -39,9 +229,11 @@ class MIPSDecoder:
         title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
         
         # Instrucciones soportadas
+        supported = ', '.join(name.upper() for name in self.instruction_table)
         info_label = ttk.Label(main_frame, 
-                              text="Instrucciones soportadas: ADD, SUB, OR\nFormato: INSTR $rd, $rs, $rt",
-                              font=('Arial', 10))
+                              text=f"Instrucciones soportadas: {supported}\n"
+                                   f"Formato: {syntax('add').upper()}  |  {syntax('lw').upper()}",
+                              font=('Arial', 10), wraplength=600, justify=tk.CENTER)
         info_label.grid(row=1, column=0, columnspan=3, pady=(0, 10))
         
         # Entrada manual
@@ -68,8 +260,16 @@ class MIPSDecoder:
         ttk.Entry(file_frame, textvariable=self.file_path, width=40).grid(row=0, column=0, sticky=(tk.W, tk.E))
         ttk.Button(file_frame, text="Buscar Archivo", 
                   command=self.browse_file).grid(row=0, column=1, padx=(10, 0))
-        ttk.Button(file_frame, text="Decodificar Archivo", 
-                  command=self.decode_from_file).grid(row=0, column=2, padx=(10, 0))
+        self.decode_file_button = ttk.Button(file_frame, text="Decodificar Archivo", 
+                                             command=self.decode_from_file)
+        self.decode_file_button.grid(row=0, column=2, padx=(10, 0))
+        
+        # Progreso y cancelación de la decodificación en segundo plano
+        self.progress = ttk.Progressbar(file_frame, mode='determinate', maximum=100)
+        self.progress.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.cancel_button = ttk.Button(file_frame, text="Cancelar", 
+                                        command=self.cancel_decode, state=tk.DISABLED)
+        self.cancel_button.grid(row=1, column=2, padx=(10, 0), pady=(10, 0))
         
         # Botón para guardar
         buttons_frame = ttk.Frame(main_frame)
@@ -106,108 +306,6 @@ class MIPSDecoder:
             self.file_path.set(filename)
             self.update_status(f"Archivo seleccionado: {os.path.basename(filename)}")
     
-    def parse_r_type(self, operands):
-        """Parsea operandos para instrucciones tipo R"""
-        if len(operands) != 3:
-            raise ValueError("Se esperaban 3 operandos para instrucción tipo R")
-        
-        rd = self.parse_register(operands[0])
-        rs = self.parse_register(operands[1])
-        rt = self.parse_register(operands[2])
-        
-        return rs, rt, rd, 0  # shamt = 0
-    
-    def parse_register(self, reg_str):
-        """Convierte string de registro a número"""
-        reg_str = reg_str.strip().upper()
-        
-        # Verificar formato de registro
-        if not reg_str.startswith('$'):
-            raise ValueError(f"Formato de registro inválido: {reg_str}")
-        
-        if reg_str in self.register_map:
-            return self.register_map[reg_str]
-        
-        # Intentar parsear números directos (como $10)
-        try:
-            reg_num = int(reg_str[1:])
-            if 0 <= reg_num <= 31:
-                return reg_num
-            else:
-                raise ValueError(f"Número de registro fuera de rango: {reg_str}")
-        except ValueError:
-            raise ValueError(f"Registro no reconocido: {reg_str}")
-    
-    def clean_line(self, line):
-        """Limpia línea de comentarios y espacios extra"""
-        if '#' in line:
-            line = line.split('#')[0]
-        return line.strip()
-    
-    def encode_instruction(self, instruction, operands):
-        """Codifica instrucción a binario MIPS32"""
-        if instruction not in self.instruction_table:
-            raise ValueError(f"Instrucción no soportada: {instruction}")
-        
-        instr_info = self.instruction_table[instruction]
-        
-        if instr_info['type'] == 'R':
-            rs, rt, rd, shamt = instr_info['operand_parser'](operands)
-            
-            # Construir instrucción de 32 bits
-            encoded = (instr_info['opcode'] << 26) | (rs << 21) | (rt << 16) | \
-                     (rd << 11) | (shamt << 6) | instr_info['funct']
-            
-            return encoded
-        else:
-            raise ValueError(f"Tipo de instrucción no implementado: {instr_info['type']}")
-    
-    def to_big_endian_bytes(self, instruction_32bit):
-        """Convierte instrucción de 32 bits a bytes Big Endian"""
-        # Usar struct para empaquetar en Big Endian
-        return struct.pack('>I', instruction_32bit)
-    
-    def decode_single_instruction(self, line, line_num=None):
-        """Decodifica una sola instrucción"""
-        try:
-            line = self.clean_line(line)
-            if not line:
-                return None, "Línea vacía o comentario"
-            
-            parts = [part.strip() for part in line.replace(',', ' ').split()]
-            if not parts:
-                return None, "Línea vacía"
-            
-            instruction = parts[0].upper()
-            operands = parts[1:]
-            
-            # Verificar si la instrucción existe
-            if instruction not in self.instruction_table:
-                raise ValueError(f"Instrucción no soportada: {instruction}")
-            
-            # Codificar instrucción
-            encoded = self.encode_instruction(instruction, operands)
-            
-            # Convertir a bytes Big Endian
-            bytes_data = self.to_big_endian_bytes(encoded)
-            
-            # Formatear resultado
-            line_info = f"Línea {line_num}: " if line_num is not None else ""
-            result = {
-                'original': line,
-                'encoded_hex': f"{encoded:08X}",
-                'bytes_hex': ' '.join(f"{b:02X}" for b in bytes_data),
-                'bytes_bin': ' '.join(f"{b:08b}" for b in bytes_data),
-                'bytes_data': bytes_data,
-                'binary_string': ''.join(f"{b:08b}" for b in bytes_data)  # Cadena binaria continua
-            }
-            
-            return result, f"{line_info}✓ {line} -> {result['encoded_hex']}"
-            
-        except Exception as e:
-            line_info = f"Línea {line_num}: " if line_num is not None else ""
-            return None, f"{line_info}✗ Error: {str(e)}"
-    
     def decode_from_text(self):
         """Decodifica instrucción desde campo de texto"""
         line = self.manual_entry.get().strip()
@@ -221,8 +319,8 @@ class MIPSDecoder:
         self.output_text.see(tk.END)
         
         if result:
-            # Agregar a la lista de instrucciones binarias
-            self.binary_strings.append(result['binary_string'])
+            # Agregar al buffer de instrucciones
+            self.words.append(result.encoded)
             self.show_detailed_result(result)
             self.update_status("Instrucción decodificada exitosamente")
         else:
@@ -230,6 +328,8 @@ class MIPSDecoder:
     
     def open_file_location(self, filepath):
         """Abre la ubicación del archivo en el explorador del sistema"""
+        import platform
+        import subprocess
         try:
             if platform.system() == "Windows":
                 # Windows: abrir carpeta y seleccionar archivo
@@ -246,89 +346,199 @@ class MIPSDecoder:
             return False
     
     def decode_from_file(self):
-        """Decodifica instrucciones desde archivo"""
+        """Decodifica instrucciones desde archivo.
+        
+        El archivo se lee en un hilo de trabajo que manda lotes por una
+        cola; la GUI los vacía con un temporizador y hace una sola
+        inserción por vaciado, así la ventana sigue respondiendo.
+        """
         filename = self.file_path.get()
         if not filename or not os.path.exists(filename):
             messagebox.showerror("Error", "Por favor seleccione un archivo válido")
             return
+        if self.worker is not None:
+            return
         
+        self.clear_output()
+        self.output_text.insert(tk.END, f"Procesando archivo: {os.path.basename(filename)}\n")
+        self.output_text.insert(tk.END, "=" * 50 + '\n')
+        
+        # Reiniciar el buffer de instrucciones
+        self.words = array('I')
+        self.success_count = 0
+        self.error_count = 0
+        self.file_size = max(os.path.getsize(filename), 1)
+        self.progress['value'] = 0
+        self.decode_file_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        
+        import queue
+        import threading
+        self.cancel_event = threading.Event()
+        self.batches = queue.Queue(maxsize=QUEUE_BATCHES)
+        self.worker = threading.Thread(target=self.decode_worker,
+                                       args=(filename, self.batches, self.cancel_event),
+                                       daemon=True)
+        self.worker.start()
+        self.update_status(f"Decodificando {os.path.basename(filename)}...")
+        self.root.after(POLL_MS, self.drain_batches)
+    
+    def decode_worker(self, filename, batches, cancel):
+        """Hilo de trabajo: lee el archivo línea por línea (sin cargarlo
+        completo) y manda ('lote', palabras, mensajes, éxitos, errores,
+        bytes leídos); al final manda ('fin',), ('cancelado',) o
+        ('error', mensaje). No toca widgets."""
         try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-            
-            self.clear_output()
-            self.output_text.insert(tk.END, f"Procesando archivo: {os.path.basename(filename)}\n")
-            self.output_text.insert(tk.END, "=" * 50 + '\n')
-            
-            # Reiniciar la lista de instrucciones binarias
-            self.binary_strings = []
-            success_count = 0
-            error_count = 0
-            
-            for i, line in enumerate(lines, 1):
-                result, message = self.decode_single_instruction(line, i)
-                self.output_text.insert(tk.END, message + '\n')
-                self.output_text.see(tk.END)
+            with open(filename, 'rb') as file:
+                words, messages = array('I'), []
+                success = errors = 0
+                position = 0
+                for i, raw in enumerate(file, 1):
+                    position += len(raw)
+                    result, message = self.decode_single_instruction(raw.decode('utf-8'), i)
+                    messages.append(message)
+                    if result:
+                        words.append(result.encoded)
+                        success += 1
+                    else:
+                        errors += 1
+                    
+                    if len(messages) >= BATCH_LINES:
+                        if cancel.is_set():
+                            batches.put(('cancelado',))
+                            return
+                        batches.put(('lote', words, messages, success, errors, position))
+                        words, messages = array('I'), []
+                        success = errors = 0
                 
-                if result:
-                    self.binary_strings.append(result['binary_string'])
-                    success_count += 1
-                else:
-                    error_count += 1
-            
-            # Mostrar resultados
+                batches.put(('lote', words, messages, success, errors, position))
+            batches.put(('fin',))
+        except Exception as e:
+            batches.put(('error', str(e)))
+    
+    def drain_batches(self):
+        """Temporizador de la GUI: junta los lotes pendientes (hasta
+        DRAIN_SECONDS) en una sola inserción y actualiza el progreso"""
+        import queue
+        import time
+        messages = []
+        finished = None
+        position = None
+        deadline = time.perf_counter() + DRAIN_SECONDS
+        while time.perf_counter() < deadline:
+            try:
+                item = self.batches.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] != 'lote':
+                finished = item
+                break
+            if self.cancel_event.is_set():
+                continue        # Lotes que ya estaban en la cola
+            _, words, batch, success, errors, position = item
+            self.words.extend(words)
+            messages.extend(batch)
+            self.success_count += success
+            self.error_count += errors
+        
+        if messages:
+            messages.append('')
+            self.output_text.insert(tk.END, '\n'.join(messages))
+            self.output_text.see(tk.END)
+        if position is not None:
+            self.progress['value'] = 100 * position / self.file_size
+            self.update_status(f"Decodificando... {self.success_count} instrucciones, "
+                               f"{self.error_count} errores")
+        
+        if finished is None:
+            self.root.after(POLL_MS, self.drain_batches)
+        else:
+            self.finish_decode(finished)
+    
+    def cancel_decode(self):
+        """Pide al hilo de trabajo que se detenga"""
+        if self.worker is not None:
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.update_status("Cancelando...")
+    
+    def finish_decode(self, item):
+        """Muestra el resumen cuando el hilo de trabajo termina"""
+        self.worker = None
+        self.decode_file_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        
+        if item[0] == 'error':
+            self.words = array('I')
+            self.progress['value'] = 0
+            messagebox.showerror("Error", f"No se pudo procesar el archivo: {item[1]}")
+            self.update_status("Error procesando archivo")
+            return
+        
+        if item[0] == 'cancelado' or self.cancel_event.is_set():
+            # Un resultado parcial no se debe guardar por error
+            self.words = array('I')
+            self.progress['value'] = 0
             self.output_text.insert(tk.END, "=" * 50 + '\n')
-            self.output_text.insert(tk.END, 
-                f"Procesamiento completado: {success_count} éxitos, {error_count} errores\n")
-            
-            if self.binary_strings:
-                self.output_text.insert(tk.END, "Use el botón 'Guardar Archivo Binario' para guardar los resultados\n")
-                
-                # Mostrar ejemplo del contenido del archivo binario
-                self.output_text.insert(tk.END, "\nContenido que se guardará:\n")
-                for i, binary_str in enumerate(self.binary_strings, 1):
-                    self.output_text.insert(tk.END, f"{binary_str}\n")
-                
-                self.update_status(f"Procesamiento completado: {success_count} instrucciones listas para guardar")
-            else:
-                self.output_text.insert(tk.END, "No se generaron instrucciones válidas\n")
-                self.output_text.insert(tk.END, "Puede guardar un archivo vacío usando el botón 'Guardar Archivo Binario'\n")
-                self.update_status("Procesamiento completado sin instrucciones válidas")
-            
+            self.output_text.insert(tk.END, "Decodificación cancelada; se descartaron los resultados\n")
             self.output_text.see(tk.END)
+            self.update_status("Decodificación cancelada")
+            return
+        
+        success_count, error_count = self.success_count, self.error_count
+        self.progress['value'] = 100
+        
+        # Mostrar resultados
+        self.output_text.insert(tk.END, "=" * 50 + '\n')
+        self.output_text.insert(tk.END, 
+            f"Procesamiento completado: {success_count} éxitos, {error_count} errores\n")
+        
+        if self.words:
+            self.output_text.insert(tk.END, "Use el botón 'Guardar Archivo Binario' para guardar los resultados\n")
             
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo procesar el archivo: {str(e)}")
-            self.update_status("Error procesando archivo")
+            # Mostrar ejemplo del contenido del archivo binario
+            self.output_text.insert(tk.END, "\nContenido que se guardará:\n")
+            self.output_text.insert(tk.END, to_text(self.words[:PREVIEW_WORDS]))
+            if len(self.words) > PREVIEW_WORDS:
+                self.output_text.insert(tk.END,
+                    f"... ({len(self.words) - PREVIEW_WORDS} palabras más)\n")
+            
+            self.update_status(f"Procesamiento completado: {success_count} instrucciones listas para guardar")
+        else:
+            self.output_text.insert(tk.END, "No se generaron instrucciones válidas\n")
+            self.output_text.insert(tk.END, "Puede guardar un archivo vacío usando el botón 'Guardar Archivo Binario'\n")
+            self.update_status("Procesamiento completado sin instrucciones válidas")
+        
+        self.output_text.see(tk.END)
     
     def save_binary_file_dialog(self):
         """Abre diálogo para guardar el archivo binario"""
         # Siempre permitir guardar, incluso si no hay instrucciones
         
         # Sugerir nombre por defecto
+        import datetime
         default_filename = f"instrucciones_binario_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         
         filename = filedialog.asksaveasfilename(
             title="Guardar archivo binario",
             defaultextension=".txt",
-            filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
+            filetypes=[("Archivos de texto", "*.txt"), ("$readmemh", "*.hex"),
+                       ("Disperso @dirección", "*.mem"), ("Binario Big Endian", "*.bin"),
+                       ("Todos los archivos", "*.*")],
             initialfile=default_filename
         )
         
         if filename:
-            success = self.save_binary_file(filename, self.binary_strings)
+            success = self.save_binary_file(filename, self.words)
             if success:
                 # Limpiar la pantalla después de guardar
                 self.clear_output_after_save()
     
-    def save_binary_file(self, filename, binary_strings):
-        """Guarda SOLO los números binarios en un archivo de texto"""
+    def save_binary_file(self, filename, words):
+        """Guarda SOLO las palabras (formato según la extensión: .txt binario,
+        .hex, .mem disperso o .bin)"""
         try:
-            # Guardar SOLO los números binarios, uno por línea
-            with open(filename, 'w', encoding='utf-8') as file:
-                for binary_str in binary_strings:
-                    file.write(binary_str + '\n')  # Solo el número binario, nada más
-            
+            super().save_binary_file(filename, words)
             return True
                 
         except Exception as e:
@@ -346,8 +556,8 @@ class MIPSDecoder:
         self.output_text.insert(tk.END, "=" * 50 + '\n')
         self.output_text.insert(tk.END, "Listo para nuevas instrucciones...\n")
         
-        # Limpiar también la lista de instrucciones binarias
-        self.binary_strings = []
+        # Limpiar también el buffer de instrucciones
+        self.words = array('I')
         
         # Limpiar el campo de entrada manual
         self.manual_entry.delete(0, tk.END)
@@ -360,11 +570,11 @@ class MIPSDecoder:
     def show_detailed_result(self, result):
         """Muestra resultado detallado en el área de texto"""
         self.output_text.insert(tk.END, "Detalles de codificación:\n")
-        self.output_text.insert(tk.END, f"  Original: {result['original']}\n")
-        self.output_text.insert(tk.END, f"  Hexadecimal: {result['encoded_hex']}\n")
-        self.output_text.insert(tk.END, f"  Bytes (Hex): {result['bytes_hex']}\n")
-        self.output_text.insert(tk.END, f"  Bytes (Bin): {result['bytes_bin']}\n")
-        self.output_text.insert(tk.END, f"  Binario continuo: {result['binary_string']}\n")
+        self.output_text.insert(tk.END, f"  Original: {result.original}\n")
+        self.output_text.insert(tk.END, f"  Hexadecimal: {result.encoded_hex}\n")
+        self.output_text.insert(tk.END, f"  Bytes (Hex): {result.bytes_hex}\n")
+        self.output_text.insert(tk.END, f"  Bytes (Bin): {result.bytes_bin}\n")
+        self.output_text.insert(tk.END, f"  Binario continuo: {result.binary_string}\n")
         self.output_text.insert(tk.END, "-" * 40 + '\n')
     
     def clear_output(self):
@@ -382,6 +592,42 @@ class MIPSDecoder:
         """Ejecuta la aplicación"""
         self.root.mainloop()
 
+def main_cli(argv=None):
+    """Modo línea de comandos: archivo de instrucciones -> palabras (mismo
+    formato que 'Guardar Archivo Binario')"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Decodificador MIPS32 sin interfaz gráfica")
+    parser.add_argument("entrada", help="archivo de instrucciones (una por línea)")
+    parser.add_argument("-o", "--salida", default=None,
+                        help="archivo de salida; el formato sale de la extensión "
+                             "(.txt binario, .hex, .mem, .bin). Sin -o se imprime")
+    args = parser.parse_args(argv)
+    
+    decoder = MIPSDecoder()
+    try:
+        words, errors = decoder.decode_file(args.entrada)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+    
+    for message in errors:
+        print(message, file=sys.stderr)
+    if args.salida:
+        try:
+            decoder.save_binary_file(args.salida, words)
+        except OSError as e:
+            print(f"✗ Error: {e}", file=sys.stderr)
+            return 1
+        print(f"✓ {len(words)} instrucciones -> {args.salida}", file=sys.stderr)
+    else:
+        sys.stdout.write(to_text(words))
+    return 1 if errors else 0
+
 if __name__ == "__main__":
-    app = MIPSDecoder()
-    app.run()
\ No newline at end of file
+    # Sin argumentos se abre la GUI; con un archivo, modo línea de comandos
+    if len(sys.argv) > 1:
+        sys.exit(main_cli())
+    app = MIPSDecoderGUI()
+    app.run()